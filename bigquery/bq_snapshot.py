@@ -0,0 +1,175 @@
+"""
+BigQuery Query Snapshots
+Local Parquet copies of the model scripts' training-data queries
+
+snapshot_query() runs a query once and writes the result to
+<snapshot dir>/<query hash>.parquet along with the last-modified time of
+every table the query reads. Later runs check those tables' metadata (no
+query, no bytes billed) and serve the rows from disk while nothing changed.
+
+Offline mode skips BigQuery entirely and serves the last snapshot of each
+query, so model iteration works with no network at all. BigQueryClient is
+created lazily, so an offline run never constructs (or authenticates) a
+client.
+
+column_arrays() turns any query result shape (snapshot rows, Arrow tables,
+DataFrames) into NumPy columns for vectorized feature building.
+
+Environment:
+  NEPSAC_SNAPSHOT_DIR   snapshot directory (default: bq_snapshots)
+  NEPSAC_OFFLINE=1      serve snapshots only, never contact BigQuery
+
+Usage:
+  from bq_snapshot import BigQueryClient, snapshot_query
+
+  client = BigQueryClient(project='prodigy-ranking')
+  rows = snapshot_query(client, query)   # rows support row.col and row['col']
+"""
+
+import hashlib
+import json
+import os
+import re
+
+SNAPSHOT_DIR = os.environ.get('NEPSAC_SNAPSHOT_DIR', 'bq_snapshots')
+OFFLINE = os.environ.get('NEPSAC_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+# Bump when the snapshot file layout changes so old snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Process-wide snapshot hit/miss counts
+SNAPSHOT_STATS = {'hits': 0, 'misses': 0}
+
+METADATA_KEY = b'nepsac_snapshot'
+
+# Fully qualified table ids in backticks: `project.dataset.table`
+TABLE_PATTERN = re.compile(r'`([\w-]+\.\w+\.\w+)`')
+
+
+class SnapshotRow(dict):
+    """Query result row with attribute access, like google.cloud.bigquery.Row"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class BigQueryClient:
+    """bigquery.Client that is only created (and authenticated) on first use"""
+
+    def __init__(self, project):
+        self.project = project
+        self._client = None
+
+    def __getattr__(self, name):
+        if self._client is None:
+            if OFFLINE:
+                raise RuntimeError(f"BigQuery is unavailable in offline mode (NEPSAC_OFFLINE); "
+                                   f"client.{name} needs a live connection")
+            from google.cloud import bigquery
+            self._client = bigquery.Client(project=self.project)
+        return getattr(self._client, name)
+
+
+def query_hash(query):
+    """Hash of the query text, ignoring whitespace differences"""
+    normalized = ' '.join(query.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def table_versions(client, tables):
+    """Last-modified time of each table (metadata lookups only)"""
+    return {table: client.get_table(table).modified.isoformat() for table in sorted(tables)}
+
+
+def _read_snapshot(path):
+    """(metadata, rows) from a snapshot file, or None if missing or unreadable"""
+    import pyarrow.parquet as pq
+
+    try:
+        table = pq.read_table(path)
+        meta = json.loads(table.schema.metadata[METADATA_KEY])
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION:
+        return None
+    return meta, [SnapshotRow(row) for row in table.to_pylist()]
+
+
+def _write_snapshot(path, rows, meta):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pylist(rows)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           METADATA_KEY: json.dumps(meta).encode('utf-8')})
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def snapshot_query(client, query, tables=None, snapshot_dir=None, offline=None):
+    """
+    Rows of a query, served from a local Parquet snapshot when it is current
+
+    tables defaults to every `project.dataset.table` referenced in the query.
+    The snapshot is reused while all of them have the same last-modified time
+    as when it was written. offline (default: NEPSAC_OFFLINE) returns the
+    snapshot as-is and raises FileNotFoundError if there is none. Without
+    pyarrow installed, online runs fall back to querying every time.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    offline = OFFLINE if offline is None else offline
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        if offline:
+            raise ImportError("Offline mode reads snapshots with pyarrow (pip install pyarrow)") from e
+        # No Parquet support: query directly, as before snapshots existed
+        return [SnapshotRow(row.items()) for row in client.query(query).result()]
+
+    if tables is None:
+        tables = set(TABLE_PATTERN.findall(query))
+
+    key = query_hash(query)
+    path = os.path.join(snapshot_dir, f"{key}.parquet")
+    snapshot = _read_snapshot(path)
+
+    if offline:
+        if snapshot is None:
+            raise FileNotFoundError(f"No snapshot for query {key} in {snapshot_dir} "
+                                    f"(run once with BigQuery access to create it)")
+        SNAPSHOT_STATS['hits'] += 1
+        return snapshot[1]
+
+    versions = table_versions(client, tables)
+    if snapshot is not None and snapshot[0]['tables'] == versions:
+        SNAPSHOT_STATS['hits'] += 1
+        return snapshot[1]
+
+    SNAPSHOT_STATS['misses'] += 1
+    rows = [SnapshotRow(row.items()) for row in client.query(query).result()]
+    os.makedirs(snapshot_dir, exist_ok=True)
+    _write_snapshot(path, rows, {'version': SNAPSHOT_VERSION, 'query': key, 'tables': versions,
+                                 'rows': len(rows)})
+    return rows
+
+
+def column_arrays(data, names, dtype=float):
+    """
+    {name: NumPy array} for the given columns of a query result
+
+    data may be a pyarrow Table, a pandas DataFrame, a dict of columns, or
+    rows (snapshot_query output, bigquery.Row objects or dicts).
+    """
+    import numpy as np
+
+    if hasattr(data, 'column_names'):  # pyarrow Table / RecordBatch
+        return {name: np.asarray(data.column(name).to_numpy(), dtype=dtype) for name in names}
+    if hasattr(data, 'keys'):  # DataFrame or dict of columns
+        return {name: np.asarray(data[name], dtype=dtype) for name in names}
+    rows = list(data)
+    return {name: np.array([row[name] for row in rows], dtype=dtype) for name in names}
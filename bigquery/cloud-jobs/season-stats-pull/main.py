@@ -6,12 +6,19 @@ Fetches season-by-season stats for all players and stores in BigQuery.
 
 This runs as a Cloud Run Job - designed to run for hours/days continuously.
 Progress is tracked in BigQuery so it can resume if restarted.
+
+Requests are issued from a thread pool sharing one token bucket, so the job
+runs at the configured requests per second no matter how long each request
+takes, with at most MAX_IN_FLIGHT requests open at once. A 429 pauses the
+whole bucket rather than one worker.
 """
 
 import requests
 import pandas as pd
 from google.cloud import bigquery
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+import threading
 import time
 import os
 import logging
@@ -25,14 +32,16 @@ logger = logging.getLogger(__name__)
 
 # Configuration
 API_KEY = os.environ.get('EP_API_KEY', 'EmmrXHpydfr14MVUdFxZyCCczQ3wqghc')
-BASE_URL = "https://api.eliteprospects.com/v1"
+BASE_URL = os.environ.get('EP_BASE_URL', "https://api.eliteprospects.com/v1")
 PROJECT_ID = os.environ.get('GCP_PROJECT', 'prodigy-ranking')
 DATASET = "algorithm_core"
 STATS_TABLE = "player_season_stats"
 PROGRESS_TABLE = "season_stats_progress"
 
 # Rate limiting
-REQUESTS_PER_SECOND = 1.5  # Conservative to avoid rate limits
+REQUESTS_PER_SECOND = float(os.environ.get('EP_REQUESTS_PER_SECOND', 1.5))  # Conservative to avoid rate limits
+MAX_IN_FLIGHT = int(os.environ.get('EP_MAX_IN_FLIGHT', 8))  # Concurrent requests (bounds latency overlap, not rate)
+RATE_LIMIT_PAUSE = 60  # Seconds every worker waits after a 429
 BATCH_SIZE = 100  # Save to BigQuery every N players
 CHECKPOINT_INTERVAL = 500  # Log checkpoint every N players
 
@@ -126,29 +135,103 @@ def get_completed_player_ids(client):
     except:
         return set()
 
-def fetch_player_stats(player_id):
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may start"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait_time = (1 - self.tokens) / self.rate
+                else:
+                    wait_time = self.paused_until - now
+            time.sleep(wait_time)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` (shared backoff after a 429)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
+
+_local = threading.local()
+
+def get_session():
+    """One requests.Session per worker thread, for connection reuse"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+def fetch_player_stats(player_id, bucket=None):
     """Fetch season stats for a single player from EP API"""
     url = f"{BASE_URL}/players/{player_id}/stats"
     params = {'apiKey': API_KEY}
 
-    try:
-        response = requests.get(url, params=params, timeout=30)
-
-        if response.status_code == 200:
-            return response.json().get('data', [])
-        elif response.status_code == 404:
-            return []  # Player not found
-        elif response.status_code == 429:
-            logger.warning(f"Rate limited, sleeping 60s...")
-            time.sleep(60)
-            return fetch_player_stats(player_id)  # Retry
-        else:
-            logger.warning(f"API error for player {player_id}: {response.status_code}")
+    while True:
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            response = get_session().get(url, params=params, timeout=30)
+
+            if response.status_code == 200:
+                return response.json().get('data', [])
+            elif response.status_code == 404:
+                return []  # Player not found
+            elif response.status_code == 429:
+                logger.warning(f"Rate limited, pausing {RATE_LIMIT_PAUSE}s...")
+                if bucket is not None:
+                    bucket.pause(RATE_LIMIT_PAUSE)
+                else:
+                    time.sleep(RATE_LIMIT_PAUSE)
+                continue  # Retry
+            else:
+                logger.warning(f"API error for player {player_id}: {response.status_code}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Request error for player {player_id}: {e}")
             return None
 
-    except Exception as e:
-        logger.error(f"Request error for player {player_id}: {e}")
-        return None
+def fetch_all_player_stats(player_ids, rate=REQUESTS_PER_SECOND, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Yield (player_id, stats) as requests complete (not in input order)
+
+    Requests start at no more than `rate` per second (shared token bucket)
+    with at most max_in_flight outstanding. New requests are only submitted
+    as results are consumed, so a slow consumer (BigQuery uploads) never
+    builds up a backlog.
+    """
+    bucket = TokenBucket(rate)
+    ids = iter(player_ids)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        pending = {}
+        for player_id in ids:
+            pending[pool.submit(fetch_player_stats, player_id, bucket)] = player_id
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                player_id = pending.pop(future)
+                yield player_id, future.result()
+                next_id = next(ids, None)
+                if next_id is not None:
+                    pending[pool.submit(fetch_player_stats, next_id, bucket)] = next_id
 
 def safe_int(val):
     if val is None or val == '' or val == '-':
@@ -273,10 +356,8 @@ def main():
     processed = 0
     start_time = datetime.now()
 
-    for i, player_id in enumerate(remaining_ids):
-        # Fetch stats from API
-        stats = fetch_player_stats(player_id)
-
+    logger.info(f"Fetching at {REQUESTS_PER_SECOND} req/s, up to {MAX_IN_FLIGHT} in flight")
+    for player_id, stats in fetch_all_player_stats(remaining_ids):
         if stats is None:
             # API error - record and continue
             progress_batch.append({
@@ -326,9 +407,6 @@ def main():
             logger.info(f"Progress: {processed:,}/{len(remaining_ids):,} ({processed/len(remaining_ids)*100:.1f}%) | "
                        f"Records: {total_records:,} | Rate: {rate:.1f}/sec | ETA: {eta_hours:.1f}h")
 
-        # Rate limiting
-        time.sleep(1 / REQUESTS_PER_SECOND)
-
     # Final upload
     if stats_batch:
         upload_stats_batch(client, stats_batch)
@@ -13,12 +13,12 @@ Incorporates past performance factors:
 Target: 75%+ prediction accuracy
 """
 
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
 
-client = bigquery.Client(project='prodigy-ranking')
+client = BigQueryClient(project='prodigy-ranking')
 
 # =============================================================================
 # DATA LOADING
@@ -113,6 +113,9 @@ class TeamStats:
         self.home_record = {'wins': 0, 'losses': 0, 'ties': 0, 'gf': 0, 'ga': 0}
         self.away_record = {'wins': 0, 'losses': 0, 'ties': 0, 'gf': 0, 'ga': 0}
         self.h2h = defaultdict(lambda: {'wins': 0, 'losses': 0, 'ties': 0})
+        self.total_gf = 0
+        self.total_ga = 0
+        self.streak = 0  # Positive = wins, negative = losses, 0 after a tie
 
     def add_game(self, date, opponent, goals_for, goals_against, is_home):
         """Record a game result."""
@@ -132,6 +135,16 @@ class TeamStats:
             'is_home': is_home
         })
 
+        # Running totals, so the getters don't rescan self.games
+        self.total_gf += goals_for
+        self.total_ga += goals_against
+        if result == 'W':
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+        elif result == 'L':
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+        else:
+            self.streak = 0
+
         # Update records
         record = self.home_record if is_home else self.away_record
         record['gf'] += goals_for
@@ -166,24 +179,7 @@ class TeamStats:
 
     def get_streak(self):
         """Get current win/loss streak."""
-        if not self.games:
-            return 0
-
-        streak = 0
-        last_result = self.games[-1]['result']
-
-        for game in reversed(self.games):
-            if game['result'] == last_result:
-                if last_result == 'W':
-                    streak += 1
-                elif last_result == 'L':
-                    streak -= 1
-                else:
-                    break  # Tie breaks streak
-            else:
-                break
-
-        return streak
+        return self.streak
 
     def get_home_advantage(self):
         """Calculate home vs away performance differential."""
@@ -208,9 +204,7 @@ class TeamStats:
         if total_games == 0:
             return 0
 
-        total_gf = sum(g['gf'] for g in self.games)
-        total_ga = sum(g['ga'] for g in self.games)
-        return (total_gf - total_ga) / total_games
+        return (self.total_gf - self.total_ga) / total_games
 
 def build_team_stats(games):
     """Build team statistics from game history."""
@@ -430,60 +424,28 @@ class EnhancedPredictor:
 # =============================================================================
 
 def backtest_model(predictor, games, min_history=5):
-    """Backtest the model against historical games."""
-
-    correct = 0
-    total = 0
-    predictions = []
-
-    # Build stats progressively
-    progressive_stats = defaultdict(TeamStats)
-
-    for i, game in enumerate(games):
-        away = game['away_team']
-        home = game['home_team']
-        away_score = game['away_score']
-        home_score = game['home_score']
-
-        # Skip ties for accuracy calculation
-        if away_score == home_score:
-            # Still add to stats
-            progressive_stats[away].add_game(game['date'], home, away_score, home_score, is_home=False)
-            progressive_stats[home].add_game(game['date'], away, home_score, away_score, is_home=True)
-            continue
-
-        # Only predict if we have some history
-        if i >= min_history:
-            # Create predictor with current stats
-            temp_predictor = EnhancedPredictor(predictor.rankings, progressive_stats)
-            pred = temp_predictor.predict(away, home)
-
-            actual_winner = away if away_score > home_score else home
-            is_correct = pred['winner'] == actual_winner
-
-            if is_correct:
-                correct += 1
-            total += 1
-
-            predictions.append({
-                'game': f"{away} @ {home}",
-                'predicted': pred['winner'],
-                'actual': actual_winner,
-                'confidence': pred['confidence'],
-                'correct': is_correct
-            })
+    """
+    Backtest the model against historical games.
 
-        # Add game to progressive stats
-        progressive_stats[away].add_game(game['date'], home, away_score, home_score, is_home=False)
-        progressive_stats[home].add_game(game['date'], away, home_score, away_score, is_home=True)
+    Walk-forward: each game is predicted from the results before it (see
+    nepsac_backtester), with team stats updated incrementally.
+    """
+    from nepsac_backtester import EnhancedModel, walk_forward
 
-    accuracy = (correct / total * 100) if total > 0 else 0
+    model = EnhancedModel(predictor.rankings)
+    result = walk_forward(games, [model], min_history=min_history)[model.name]
 
     return {
-        'correct': correct,
-        'total': total,
-        'accuracy': accuracy,
-        'predictions': predictions
+        'correct': result['correct'],
+        'total': result['total'],
+        'accuracy': result['accuracy'],
+        'predictions': [{
+            'game': p['game'],
+            'predicted': p['predicted'],
+            'actual': p['actual'],
+            'confidence': p['confidence'],
+            'correct': p['correct']
+        } for p in result['predictions']]
     }
 
 def compare_models(rankings, games):
@@ -0,0 +1,557 @@
+"""
+NEPSAC Walk-Forward Backtester
+Scores several prediction models against completed games in one pass
+
+Games are replayed in date order. Each game is scored by every model from the
+state built out of the games before it, then applied to that state, so no
+model ever sees the result it is predicting. Per-team state is updated
+incrementally (running totals, streaks, records), so a season backtest is
+O(games) instead of rebuilding stats or predictors for every game.
+
+Models:
+- engine    nepsac_prediction_engine.predict_game (team stats, ELO and
+            head-to-head replayed; roster/MHR/JSPR/NEHJ are the current files)
+- enhanced  enhanced_prediction_model.EnhancedPredictor.predict
+- v3        prediction_model_v3.predict_game
+- v3_final  prediction_model_v3_final.predict_game (standings built from the
+            replayed results instead of the final table)
+- regenerate regenerate_predictions.calculate_prediction (same replayed
+            standings; used through nepsac_model_registry, which loads the
+            rankings columns it needs)
+
+The enhanced/v3/v3_final modules query BigQuery and are only imported when
+one of those models is used. Every model looks teams up by the labels in the
+games, so compare models on games labelled the way their rankings are keyed
+(team names for the engine, team ids for the BigQuery models).
+
+Ties are applied but not scored (the models don't predict ties), and the
+first min_history games only warm up the state. The CLI adds bootstrap
+intervals (nepsac_bootstrap) for every model and paired intervals against
+the first one.
+
+Usage:
+  python nepsac_backtester.py                              # engine on local results
+  python nepsac_backtester.py --source bigquery            # enhanced, v3, v3_final
+  python nepsac_backtester.py --source bigquery --models enhanced v3 --output backtest.json
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import defaultdict
+
+from nepsac_bootstrap import RESAMPLES, bootstrap_metrics, format_interval, paired_bootstrap
+from nepsac_prediction_engine import (
+    DATA_SOURCE_LOADERS,
+    EloRatings,
+    HeadToHeadIndex,
+    SourceLoader,
+    TeamStatsAccumulator,
+    _derive_team_stats,
+    calculate_age_adjusted_rankings,
+    normalize_team_name,
+    predict_game,
+)
+
+MIN_HISTORY = 5
+
+MODEL_NAMES = ['engine', 'enhanced', 'v3', 'v3_final']
+
+# Probabilities are clipped before log loss so a 0/1 call can't score infinity
+PROB_EPSILON = 1e-6
+
+
+# =============================================================================
+# GAMES
+# =============================================================================
+
+def schedule_games(rows):
+    """
+    Common game dicts (date, away_team, home_team, away_score, home_score)
+
+    Accepts the BigQuery schedule rows used by prediction_model_v3 and
+    prediction_model_v3_final (away_team_id, game_date, ...) as well as
+    enhanced_prediction_model.load_completed_games() output. Sorted by date.
+    """
+    games = []
+    for row in rows:
+        games.append({
+            'date': str(row['date'] if 'date' in row else row['game_date']),
+            'away_team': row['away_team'] if 'away_team' in row else row['away_team_id'],
+            'home_team': row['home_team'] if 'home_team' in row else row['home_team_id'],
+            'away_score': row['away_score'],
+            'home_score': row['home_score'],
+        })
+
+    games.sort(key=lambda g: g['date'])
+    return games
+
+
+def games_from_results(results):
+    """
+    Common game dicts from load_game_results() rows (one row per team per game)
+
+    Each game is taken from its home team's row; a game only reported from
+    the away side is taken from that row instead. Dateless rows are dropped.
+    """
+    home_keys = set()
+    for row in results:
+        if row['date'] and row['home_away'] == 'Home':
+            home_keys.add((row['date'], row['opponent'], row['team'], row['opp_score'], row['team_score']))
+
+    games = []
+    for i, row in enumerate(results):
+        if not row['date'] or not row['opponent']:
+            continue
+        if row['home_away'] == 'Home':
+            away, home, away_score, home_score = row['opponent'], row['team'], row['opp_score'], row['team_score']
+        else:
+            away, home, away_score, home_score = row['team'], row['opponent'], row['team_score'], row['opp_score']
+            if (row['date'], away, home, away_score, home_score) in home_keys:
+                continue
+        games.append((row['date'], i, {
+            'date': row['date'],
+            'away_team': away,
+            'home_team': home,
+            'away_score': away_score,
+            'home_score': home_score,
+        }))
+
+    games.sort(key=lambda x: (x[0], x[1]))
+    return [game for _, _, game in games]
+
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class WalkForwardModel:
+    """
+    One model under test
+
+    predict(game) returns (predicted winner, confidence, home win probability)
+    from the state built so far; apply(game) folds the result into that state.
+    """
+
+    name = None
+
+    def predict(self, game):
+        raise NotImplementedError
+
+    def apply(self, game):
+        raise NotImplementedError
+
+
+class EnhancedModel(WalkForwardModel):
+    """enhanced_prediction_model.EnhancedPredictor over running TeamStats"""
+
+    name = 'enhanced'
+
+    def __init__(self, rankings):
+        from enhanced_prediction_model import EnhancedPredictor, TeamStats
+
+        self.team_stats = defaultdict(TeamStats)
+        # The predictor only reads team_stats, so one instance sees every update
+        self.predictor = EnhancedPredictor(rankings, self.team_stats)
+
+    def predict(self, game):
+        pred = self.predictor.predict(game['away_team'], game['home_team'])
+        return pred['winner'], pred['confidence'], pred['home_prob'] / 100
+
+    def apply(self, game):
+        away, home = game['away_team'], game['home_team']
+        self.team_stats[away].add_game(game['date'], home, game['away_score'], game['home_score'], is_home=False)
+        self.team_stats[home].add_game(game['date'], away, game['home_score'], game['away_score'], is_home=True)
+
+
+class V3Model(WalkForwardModel):
+    """prediction_model_v3.predict_game over running TeamHistory"""
+
+    name = 'v3'
+
+    def __init__(self, rankings):
+        import prediction_model_v3
+
+        self.rankings = rankings
+        self.history = defaultdict(prediction_model_v3.TeamHistory)
+        self._predict_game = prediction_model_v3.predict_game
+
+    def predict(self, game):
+        winner, confidence, _, breakdown = self._predict_game(
+            game['away_team'], game['home_team'], self.rankings, self.history)
+        # predict_game only returns the capped confidence; the exact home
+        # probability is the weighted factor split it was derived from
+        away_score = sum(f['away'] * f['weight'] for f in breakdown.values())
+        home_score = sum(f['home'] * f['weight'] for f in breakdown.values())
+        return winner, confidence, home_score / (away_score + home_score)
+
+    def apply(self, game):
+        away, home = game['away_team'], game['home_team']
+        self.history[away].add_game(game['away_score'], game['home_score'], is_home=False)
+        self.history[home].add_game(game['home_score'], game['away_score'], is_home=True)
+
+
+class V3FinalModel(WalkForwardModel):
+    """prediction_model_v3_final.predict_game over running standings and GameHistory"""
+
+    name = 'v3_final'
+
+    def __init__(self, rankings):
+        import prediction_model_v3_final
+
+        self.rankings = rankings
+        self.standings = {}
+        self.history = defaultdict(prediction_model_v3_final.GameHistory)
+        self._predict_game = prediction_model_v3_final.predict_game
+
+    def predict(self, game):
+        pred = self._predict_game(game['away_team'], game['home_team'], self.rankings,
+                                  self.standings, self.history)
+        return pred['winner'], pred['confidence'], pred['home_prob'] / 100
+
+    def _add(self, team, goals_for, goals_against):
+        record = self.standings.setdefault(team, {'wins': 0, 'losses': 0, 'ties': 0, 'win_pct': 0.5})
+        if goals_for > goals_against:
+            result = 'W'
+            record['wins'] += 1
+        elif goals_for < goals_against:
+            result = 'L'
+            record['losses'] += 1
+        else:
+            result = 'T'
+            record['ties'] += 1
+        games_played = record['wins'] + record['losses'] + record['ties']
+        record['win_pct'] = (record['wins'] + 0.5 * record['ties']) / games_played
+        self.history[team].add(result)
+
+    def apply(self, game):
+        self._add(game['away_team'], game['away_score'], game['home_score'])
+        self._add(game['home_team'], game['home_score'], game['away_score'])
+
+
+class RegenerateModel(WalkForwardModel):
+    """
+    regenerate_predictions.calculate_prediction over running standings
+
+    rankings maps team id -> avg_points, max_points, total_points and ovr
+    (the nepsac_team_rankings columns fetch_upcoming_games joins in); the
+    standings columns come from the replayed results instead of the final table.
+    """
+
+    name = 'regenerate'
+
+    # fetch_upcoming_games' COALESCE defaults for unranked teams
+    RANKING_DEFAULTS = {'avg_points': 0, 'max_points': 0, 'total_points': 0, 'ovr': 75}
+
+    def __init__(self, rankings):
+        from bq_snapshot import SnapshotRow
+        from regenerate_predictions import calculate_prediction
+
+        self.rankings = rankings
+        self.standings = defaultdict(lambda: {'wins': 0, 'losses': 0, 'ties': 0, 'gf': 0, 'ga': 0})
+        self._row = SnapshotRow
+        self._calculate_prediction = calculate_prediction
+
+    def _columns(self, side, team):
+        ranking = self.rankings.get(team, self.RANKING_DEFAULTS)
+        record = self.standings[team]
+        return {f'{side}_team_id': team,
+                **{f'{side}_{key}': ranking[key] for key in self.RANKING_DEFAULTS},
+                **{f'{side}_{key}': value for key, value in record.items()}}
+
+    def predict(self, game):
+        row = self._row(**self._columns('away', game['away_team']), **self._columns('home', game['home_team']))
+        pred = self._calculate_prediction(row)
+        return pred['predicted_winner_id'], pred['confidence'], pred['home_pct'] / 100
+
+    def _add(self, team, goals_for, goals_against):
+        record = self.standings[team]
+        record['gf'] += goals_for
+        record['ga'] += goals_against
+        if goals_for > goals_against:
+            record['wins'] += 1
+        elif goals_for < goals_against:
+            record['losses'] += 1
+        else:
+            record['ties'] += 1
+
+    def apply(self, game):
+        self._add(game['away_team'], game['away_score'], game['home_score'])
+        self._add(game['home_team'], game['home_score'], game['away_score'])
+
+
+class _TeamStatsView:
+    """calculate_team_stats-shaped lookups over a live TeamStatsAccumulator"""
+
+    def __init__(self, accumulator):
+        self.accumulator = accumulator
+
+    def get(self, team, default=None):
+        state = self.accumulator.teams.get(team)
+        if state is None or not state['games_played']:
+            return default
+        return _derive_team_stats(state)
+
+
+class _PerformanceView:
+    """EloRatings.rankings()-shaped lookups over live ratings, one team at a time"""
+
+    def __init__(self, elo):
+        self.elo = elo
+
+    def get(self, team, default=None):
+        games_played = self.elo.games_played.get(team, 0)
+        if games_played < 3:
+            return default
+
+        # Rank as in rankings(): rating descending, ties in insertion order
+        rating = self.elo.ratings[team]
+        rank = 1
+        before = True
+        for other, other_rating in self.elo.ratings.items():
+            if other == team:
+                before = False
+            elif other_rating > rating or (before and other_rating == rating):
+                rank += 1
+        return {'rank': rank, 'rating': round(rating, 1), 'games_played': games_played}
+
+
+class EngineModel(WalkForwardModel):
+    """
+    nepsac_prediction_engine.predict_game over replayed team stats, ELO and head-to-head
+
+    sources needs roster_rankings, mhr_rankings, jspr_rankings and
+    nehj_rankings (generate_all_predictions' data_sources, or
+    load_engine_sources()). Those are current snapshots, not replayed.
+    """
+
+    name = 'engine'
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.team_stats = TeamStatsAccumulator()
+        self.elo = EloRatings()
+        self.h2h = HeadToHeadIndex()
+        # sources with the replayed state swapped in, for engine helpers that read a sources dict
+        self.state_sources = dict(sources, team_stats=_TeamStatsView(self.team_stats),
+                                  performance_rankings=_PerformanceView(self.elo), h2h_index=self.h2h)
+
+    def predict(self, game):
+        pred = predict_game(game['away_team'], game['home_team'], self.sources['roster_rankings'],
+                            self.state_sources['team_stats'], self.h2h,
+                            mhr_rankings=self.sources['mhr_rankings'],
+                            jspr_rankings=self.sources['jspr_rankings'],
+                            performance_rankings=self.state_sources['performance_rankings'],
+                            nehj_rankings=self.sources['nehj_rankings'])
+        return pred['predicted_winner'], pred['confidence'], pred['home_pct'] / 100
+
+    def apply(self, game):
+        away = normalize_team_name(game['away_team'])
+        home = normalize_team_name(game['home_team'])
+        away_score, home_score = game['away_score'], game['home_score']
+        if home_score > away_score:
+            home_outcome, away_outcome = 'Win', 'Loss'
+        elif home_score < away_score:
+            home_outcome, away_outcome = 'Loss', 'Win'
+        else:
+            home_outcome = away_outcome = 'Tie'
+
+        # Same two rows (one from each side) that load_game_results() produces
+        for row in ({'team': home, 'date': game['date'], 'home_away': 'Home', 'opponent': away,
+                     'outcome': home_outcome, 'team_score': home_score, 'opp_score': away_score},
+                    {'team': away, 'date': game['date'], 'home_away': 'Away', 'opponent': home,
+                     'outcome': away_outcome, 'team_score': away_score, 'opp_score': home_score}):
+            self.team_stats.add_result(row)
+            self.elo.add_result(row)
+            self.h2h.add_result(row)
+
+
+# =============================================================================
+# BACKTEST
+# =============================================================================
+
+def walk_forward(games, models, min_history=MIN_HISTORY, keep_predictions=True):
+    """
+    Score every model on each game before applying it, in one pass
+
+    games are common game dicts in date order (see schedule_games and
+    games_from_results). Returns {model name: results} with correct, total,
+    accuracy (%), brier, log_loss and the per-game predictions.
+    """
+    results = {model.name: {'correct': 0, 'total': 0, 'brier_sum': 0.0, 'log_loss_sum': 0.0,
+                            'predictions': []} for model in models}
+
+    start = time.perf_counter()
+    for i, game in enumerate(games):
+        away, home = game['away_team'], game['home_team']
+        away_score, home_score = game['away_score'], game['home_score']
+
+        # Ties only update state; only predict once there is some history
+        if away_score != home_score and i >= min_history:
+            actual_winner = away if away_score > home_score else home
+            home_won = home_score > away_score
+            for model in models:
+                winner, confidence, home_prob = model.predict(game)
+                is_correct = winner == actual_winner
+                p = min(max(home_prob, PROB_EPSILON), 1 - PROB_EPSILON)
+
+                result = results[model.name]
+                result['correct'] += is_correct
+                result['total'] += 1
+                result['brier_sum'] += (home_prob - home_won) ** 2
+                result['log_loss_sum'] -= math.log(p if home_won else 1 - p)
+                if keep_predictions:
+                    result['predictions'].append({
+                        'date': game['date'],
+                        'game': f"{away} @ {home}",
+                        'predicted': winner,
+                        'actual': actual_winner,
+                        'confidence': confidence,
+                        'home_prob': round(home_prob, 4),
+                        'home_won': home_won,
+                        'correct': is_correct
+                    })
+
+        for model in models:
+            model.apply(game)
+    elapsed = time.perf_counter() - start
+
+    for result in results.values():
+        total = result['total']
+        result['accuracy'] = (result['correct'] / total * 100) if total > 0 else 0
+        result['brier'] = result.pop('brier_sum') / total if total else None
+        result['log_loss'] = result.pop('log_loss_sum') / total if total else None
+        result['games'] = len(games)
+        result['elapsed_seconds'] = round(elapsed, 3)
+
+    return results
+
+
+def add_confidence_intervals(results, resamples=RESAMPLES):
+    """
+    Bootstrap intervals for each model, and paired intervals against the first
+
+    Needs the per-game predictions (walk_forward with keep_predictions=True).
+    Adds 'intervals' to every model and 'vs_<first model>' to the others.
+    """
+    names = [name for name, result in results.items() if result['predictions']]
+    for name in names:
+        predictions = results[name]['predictions']
+        results[name]['intervals'] = bootstrap_metrics(
+            [p['home_won'] for p in predictions], home_prob=[p['home_prob'] for p in predictions],
+            correct=[p['correct'] for p in predictions], resamples=resamples)
+
+    # Every model scores the same games in the same order, so they pair up
+    if len(names) > 1:
+        base = results[names[0]]['predictions']
+        home_won = [p['home_won'] for p in base]
+        baseline = {'correct': [p['correct'] for p in base], 'home_prob': [p['home_prob'] for p in base]}
+        for name in names[1:]:
+            predictions = results[name]['predictions']
+            results[name][f'vs_{names[0]}'] = paired_bootstrap(
+                home_won, baseline, {'correct': [p['correct'] for p in predictions],
+                                     'home_prob': [p['home_prob'] for p in predictions]},
+                resamples=resamples)
+    return results
+
+
+def load_engine_sources():
+    """The engine inputs EngineModel needs, plus the local game results"""
+    names = ['games', 'team_rankings', 'roster', 'mhr_rankings', 'jspr_rankings', 'nehj_rankings']
+    with SourceLoader({name: DATA_SOURCE_LOADERS[name] for name in names}) as sources:
+        return {
+            'games': sources.get('games'),
+            'roster_rankings': calculate_age_adjusted_rankings(sources.get('roster'), sources.get('team_rankings')),
+            'mhr_rankings': sources.get('mhr_rankings'),
+            'jspr_rankings': sources.get('jspr_rankings'),
+            'nehj_rankings': sources.get('nehj_rankings'),
+        }
+
+
+def build_models(names, engine_sources=None):
+    """Model adapters by name; the BigQuery models load their own rankings"""
+    models = []
+    for name in names:
+        if name == 'engine':
+            models.append(EngineModel(engine_sources if engine_sources is not None else load_engine_sources()))
+        elif name == 'enhanced':
+            import enhanced_prediction_model
+            models.append(EnhancedModel(enhanced_prediction_model.load_team_rankings()))
+        elif name == 'v3':
+            import prediction_model_v3
+            models.append(V3Model(prediction_model_v3.load_team_rankings()))
+        elif name == 'v3_final':
+            import prediction_model_v3_final
+            rankings, _ = prediction_model_v3_final.load_team_data()
+            models.append(V3FinalModel(rankings))
+        else:
+            raise ValueError(f"Unknown model {name!r} (expected one of {', '.join(MODEL_NAMES)})")
+    return models
+
+
+def print_backtest(results):
+    """Print one line per model"""
+    print("\n" + "=" * 70)
+    print("WALK-FORWARD BACKTEST")
+    print("=" * 70)
+    print(f"{'Model':<12} {'Correct':>9} {'Accuracy':>9} {'Brier':>8} {'Log loss':>9}")
+    print("-" * 70)
+    for name, result in results.items():
+        brier = f"{result['brier']:.4f}" if result['brier'] is not None else '-'
+        log_loss = f"{result['log_loss']:.4f}" if result['log_loss'] is not None else '-'
+        print(f"{name:<12} {result['correct']:>4}/{result['total']:<4} {result['accuracy']:>8.1f}% "
+              f"{brier:>8} {log_loss:>9}")
+
+    intervals = {name: result['intervals'] for name, result in results.items() if 'intervals' in result}
+    if intervals:
+        print("\n95% bootstrap intervals:")
+        for name, ci in intervals.items():
+            print(f"  {name:<12} accuracy {format_interval(ci['accuracy'], '%')}, "
+                  f"log loss {format_interval(ci['log_loss'], digits=4)}, "
+                  f"calibration {format_interval(ci['calibration'], digits=4)}")
+        for name, result in results.items():
+            for key, diff in result.items():
+                if key.startswith('vs_'):
+                    print(f"  {name} {key.replace('_', ' ', 1)}: accuracy "
+                          f"{format_interval(diff['accuracy'], '%', signed=True)} "
+                          f"(better in {diff['accuracy']['prob_better']:.0%}), log loss "
+                          f"{format_interval(diff['log_loss'], digits=4, signed=True)}")
+
+    if results:
+        first = next(iter(results.values()))
+        print(f"\n{first['games']} games replayed in {first['elapsed_seconds']}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC walk-forward backtester')
+    parser.add_argument('--source', choices=['local', 'bigquery'], default='local',
+                        help='Completed games from the local results CSV or the BigQuery schedule')
+    parser.add_argument('--models', nargs='+', choices=MODEL_NAMES,
+                        help='Models to evaluate (default: engine for local, the BigQuery models for bigquery)')
+    parser.add_argument('--min-history', type=int, default=MIN_HISTORY, help='Warm-up games before scoring')
+    parser.add_argument('--resamples', type=int, default=RESAMPLES,
+                        help='Bootstrap resamples for the confidence intervals (0 to skip)')
+    parser.add_argument('--output', help='Save results (with per-game predictions) to this JSON file')
+    args = parser.parse_args()
+
+    engine_sources = None
+    if args.source == 'local':
+        engine_sources = load_engine_sources()
+        games = games_from_results(engine_sources['games'])
+        names = args.models or ['engine']
+    else:
+        import enhanced_prediction_model
+        games = schedule_games(enhanced_prediction_model.load_completed_games())
+        names = args.models or ['enhanced', 'v3', 'v3_final']
+
+    print(f"Replaying {len(games)} games through {', '.join(names)}...")
+    results = walk_forward(games, build_models(names, engine_sources), min_history=args.min_history)
+    if args.resamples:
+        add_confidence_intervals(results, args.resamples)
+    print_backtest(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"\nSaved backtest results to {args.output}")
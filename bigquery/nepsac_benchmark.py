@@ -0,0 +1,361 @@
+"""
+NEPSAC Engine Benchmarks
+Synthetic-league scaling benchmarks for nepsac_prediction_engine.py
+
+Generates a synthetic league in the same CSV/JSON shapes the engine's
+loaders read (results, team rankings, rosters, MHR/JSPR/NEHJ rankings and
+the schedule), then times the main stages at several league sizes:
+
+- load_game_results
+- calculate_team_stats
+- calculate_performance_rankings
+- predict_game (scalar path, per call) and predict_games (batch)
+- generate_all_predictions (end to end, from the generated files)
+- calculate_prodigy_power_rankings
+- save_predictions / save_power_rankings as Parquet (when pyarrow is
+  installed; the league mixes ranked and unranked teams, so this also
+  checks that placeholder ranks don't break the Parquet schema)
+
+Results are compared against stored baselines (nepsac_benchmark_baselines.json)
+and anything slower than the threshold is flagged as a regression.
+
+Usage:
+  python nepsac_benchmark.py                          # today + regional scales
+  python nepsac_benchmark.py --scales today national  # pick scales
+  python nepsac_benchmark.py --save-baseline          # record new baselines
+  python nepsac_benchmark.py --fail-on-regression     # exit 1 on regressions (CI)
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from nepsac_prediction_engine import (
+    calculate_performance_rankings,
+    calculate_prodigy_power_rankings,
+    calculate_team_stats,
+    generate_all_predictions,
+    load_expert_rankings,
+    load_game_results,
+    load_jspr_rankings,
+    load_mhr_rankings,
+    load_nehj_expert_rankings,
+    load_player_roster,
+    load_schedule,
+    load_team_rankings,
+    predict_game,
+    predict_games,
+    save_power_rankings,
+    save_predictions,
+)
+
+BASELINE_FILE = 'nepsac_benchmark_baselines.json'
+
+# League sizes: teams, result rows (two per game, one from each side),
+# scheduled games to predict, players per roster
+SCALES = {
+    'today':    {'teams': 60,   'games': 1_200,   'scheduled': 300,    'roster_size': 22},
+    'regional': {'teams': 300,  'games': 20_000,  'scheduled': 2_000,  'roster_size': 22},
+    'national': {'teams': 2000, 'games': 200_000, 'scheduled': 20_000, 'roster_size': 22},
+    'max':      {'teams': 5000, 'games': 500_000, 'scheduled': 50_000, 'roster_size': 22},
+}
+DEFAULT_SCALES = ['today', 'regional']
+
+# Scalar predict_game scans every result for head-to-head, so only a sample is timed
+PREDICT_GAME_CALLS = 200
+
+# Flag a benchmark whose time exceeds baseline * threshold
+REGRESSION_THRESHOLD = 1.25
+
+SEASON_START = datetime(2025, 11, 15)
+SEASON_DAYS = 110
+
+FILE_NAMES = {
+    'games': 'nz_boys_prep_results_only.csv',
+    'team_rankings': 'nepsac_team_rankings_full.csv',
+    'schedule': 'nepsac_full_schedule.json',
+    'roster': 'neutralzone_prep_boys_hockey_data_clean.csv',
+    'mhr_rankings': 'nepsac_mhr_rankings_jan21.csv',
+    'expert_rankings': 'nepsac_expert_rankings_jan21.csv',
+    'jspr_rankings': 'nepsac_jspr_rankings.csv',
+    'nehj_rankings': 'nepsac_nehj_expert_rankings.csv',
+}
+
+
+# =============================================================================
+# SYNTHETIC LEAGUE
+# =============================================================================
+
+def generate_league(out_dir, teams, games, scheduled, roster_size, seed=0):
+    """
+    Write a synthetic league to out_dir in the loaders' file formats
+
+    Each team gets a hidden strength that drives results, rankings and
+    roster points, so the sources agree with each other the way real ones do.
+    Returns the team names.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    names = [f"synthetic prep {i:05d}" for i in range(teams)]
+    strength = rng.normal(0, 1, teams)
+    order = np.argsort(-strength)
+
+    # Results: each game is two rows, one from each team's perspective
+    num_games = games // 2
+    home = rng.integers(0, teams, num_games)
+    away = (home + rng.integers(1, teams, num_games)) % teams
+    days = np.sort(rng.integers(0, SEASON_DAYS, num_games))
+    home_goals = rng.poisson(np.clip(3 + 0.6 * (strength[home] - strength[away]) + 0.2, 0.3, None))
+    away_goals = rng.poisson(np.clip(3 + 0.6 * (strength[away] - strength[home]), 0.3, None))
+    outcome_for = {1: 'Win', -1: 'Loss', 0: 'Tie'}
+
+    with open(os.path.join(out_dir, FILE_NAMES['games']), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Team', 'Date', 'Home/Away', 'Opponent', 'Outcome', 'Team Score', 'Opponent Score'])
+        for h, a, d, hg, ag in zip(home.tolist(), away.tolist(), days.tolist(),
+                                   home_goals.tolist(), away_goals.tolist()):
+            date = (SEASON_START + timedelta(days=d)).strftime('%m/%d/%Y')
+            result = (hg > ag) - (hg < ag)
+            writer.writerow([names[h].title(), date, 'Home', names[a].title(), outcome_for[result], hg, ag])
+            writer.writerow([names[a].title(), date, 'Away', names[h].title(), outcome_for[-result], ag, hg])
+
+    # Rosters and roster-based team rankings
+    with open(os.path.join(out_dir, FILE_NAMES['roster']), 'w', newline='', encoding='utf-8') as f_roster, \
+            open(os.path.join(out_dir, FILE_NAMES['team_rankings']), 'w', newline='', encoding='utf-8') as f_rank:
+        roster_writer = csv.writer(f_roster)
+        roster_writer.writerow(['team', 'player_name', 'rank', 'grad_year', 'position'])
+        rank_writer = csv.writer(f_rank)
+        rank_writer.writerow(['rank', 'team', 'avg_points', 'total_points', 'max_points', 'roster_size'])
+
+        player_ranks = rng.integers(1, 1900, (teams, roster_size)) - (strength[:, None] * 150).astype(int)
+        player_ranks = np.clip(player_ranks, 1, 1999)
+        grad_years = rng.integers(2026, 2030, (teams, roster_size))
+        points = np.maximum(0, 10000 - player_ranks * 5)
+        for rank, t in enumerate(order.tolist(), 1):
+            for p in range(roster_size):
+                roster_writer.writerow([names[t].title(), f"Player {t}-{p}", int(player_ranks[t, p]),
+                                        int(grad_years[t, p]), random.choice('FDG')])
+            rank_writer.writerow([rank, names[t].title(), round(float(points[t].mean()), 1),
+                                  round(float(points[t].sum()), 1), round(float(points[t].max()), 1), roster_size])
+
+    # MHR for everyone, JSPR / NEHJ for the top teams only (like the real sources)
+    with open(os.path.join(out_dir, FILE_NAMES['mhr_rankings']), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['mhr_rank', 'team', 'rating', 'agd', 'schedule_strength', 'wins', 'losses', 'ties'])
+        for rank, t in enumerate(order.tolist(), 1):
+            writer.writerow([rank, names[t].title(), round(94 + 2.5 * strength[t], 2),
+                             round(strength[t], 2), 94.0, 0, 0, 0])
+
+    with open(os.path.join(out_dir, FILE_NAMES['jspr_rankings']), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'team', 'rpi_rank', 'points', 'rpi', 'updated'])
+        for rank, t in enumerate(order[:min(teams, 40)].tolist(), 1):
+            writer.writerow([rank, names[t].title(), rank, 40 - rank, round(0.58 + 0.03 * strength[t], 4), '2026-01-26'])
+
+    with open(os.path.join(out_dir, FILE_NAMES['nehj_rankings']), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'team', 'record', 'wins', 'losses', 'ties', 'notes', 'updated'])
+        for rank, t in enumerate(order[:min(teams, 14)].tolist(), 1):
+            writer.writerow([rank, names[t].title(), '', '', '', '', '', '2026-01-26'])
+
+    # Schedule of games to predict
+    sched_home = rng.integers(0, teams, scheduled)
+    sched_away = (sched_home + rng.integers(1, teams, scheduled)) % teams
+    schedule = {'dates': {}}
+    for n, (h, a) in enumerate(zip(sched_home.tolist(), sched_away.tolist())):
+        date = (SEASON_START + timedelta(days=SEASON_DAYS + n % 30)).strftime('%Y-%m-%d')
+        schedule['dates'].setdefault(date, []).append({
+            'gameId': f"syn-{n}", 'awayTeam': names[a].title(), 'homeTeam': names[h].title(),
+            'time': '3:00 PM', 'location': f"{names[h].title()} Rink"
+        })
+    with open(os.path.join(out_dir, FILE_NAMES['schedule']), 'w', encoding='utf-8') as f:
+        json.dump(schedule, f)
+
+    return names
+
+
+def league_loaders(data_dir):
+    """DATA_SOURCE_LOADERS overrides that read the synthetic league in data_dir"""
+    loaders = {
+        'games': load_game_results,
+        'team_rankings': load_team_rankings,
+        'schedule': load_schedule,
+        'roster': load_player_roster,
+        'mhr_rankings': load_mhr_rankings,
+        'expert_rankings': load_expert_rankings,
+        'jspr_rankings': load_jspr_rankings,
+        'nehj_rankings': load_nehj_expert_rankings,
+    }
+    return {name: (lambda loader=loader, path=os.path.join(data_dir, FILE_NAMES[name]): loader(path))
+            for name, loader in loaders.items()}
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def _best_of(func, repeats):
+    """Best wall time over repeats calls, plus the last result"""
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_scale(scale, data_dir, repeats=3, seed=0):
+    """Generate one league size and time every benchmark; returns {benchmark: seconds}"""
+    config = SCALES[scale]
+    generate_league(data_dir, seed=seed, **config)
+    timings = {}
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    timings['load_game_results'], games = _best_of(
+        lambda: load_game_results(os.path.join(data_dir, FILE_NAMES['games'])), repeats)
+    timings['calculate_team_stats'], team_stats = _best_of(lambda: calculate_team_stats(games), repeats)
+    timings['calculate_performance_rankings'], _ = _best_of(
+        lambda: calculate_performance_rankings(games), repeats)
+
+    with quiet:
+        timings['generate_all_predictions'], (predictions, sources) = _best_of(
+            lambda: generate_all_predictions(loaders=league_loaders(data_dir)), repeats)
+
+    schedule = [(g['awayTeam'], g['homeTeam'])
+                for date_games in load_schedule(os.path.join(data_dir, FILE_NAMES['schedule']))['dates'].values()
+                for g in date_games]
+    timings['predict_games'], _ = _best_of(
+        lambda: predict_games(schedule, sources, feature_store=sources['feature_store']), repeats)
+
+    sample = schedule[:PREDICT_GAME_CALLS]
+
+    def scalar_predictions():
+        for away, home in sample:
+            predict_game(away, home, sources['roster_rankings'], sources['team_stats'], games,
+                         mhr_rankings=sources['mhr_rankings'], jspr_rankings=sources['jspr_rankings'],
+                         performance_rankings=sources['performance_rankings'],
+                         nehj_rankings=sources['nehj_rankings'])
+
+    seconds, _ = _best_of(scalar_predictions, 1)
+    timings['predict_game_per_call'] = seconds / len(sample)
+
+    timings['calculate_prodigy_power_rankings'], power_rankings = _best_of(
+        lambda: calculate_prodigy_power_rankings(
+            sources['jspr_rankings'], sources['nehj_rankings'], sources['performance_rankings'],
+            sources['mhr_rankings'], sources['team_stats'], sources['roster_rankings'],
+            feature_store=sources['feature_store']), repeats)
+
+    # JSPR / NEHJ only rank the top teams, so these files mix ranks and 'NR'
+    # in the same columns; writing them checks the Parquet schema handling
+    if importlib.util.find_spec('pyarrow') is not None:
+        with tempfile.TemporaryDirectory() as out_dir, quiet:
+            timings['save_parquet'], _ = _best_of(lambda: (
+                save_predictions(predictions, os.path.join(out_dir, 'predictions.json'), 'parquet'),
+                save_power_rankings(power_rankings, os.path.join(out_dir, 'power_rankings.csv'),
+                                    os.path.join(out_dir, 'power_rankings.json'), output_format='parquet'),
+            ), 1)
+
+    return {name: round(seconds, 6) for name, seconds in timings.items()}
+
+
+def compare_to_baseline(results, baselines, threshold=REGRESSION_THRESHOLD):
+    """List (scale, benchmark, baseline, current, ratio) for every benchmark slower than threshold"""
+    regressions = []
+    for scale, timings in results.items():
+        for name, seconds in timings.items():
+            baseline = baselines.get(scale, {}).get(name)
+            if baseline and seconds > baseline * threshold:
+                regressions.append((scale, name, baseline, seconds, seconds / baseline))
+    return regressions
+
+
+def load_baselines(filepath=BASELINE_FILE):
+    """Stored baseline timings by scale (empty if none saved yet)"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)['scales']
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(results, filepath=BASELINE_FILE):
+    """Merge results into the stored baselines"""
+    scales = load_baselines(filepath)
+    scales.update(results)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({
+            'updated': datetime.now().strftime('%Y-%m-%d'),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'scales': scales
+        }, f, indent=2)
+    print(f"\nSaved baselines to {filepath}")
+
+
+def print_results(results, baselines):
+    """Print each scale's timings next to its baseline"""
+    for scale, timings in results.items():
+        config = SCALES[scale]
+        print(f"\n{scale}: {config['teams']:,} teams, {config['games']:,} result rows, "
+              f"{config['scheduled']:,} scheduled games")
+        print(f"  {'Benchmark':<36}{'Seconds':>12}{'Baseline':>12}{'Ratio':>8}")
+        print("  " + "-" * 68)
+        for name, seconds in timings.items():
+            baseline = baselines.get(scale, {}).get(name)
+            ratio = f"{seconds / baseline:.2f}x" if baseline else '-'
+            baseline_text = f"{baseline:.6f}" if baseline else '-'
+            print(f"  {name:<36}{seconds:>12.6f}{baseline_text:>12}{ratio:>8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC engine scaling benchmarks')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=DEFAULT_SCALES,
+                        help='League sizes to benchmark')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per benchmark (best time is kept)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic league seed')
+    parser.add_argument('--data-dir', help='Keep generated leagues here (default: temporary directory)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Slowdown ratio that counts as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scales:
+            print(f"Benchmarking {scale}...")
+            data_dir = os.path.join(args.data_dir or tmp_dir, scale)
+            results[scale] = run_scale(scale, data_dir, repeats=args.repeats, seed=args.seed)
+
+    baselines = load_baselines(args.baseline)
+    print_results(results, baselines)
+
+    regressions = compare_to_baseline(results, baselines, args.threshold)
+    if regressions:
+        print(f"\nREGRESSIONS (> {args.threshold:.2f}x baseline):")
+        for scale, name, baseline, seconds, ratio in regressions:
+            print(f"  {scale}/{name}: {baseline:.6f}s -> {seconds:.6f}s ({ratio:.2f}x)")
+    elif baselines:
+        print("\nNo regressions against baseline")
+
+    if args.save_baseline:
+        save_baselines(results, args.baseline)
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
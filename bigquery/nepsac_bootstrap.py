@@ -0,0 +1,154 @@
+"""
+NEPSAC Bootstrap Confidence Intervals
+Uncertainty for backtest accuracy, log loss and calibration
+
+Resamples the scored games with replacement and reports percentile intervals.
+All resamples are drawn at once as a (resamples x games) index matrix and every
+metric is a NumPy reduction over it, so 10,000 resamples of a season take a
+fraction of a second and can run inside every backtest.
+
+- bootstrap_metrics     interval for one model's accuracy, log loss and
+                        calibration error
+- paired_bootstrap      interval for the difference between two models scored
+                        on the same games (same resampled games for both), and
+                        the share of resamples in which the second one is better
+
+Calibration is the expected calibration error over CALIBRATION_BINS equal-width
+bins of the home win probability.
+
+Usage:
+  from nepsac_bootstrap import bootstrap_metrics, paired_bootstrap
+
+  ci = bootstrap_metrics(home_won, home_prob=probs, correct=correct)
+  diff = paired_bootstrap(home_won, {'correct': old_correct}, {'correct': new_correct})
+  print(format_interval(diff['accuracy'], '%', signed=True))
+"""
+
+import numpy as np
+
+RESAMPLES = 10000
+CONFIDENCE = 0.95
+CALIBRATION_BINS = 10
+
+# Index matrix cells per chunk (resamples x games), to bound memory on long backtests
+MAX_CHUNK_CELLS = 1 << 24
+
+# Probabilities are clipped before log loss so a 0/1 call can't score infinity
+PROB_EPSILON = 1e-6
+
+
+# =============================================================================
+# RESAMPLING
+# =============================================================================
+
+def resample_indices(num_games, resamples=RESAMPLES, seed=0):
+    """Yield (chunk x num_games) bootstrap index matrices covering `resamples` rows"""
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MAX_CHUNK_CELLS // max(num_games, 1))
+    for start in range(0, resamples, chunk):
+        yield rng.integers(0, num_games, size=(min(chunk, resamples - start), num_games), dtype=np.int32)
+
+
+def _per_game(home_won, home_prob=None, correct=None):
+    """Per-game arrays the metrics are means of"""
+    home_won = np.asarray(home_won, dtype=float)
+    values = {}
+    if correct is None and home_prob is not None:
+        correct = (np.asarray(home_prob) > 0.5) == (home_won == 1)
+    if correct is not None:
+        values['accuracy'] = np.asarray(correct, dtype=float) * 100
+    if home_prob is not None:
+        p = np.clip(np.asarray(home_prob, dtype=float), PROB_EPSILON, 1 - PROB_EPSILON)
+        values['log_loss'] = -(home_won * np.log(p) + (1 - home_won) * np.log(1 - p))
+    return values
+
+
+def _calibration_error(home_won, home_prob, indices):
+    """Expected calibration error of each resample (one row of indices each)"""
+    bins = np.minimum((np.asarray(home_prob) * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    # Per (resample, bin) sums of probability minus outcome, via one flat bincount
+    flat = (np.arange(len(indices))[:, None] * CALIBRATION_BINS + bins[indices]).ravel()
+    gap = np.bincount(flat, weights=(np.asarray(home_prob) - home_won)[indices].ravel(),
+                      minlength=len(indices) * CALIBRATION_BINS)
+    return np.abs(gap.reshape(len(indices), CALIBRATION_BINS)).sum(axis=1) / indices.shape[1]
+
+
+def _resampled(home_won, home_prob, values, indices):
+    """{metric: value per resample} for one chunk of index rows"""
+    stats = {name: v[indices].mean(axis=1) for name, v in values.items()}
+    if home_prob is not None:
+        stats['calibration'] = _calibration_error(home_won, home_prob, indices)
+    return stats
+
+
+def _interval(estimate, samples, confidence):
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [alpha, 100 - alpha])
+    return {'estimate': float(estimate), 'low': float(low), 'high': float(high)}
+
+
+# =============================================================================
+# INTERVALS
+# =============================================================================
+
+def bootstrap_metrics(home_won, home_prob=None, correct=None, resamples=RESAMPLES,
+                      confidence=CONFIDENCE, seed=0):
+    """
+    Percentile bootstrap intervals for one model
+
+    home_won is 1/0 per scored game. correct (per-game hits) gives accuracy;
+    without it accuracy is taken from home_prob > 0.5. home_prob also gives
+    log loss and calibration. Returns {metric: {estimate, low, high}}.
+    """
+    home_won = np.asarray(home_won, dtype=float)
+    home_prob = None if home_prob is None else np.asarray(home_prob, dtype=float)
+    values = _per_game(home_won, home_prob, correct)
+
+    chunks = [_resampled(home_won, home_prob, values, indices)
+              for indices in resample_indices(len(home_won), resamples, seed)]
+    full = np.arange(len(home_won))[None, :]
+    estimates = _resampled(home_won, home_prob, values, full)
+    return {name: _interval(estimates[name][0], np.concatenate([c[name] for c in chunks]), confidence)
+            for name in estimates}
+
+
+def paired_bootstrap(home_won, model_a, model_b, resamples=RESAMPLES, confidence=CONFIDENCE, seed=0):
+    """
+    Intervals for model_b minus model_a on the same games
+
+    Each model is a dict with 'correct' and/or 'home_prob' per game. Both
+    models are scored on the same resampled games, so the interval reflects
+    how much they disagree rather than the spread of each alone.
+    prob_better is the share of resamples in which model_b is better (higher
+    accuracy, lower log loss / calibration error).
+    """
+    home_won = np.asarray(home_won, dtype=float)
+    probs = [None if m.get('home_prob') is None else np.asarray(m['home_prob'], dtype=float)
+             for m in (model_a, model_b)]
+    values = [_per_game(home_won, p, m.get('correct')) for p, m in zip(probs, (model_a, model_b))]
+    shared = [name for name in values[0] if name in values[1]]
+    if probs[0] is not None and probs[1] is not None:
+        shared.append('calibration')
+
+    def differences(indices):
+        a, b = (_resampled(home_won, p, v, indices) for p, v in zip(probs, values))
+        return {name: b[name] - a[name] for name in shared}
+
+    chunks = [differences(indices) for indices in resample_indices(len(home_won), resamples, seed)]
+    estimates = differences(np.arange(len(home_won))[None, :])
+
+    result = {}
+    for name in shared:
+        samples = np.concatenate([c[name] for c in chunks])
+        better = samples > 0 if name == 'accuracy' else samples < 0
+        result[name] = {**_interval(estimates[name][0], samples, confidence),
+                        'prob_better': float(better.mean())}
+    return result
+
+
+def format_interval(interval, unit='', digits=1, signed=False):
+    """'+2.1% [-1.8%, +6.0%]' style text for an interval dict"""
+    sign = '+' if signed else ''
+    fmt = f"{{:{sign}.{digits}f}}{unit}"
+    return (f"{fmt.format(interval['estimate'])} "
+            f"[{fmt.format(interval['low'])}, {fmt.format(interval['high'])}]")
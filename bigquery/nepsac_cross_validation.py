@@ -0,0 +1,305 @@
+"""
+NEPSAC Time-Series Cross-Validation
+Rolling-origin evaluation of the prediction weights on completed games
+
+Completed nepsac_schedule games (prediction_model_optimizer's training data)
+are ordered by date and split into expanding folds: each fold trains on every
+game before its test block and is scored on the block of dates that follows.
+Games on the same date always land in the same block.
+
+The results-based features (wins, losses, goals for/against, and form and win
+% derived from them) are rebuilt by replaying every completed game, so each
+game sees the standings as of the day before it was played rather than the
+final nepsac_standings table. The roster features (prodigy points, OVR) are
+still the current nepsac_team_rankings snapshot; there is no dated history of
+those to replay.
+
+Every (model, fold) fit runs in its own worker process. Models:
+- current   CURRENT_WEIGHTS from prediction_model_optimizer, no fitting
+- logistic  fit_logistic (exact-gradient Newton, L2) on the training block
+
+Reports accuracy, log loss and Brier score per fold plus a test-size weighted
+summary per model.
+
+Usage:
+  python nepsac_cross_validation.py                       # 5 folds, all cores
+  python nepsac_cross_validation.py --folds 8 --min-train 0.3 --l2 0.1
+  NEPSAC_OFFLINE=1 python nepsac_cross_validation.py      # from the local snapshot
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from bq_snapshot import SnapshotRow, column_arrays, snapshot_query
+from prediction_model_optimizer import (
+    CURRENT_WEIGHTS,
+    L2_PENALTY,
+    client,
+    extract_feature_matrix,
+    fetch_training_data,
+    accuracy,
+    fit_logistic,
+    log_loss,
+    sigmoid,
+)
+
+DEFAULT_FOLDS = 5
+MIN_TRAIN_FRACTION = 0.4
+CV_MODELS = ['current', 'logistic']
+
+# Standings columns of the training rows that are replaced by as-of values
+RESULT_COLUMNS = ['wins', 'losses', 'gf', 'ga']
+
+OUTPUT_FILE = 'nepsac_cross_validation.json'
+
+
+# =============================================================================
+# DATA AND FOLDS
+# =============================================================================
+
+def fetch_completed_games():
+    """Every scored 2025-26 game, predicted or not, for replaying the standings"""
+    query = '''
+    SELECT
+        game_id, game_date, away_team_id, home_team_id,
+        CAST(away_score AS INT64) as away_score,
+        CAST(home_score AS INT64) as home_score
+    FROM `prodigy-ranking.algorithm_core.nepsac_schedule`
+    WHERE season = '2025-26' AND status = 'final' AND away_score IS NOT NULL
+    ORDER BY game_date ASC
+    '''
+    return snapshot_query(client, query)
+
+
+def as_of_rows(rows, games):
+    """
+    Copies of rows with the standings columns as of the day before each game
+
+    games (schedule rows with team ids and scores) are replayed in date order;
+    a row's away_/home_ wins, losses, gf and ga count only games on earlier
+    dates, so games on the same day never see each other's results.
+    """
+    games = sorted(games, key=lambda g: str(g['game_date']))
+    standings = defaultdict(lambda: dict.fromkeys(RESULT_COLUMNS, 0))
+    applied = 0
+
+    result = [None] * len(rows)
+    for i in sorted(range(len(rows)), key=lambda i: str(rows[i]['game_date'])):
+        date = str(rows[i]['game_date'])
+        while applied < len(games) and str(games[applied]['game_date']) < date:
+            game = games[applied]
+            for team, goals_for, goals_against in [
+                    (game['away_team_id'], game['away_score'], game['home_score']),
+                    (game['home_team_id'], game['home_score'], game['away_score'])]:
+                record = standings[team]
+                record['wins'] += goals_for > goals_against
+                record['losses'] += goals_for < goals_against
+                record['gf'] += goals_for
+                record['ga'] += goals_against
+            applied += 1
+
+        row = SnapshotRow(rows[i])
+        for side in ('away', 'home'):
+            record = standings.get(row[f'{side}_team_id'], {})
+            for column in RESULT_COLUMNS:
+                row[f'{side}_{column}'] = record.get(column, 0)
+        result[i] = row
+    return result
+
+
+def load_cv_data(rows=None, games=None):
+    """
+    Features, outcomes (1 = home win) and dates of completed non-tie games, in date order
+
+    Standings features are as of the day before each game (see as_of_rows),
+    replayed from games (default: every completed game, or rows themselves
+    when rows are passed in).
+    """
+    if rows is None:
+        rows = fetch_training_data()
+        if games is None:
+            games = fetch_completed_games()
+    rows = as_of_rows(rows, rows if games is None else games)
+    scores = column_arrays(rows, ['home_score', 'away_score'])
+    decided = scores['home_score'] != scores['away_score']
+    dates = np.array([str(row['game_date']) for row in rows])
+
+    order = np.argsort(dates[decided], kind='stable')
+    return {
+        'X': extract_feature_matrix(rows)[decided][order],
+        'y': (scores['home_score'] > scores['away_score'])[decided][order].astype(int),
+        'dates': dates[decided][order],
+    }
+
+
+def rolling_origin_folds(dates, num_folds=DEFAULT_FOLDS, min_train_fraction=MIN_TRAIN_FRACTION):
+    """
+    Expanding-window (train, test) index arrays over date-sorted games
+
+    The first min_train_fraction of games only ever train; the rest is cut
+    into num_folds test blocks of roughly equal size, on date boundaries.
+    """
+    dates = np.asarray(dates)
+    num_games = len(dates)
+    start = int(num_games * min_train_fraction)
+
+    # Block edges at equal game counts, pulled back to the first game on that date
+    edges = np.linspace(start, num_games, num_folds + 1).astype(int)[:-1]
+    edges = np.searchsorted(dates, dates[np.minimum(edges, num_games - 1)], side='left')
+    edges = np.unique(np.append(edges[edges > 0], num_games))
+
+    folds = []
+    for test_start, test_end in zip(edges[:-1], edges[1:]):
+        folds.append((np.arange(test_start), np.arange(test_start, test_end)))
+    return folds
+
+
+# =============================================================================
+# FOLD EVALUATION
+# =============================================================================
+
+_DATA = None
+
+
+def _init_worker(data):
+    """Process pool initializer: keep the feature matrix in the worker"""
+    global _DATA
+    _DATA = data
+
+
+def evaluate_fold(data, model, train_idx, test_idx, l2=L2_PENALTY):
+    """Fit model on the training games and score it on the test games"""
+    X, y = data['X'], data['y']
+
+    start = time.perf_counter()
+    if model == 'logistic':
+        fitted = fit_logistic(X[train_idx], y[train_idx], l2=l2, starts=1)
+        weights = fitted['weights']
+    elif model == 'current':
+        weights = np.array(list(CURRENT_WEIGHTS.values()))
+    else:
+        raise ValueError(f"Unknown model {model!r} (expected one of {', '.join(CV_MODELS)})")
+    fit_seconds = time.perf_counter() - start
+
+    X_test, y_test = X[test_idx], y[test_idx]
+    return {
+        'model': model,
+        'train_games': len(train_idx),
+        'test_games': len(test_idx),
+        'test_start': str(data['dates'][test_idx[0]]),
+        'test_end': str(data['dates'][test_idx[-1]]),
+        'accuracy': float(accuracy(weights, X_test, y_test) * 100),
+        'log_loss': float(log_loss(weights, X_test, y_test)),
+        'brier': float(np.mean((sigmoid(X_test @ weights) - y_test) ** 2)),
+        'fit_seconds': round(fit_seconds, 4),
+    }
+
+
+def _evaluate_fold_job(job):
+    """Process pool entry point"""
+    model, train_idx, test_idx, l2 = job
+    return evaluate_fold(_DATA, model, train_idx, test_idx, l2)
+
+
+def cross_validate(data, models=CV_MODELS, num_folds=DEFAULT_FOLDS,
+                   min_train_fraction=MIN_TRAIN_FRACTION, l2=L2_PENALTY, workers=None):
+    """
+    Run every (model, fold) pair across a process pool (workers=1 runs in-process)
+
+    Returns per-fold results and a summary per model (metrics weighted by
+    each fold's test size).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    folds = rolling_origin_folds(data['dates'], num_folds, min_train_fraction)
+    jobs = [(model, train_idx, test_idx, l2) for model in models for train_idx, test_idx in folds]
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(data)
+        results = [_evaluate_fold_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data,)) as pool:
+            results = list(pool.map(_evaluate_fold_job, jobs))
+    elapsed = time.perf_counter() - start
+
+    summary = {}
+    for model in models:
+        model_folds = [r for r in results if r['model'] == model]
+        sizes = np.array([r['test_games'] for r in model_folds])
+        summary[model] = {
+            metric: round(float(np.average([r[metric] for r in model_folds], weights=sizes)), 4)
+            for metric in ['accuracy', 'log_loss', 'brier']
+        } if model_folds else {}
+        for fold, result in enumerate(model_folds, 1):
+            result['fold'] = fold
+
+    return {
+        'games': len(data['y']),
+        'folds': len(folds),
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'summary': summary,
+        'results': results,
+    }
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def print_cross_validation(cv):
+    """Print per-fold metrics and the summary per model"""
+    print("\n" + "=" * 80)
+    print(f"ROLLING-ORIGIN CROSS-VALIDATION - {cv['games']} games, {cv['folds']} folds")
+    print("=" * 80)
+    print(f"{'Model':<10} {'Fold':>4} {'Train':>6} {'Test':>5} {'Test dates':<23} "
+          f"{'Acc':>7} {'Log loss':>9} {'Brier':>7}")
+    print("-" * 80)
+    for r in cv['results']:
+        print(f"{r['model']:<10} {r['fold']:>4} {r['train_games']:>6} {r['test_games']:>5} "
+              f"{r['test_start']} - {r['test_end']:<10} {r['accuracy']:>6.1f}% "
+              f"{r['log_loss']:>9.4f} {r['brier']:>7.4f}")
+
+    print("\nSummary (weighted by test games):")
+    for model, s in cv['summary'].items():
+        print(f"  {model:<10} accuracy {s['accuracy']:.1f}%, log loss {s['log_loss']:.4f}, "
+              f"Brier {s['brier']:.4f}")
+    print(f"\n{len(cv['results'])} fits in {cv['elapsed_seconds']}s on {cv['workers']} workers")
+
+
+def save_cross_validation(cv, filepath=OUTPUT_FILE):
+    """Save cross-validation results to JSON"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'updated': datetime.now().strftime('%Y-%m-%d'), **cv}, f, indent=2)
+    print(f"\nSaved cross-validation results to {filepath}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC rolling-origin cross-validation')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS, help='Number of test blocks')
+    parser.add_argument('--min-train', type=float, default=MIN_TRAIN_FRACTION,
+                        help='Share of games (earliest) that only ever train')
+    parser.add_argument('--models', nargs='+', choices=CV_MODELS, default=CV_MODELS, help='Models to evaluate')
+    parser.add_argument('--l2', type=float, default=L2_PENALTY, help='L2 penalty for the logistic fit')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Output JSON path')
+    args = parser.parse_args()
+
+    print("Loading completed games...")
+    data = load_cv_data()
+    print(f"  {len(data['y'])} games (ties excluded)")
+
+    cv = cross_validate(data, models=args.models, num_folds=args.folds,
+                        min_train_fraction=args.min_train, l2=args.l2, workers=args.workers)
+    print_cross_validation(cv)
+    save_cross_validation(cv, args.output)
@@ -0,0 +1,289 @@
+"""
+NEPSAC Model Registry
+Every prediction model, one shared data pull, one comparison
+
+Loads the completed games and team data once (two snapshot-backed BigQuery
+queries, plus the local engine inputs when the engine is selected) into the
+common game dicts nepsac_backtester replays, then runs every registered
+model over the same games. For each model it reports:
+
+- accuracy, Brier score and log loss (walk-forward, as in nepsac_backtester)
+- per-prediction latency (mean, p50, p95) from timing each predict() call
+- memory: peak traced allocation while building and replaying the model,
+  and what its state still holds afterwards
+
+Registered models:
+- engine      nepsac_prediction_engine.predict_game (games relabelled with
+              team names from nepsac_teams)
+- enhanced    enhanced_prediction_model.EnhancedPredictor
+- v3          prediction_model_v3.predict_game
+- v3_final    prediction_model_v3_final.predict_game
+- regenerate  regenerate_predictions.calculate_prediction
+
+Memory is measured in a second replay under tracemalloc (it slows every
+allocation), so latencies come from an untraced run.
+
+Usage:
+  python nepsac_model_registry.py                             # all models
+  python nepsac_model_registry.py --models v3 v3_final regenerate
+  python nepsac_model_registry.py --no-memory --output model_comparison.json
+  NEPSAC_OFFLINE=1 python nepsac_model_registry.py            # from local snapshots
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from bq_snapshot import BigQueryClient, snapshot_query
+from nepsac_backtester import (
+    MIN_HISTORY,
+    EngineModel,
+    EnhancedModel,
+    RegenerateModel,
+    V3FinalModel,
+    V3Model,
+    WalkForwardModel,
+    load_engine_sources,
+    schedule_games,
+    walk_forward,
+)
+from nepsac_prediction_engine import normalize_team_name
+
+client = BigQueryClient(project='prodigy-ranking')
+
+OUTPUT_FILE = 'nepsac_model_comparison.json'
+
+
+# =============================================================================
+# SHARED DATA
+# =============================================================================
+
+def load_shared_data(include_engine=True):
+    """
+    Completed games and team data for every model, loaded once
+
+    Returns games (common game dicts keyed by team id), teams (team id ->
+    name and nepsac_team_rankings columns, None for unranked teams) and, with
+    include_engine, the engine's local sources.
+    """
+    games_query = '''
+    SELECT
+        game_id, game_date, away_team_id, home_team_id,
+        CAST(away_score AS INT64) as away_score,
+        CAST(home_score AS INT64) as home_score
+    FROM `prodigy-ranking.algorithm_core.nepsac_schedule`
+    WHERE season = '2025-26' AND status = 'final' AND away_score IS NOT NULL
+    ORDER BY game_date ASC
+    '''
+    teams_query = '''
+    SELECT
+        t.team_id, t.team_name,
+        r.team_id IS NOT NULL as ranked,
+        r.rank, r.avg_prodigy_points, r.max_prodigy_points, r.total_prodigy_points, r.team_ovr
+    FROM `prodigy-ranking.algorithm_core.nepsac_teams` t
+    LEFT JOIN `prodigy-ranking.algorithm_core.nepsac_team_rankings` r
+        ON t.team_id = r.team_id AND r.season = '2025-26'
+    '''
+    teams = {row['team_id']: dict(row) for row in snapshot_query(client, teams_query)}
+    return {
+        'games': schedule_games(snapshot_query(client, games_query)),
+        'teams': teams,
+        'engine_sources': load_engine_sources() if include_engine else None,
+    }
+
+
+def team_rankings(teams, columns=('rank', 'points', 'ovr')):
+    """
+    Rankings dict in the shape the BigQuery models' loaders build
+
+    Same defaults as load_team_rankings()/load_team_data(): rank 50, 1500
+    points, OVR 75. Only ranked teams are included.
+    """
+    values = {
+        'rank': lambda t: t['rank'] or 50,
+        'points': lambda t: t['avg_prodigy_points'] or 1500,
+        'ovr': lambda t: t['team_ovr'] or 75,
+    }
+    return {team_id: {column: values[column](team) for column in columns}
+            for team_id, team in teams.items() if team['ranked']}
+
+
+def regenerate_rankings(teams):
+    """RegenerateModel rankings, with fetch_upcoming_games' COALESCE defaults"""
+    return {team_id: {
+        'avg_points': team['avg_prodigy_points'] or 0,
+        'max_points': team['max_prodigy_points'] or 0,
+        'total_points': team['total_prodigy_points'] or 0,
+        'ovr': 75 if team['team_ovr'] is None else team['team_ovr'],
+    } for team_id, team in teams.items() if team['ranked']}
+
+
+class TeamNameModel(WalkForwardModel):
+    """
+    Runs a team-name keyed model (the engine) on team-id keyed games
+
+    Games are relabelled with nepsac_teams names on the way in and the
+    predicted winner is mapped back to its team id.
+    """
+
+    def __init__(self, model, teams):
+        self.model = model
+        self.name = model.name
+        self.names = {team_id: team['team_name'] or str(team_id) for team_id, team in teams.items()}
+
+    def _relabel(self, game):
+        return dict(game, away_team=self.names.get(game['away_team'], str(game['away_team'])),
+                    home_team=self.names.get(game['home_team'], str(game['home_team'])))
+
+    def predict(self, game):
+        named = self._relabel(game)
+        winner, confidence, home_prob = self.model.predict(named)
+        is_home = winner == normalize_team_name(named['home_team'])
+        return game['home_team'] if is_home else game['away_team'], confidence, home_prob
+
+    def apply(self, game):
+        self.model.apply(self._relabel(game))
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+# name -> factory(shared data) returning a fresh WalkForwardModel
+MODEL_REGISTRY = {
+    'engine': lambda shared: TeamNameModel(EngineModel(shared['engine_sources']), shared['teams']),
+    'enhanced': lambda shared: EnhancedModel(team_rankings(shared['teams'])),
+    'v3': lambda shared: V3Model(team_rankings(shared['teams'])),
+    'v3_final': lambda shared: V3FinalModel(team_rankings(shared['teams'], columns=('rank', 'points'))),
+    'regenerate': lambda shared: RegenerateModel(regenerate_rankings(shared['teams'])),
+}
+
+
+def register_model(name, factory):
+    """Add a model to the comparison; factory(shared data) returns a WalkForwardModel"""
+    MODEL_REGISTRY[name] = factory
+
+
+class _TimedModel(WalkForwardModel):
+    """Records the wall time of every predict() call of the wrapped model"""
+
+    def __init__(self, model):
+        self.model = model
+        self.name = model.name
+        self.timings = []
+
+    def predict(self, game):
+        start = time.perf_counter_ns()
+        prediction = self.model.predict(game)
+        self.timings.append(time.perf_counter_ns() - start)
+        return prediction
+
+    def apply(self, game):
+        self.model.apply(game)
+
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+def measure_memory(factory, shared, games, min_history=MIN_HISTORY):
+    """(peak, retained) bytes allocated while building and replaying one model"""
+    tracemalloc.start()
+    try:
+        model = factory(shared)
+        walk_forward(games, [model], min_history=min_history, keep_predictions=False)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def compare_models(shared, names=None, min_history=MIN_HISTORY, memory=True):
+    """
+    Replay the shared games through each registered model
+
+    Each model gets its own pass, so latency and memory are its alone.
+    Returns {model name: backtest metrics plus latency and memory}.
+    """
+    names = list(MODEL_REGISTRY) if names is None else names
+    games = shared['games']
+
+    comparison = {}
+    for name in names:
+        factory = MODEL_REGISTRY[name]
+        start = time.perf_counter()
+        model = _TimedModel(factory(shared))
+        build_seconds = time.perf_counter() - start
+
+        result = walk_forward(games, [model], min_history=min_history, keep_predictions=False)[name]
+        result.pop('predictions')
+        timings = np.array(model.timings, dtype=float) / 1000  # microseconds
+        result['build_seconds'] = round(build_seconds, 4)
+        result['latency_us'] = {
+            'mean': round(float(timings.mean()), 2) if len(timings) else None,
+            'p50': round(float(np.percentile(timings, 50)), 2) if len(timings) else None,
+            'p95': round(float(np.percentile(timings, 95)), 2) if len(timings) else None,
+        }
+        if memory:
+            peak, retained = measure_memory(factory, shared, games, min_history)
+            result['memory_kb'] = {'peak': round(peak / 1024, 1), 'retained': round(retained / 1024, 1)}
+        comparison[name] = result
+
+    return comparison
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def print_comparison(comparison):
+    """One line per model: quality, then cost"""
+    print("\n" + "=" * 96)
+    print("MODEL COMPARISON")
+    print("=" * 96)
+    print(f"{'Model':<12} {'Correct':>9} {'Accuracy':>9} {'Brier':>8} {'Log loss':>9} "
+          f"{'Mean us':>9} {'p95 us':>9} {'Peak KB':>10} {'Kept KB':>10}")
+    print("-" * 96)
+    for name, r in comparison.items():
+        brier = f"{r['brier']:.4f}" if r['brier'] is not None else '-'
+        log_loss = f"{r['log_loss']:.4f}" if r['log_loss'] is not None else '-'
+        mean = f"{r['latency_us']['mean']:.1f}" if r['latency_us']['mean'] is not None else '-'
+        p95 = f"{r['latency_us']['p95']:.1f}" if r['latency_us']['p95'] is not None else '-'
+        memory = r.get('memory_kb')
+        peak = f"{memory['peak']:.1f}" if memory else '-'
+        retained = f"{memory['retained']:.1f}" if memory else '-'
+        print(f"{name:<12} {r['correct']:>4}/{r['total']:<4} {r['accuracy']:>8.1f}% {brier:>8} {log_loss:>9} "
+              f"{mean:>9} {p95:>9} {peak:>10} {retained:>10}")
+
+    if comparison:
+        first = next(iter(comparison.values()))
+        print(f"\n{first['games']} games replayed per model")
+
+
+def save_comparison(comparison, filepath=OUTPUT_FILE):
+    """Save the comparison to JSON"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'updated': datetime.now().strftime('%Y-%m-%d'), 'models': comparison}, f, indent=2)
+    print(f"\nSaved model comparison to {filepath}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC model registry comparison')
+    parser.add_argument('--models', nargs='+', choices=list(MODEL_REGISTRY), help='Models to compare (default: all)')
+    parser.add_argument('--min-history', type=int, default=MIN_HISTORY, help='Warm-up games before scoring')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc memory replay')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Output JSON path')
+    args = parser.parse_args()
+
+    names = args.models or list(MODEL_REGISTRY)
+    print("Loading shared data...")
+    shared = load_shared_data(include_engine='engine' in names)
+    print(f"  {len(shared['games'])} completed games, {len(shared['teams'])} teams")
+
+    comparison = compare_models(shared, names, min_history=args.min_history, memory=not args.no_memory)
+    print_comparison(comparison)
+    save_comparison(comparison, args.output)
@@ -15,11 +15,23 @@ We apply age multipliers to individual player points before team aggregation.
 This also compensates for EP views accumulating over time (older = more views).
 """
 
+import contextlib
+import cProfile
 import csv
+import functools
+import gzip
+import hashlib
 import json
+import os
+import pickle
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 
 # =============================================================================
 # AGE NORMALIZATION
@@ -66,10 +78,97 @@ def get_age_multiplier(birth_year):
 # DATA LOADING
 # =============================================================================
 
-def load_game_results(filepath='nz_boys_prep_results_only.csv'):
-    """Load game-by-game results from Neutral Zone CSV"""
-    games = []
+# Parsed loader output is pickled here when set (see enable_loader_cache)
+LOADER_CACHE_DIR = None
+
+# Bump when a loader's output format changes so old cache files are ignored
+LOADER_CACHE_VERSION = 1
+
+# Process-wide loader cache hit/miss counts (reported by RunReport)
+LOADER_CACHE_STATS = {'hits': 0, 'misses': 0}
+# SourceLoader runs loaders on worker threads, so counter updates take this lock
+_LOADER_CACHE_LOCK = threading.Lock()
+
+
+def enable_loader_cache(cache_dir):
+    """
+    Cache parsed loader output in cache_dir (None disables caching)
+
+    Each cached file is keyed by the source path, mtime and size plus the
+    team alias table, so editing a CSV or an alias re-parses on the next load.
+    """
+    global LOADER_CACHE_DIR
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    LOADER_CACHE_DIR = cache_dir
+
+
+@contextlib.contextmanager
+def loader_cache(cache_dir):
+    """Cache parsed loader output in cache_dir for the enclosed block only"""
+    previous = LOADER_CACHE_DIR
+    enable_loader_cache(cache_dir)
+    try:
+        yield
+    finally:
+        enable_loader_cache(previous)
 
+
+def _loader_cache_key(loader_name, filepath):
+    """Build the cache key for a source file, or None if it does not exist"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    aliases = hashlib.sha1(repr(sorted(TEAM_ALIASES.items())).encode('utf-8')).hexdigest()
+    return (LOADER_CACHE_VERSION, loader_name, os.path.abspath(filepath),
+            st.st_mtime_ns, st.st_size, aliases)
+
+
+def cached_loader(loader):
+    """
+    Reuse a loader's parsed output until its source file changes
+
+    Only active once enable_loader_cache() has set a cache directory. Missing
+    source files bypass the cache so the loader's own fallback still applies.
+    """
+    @functools.wraps(loader)
+    def wrapper(filepath=None):
+        if filepath is None:
+            filepath = loader.__defaults__[0]
+        if not LOADER_CACHE_DIR:
+            return loader(filepath)
+
+        key = _loader_cache_key(loader.__name__, filepath)
+        if key is None:
+            return loader(filepath)
+
+        path_hash = hashlib.sha1(key[2].encode('utf-8')).hexdigest()[:12]
+        cache_path = os.path.join(LOADER_CACHE_DIR, f"{loader.__name__}-{path_hash}.pkl")
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['key'] == key:
+                with _LOADER_CACHE_LOCK:
+                    LOADER_CACHE_STATS['hits'] += 1
+                return cached['data']
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+            pass
+
+        with _LOADER_CACHE_LOCK:
+            LOADER_CACHE_STATS['misses'] += 1
+        data = loader(filepath)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'key': key, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        return data
+
+    return wrapper
+
+
+def _read_game_rows(filepath):
+    """Yield one cleaned result dict per usable row of the Neutral Zone CSV"""
     with open(filepath, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -83,7 +182,7 @@ def load_game_results(filepath='nz_boys_prep_results_only.csv'):
                 opponent = ''
 
             if date and opponent:
-                games.append({
+                yield {
                     'team': normalize_team_name(row['Team']),
                     'date': parse_date(date),
                     'home_away': row['Home/Away'],
@@ -91,11 +190,111 @@ def load_game_results(filepath='nz_boys_prep_results_only.csv'):
                     'outcome': row['Outcome'],
                     'team_score': int(row['Team Score']) if row['Team Score'] else 0,
                     'opp_score': int(row['Opponent Score']) if row['Opponent Score'] else 0
-                })
+                }
+
 
-    return games
+@cached_loader
+def load_game_results(filepath='nz_boys_prep_results_only.csv'):
+    """Load game-by-game results from Neutral Zone CSV"""
+    return list(_read_game_rows(filepath))
+
+
+@cached_loader
+def load_game_log(filepath='nz_boys_prep_results_only.csv'):
+    """Load game-by-game results from Neutral Zone CSV as a columnar GameLog"""
+    return GameLog(_read_game_rows(filepath))
 
 
+# Fixed outcome / venue codes for GameLog (other labels get later codes)
+OUTCOME_WIN, OUTCOME_LOSS = 0, 1
+VENUE_HOME = 0
+
+
+class GameLog:
+    """
+    Columnar game results: one NumPy array per field
+
+    Same rows as load_game_results() in about 20 bytes per game instead of a
+    dict with a datetime and four strings. Teams are interned to int32 ids
+    (names in teams), outcomes and home/away to int8 codes (labels in
+    outcome_labels / venue_labels, 'Win'/'Loss'/'Home' first), scores are
+    int16 and dates int32 day ordinals (0 = no date).
+
+    calculate_team_stats, calculate_performance_rankings and
+    calculate_head_to_head accept a GameLog directly. Iterating yields the
+    usual per-game dicts for code that still wants them.
+    """
+
+    def __init__(self, games=()):
+        self.teams = []
+        self.team_ids = {}
+        self.outcome_labels = ['Win', 'Loss', 'Tie']
+        self.venue_labels = ['Home', 'Away']
+
+        columns = ([], [], [], [], [], [], [])
+        for game in games:
+            for column, value in zip(columns, (
+                    self._code(self.teams, self.team_ids, game['team']),
+                    self._code(self.teams, self.team_ids, game['opponent']),
+                    self._code(self.venue_labels, None, game['home_away']),
+                    self._code(self.outcome_labels, None, game['outcome']),
+                    game['team_score'],
+                    game['opp_score'],
+                    game['date'].toordinal() if game['date'] else 0)):
+                column.append(value)
+
+        self.team = np.array(columns[0], dtype=np.int32)
+        self.opponent = np.array(columns[1], dtype=np.int32)
+        self.home_away = np.array(columns[2], dtype=np.int8)
+        self.outcome = np.array(columns[3], dtype=np.int8)
+        self.team_score = np.array(columns[4], dtype=np.int16)
+        self.opp_score = np.array(columns[5], dtype=np.int16)
+        self.day = np.array(columns[6], dtype=np.int32)
+
+    @staticmethod
+    def _code(labels, ids, label):
+        if ids is None:
+            if label not in labels:
+                labels.append(label)
+            return labels.index(label)
+        code = ids.get(label)
+        if code is None:
+            code = ids[label] = len(labels)
+            labels.append(label)
+        return code
+
+    def __len__(self):
+        return len(self.team)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.game(i)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column arrays"""
+        return sum(a.nbytes for a in (self.team, self.opponent, self.home_away, self.outcome,
+                                      self.team_score, self.opp_score, self.day))
+
+    def game(self, i):
+        """Row i as a load_game_results()-style dict"""
+        day = int(self.day[i])
+        return {
+            'team': self.teams[self.team[i]],
+            'date': datetime.fromordinal(day) if day else None,
+            'home_away': self.venue_labels[self.home_away[i]],
+            'opponent': self.teams[self.opponent[i]],
+            'outcome': self.outcome_labels[self.outcome[i]],
+            'team_score': int(self.team_score[i]),
+            'opp_score': int(self.opp_score[i]),
+        }
+
+    def dated_through(self, as_of_date):
+        """Row indices of games dated on or before as_of_date (games are dated at midnight)"""
+        return np.flatnonzero((self.day > 0) & (self.day <= as_of_date.toordinal()))
+
+
+@cached_loader
 def load_team_rankings(filepath='nepsac_team_rankings_full.csv'):
     """Load team ProdigyPoints rankings"""
     rankings = {}
@@ -115,6 +314,7 @@ def load_team_rankings(filepath='nepsac_team_rankings_full.csv'):
     return rankings
 
 
+@cached_loader
 def load_player_roster(filepath='neutralzone_prep_boys_hockey_data_clean.csv'):
     """
     Load player roster with birth years for age adjustment
@@ -262,6 +462,7 @@ def load_standings(filepath='nepsac_standings_jan19.csv'):
     return standings
 
 
+@cached_loader
 def load_schedule(filepath='nepsac_full_schedule.json'):
     """Load the full game schedule"""
     with open(filepath, 'r', encoding='utf-8') as f:
@@ -455,84 +656,284 @@ def calculate_team_stats(games, as_of_date=None):
     if as_of_date is None:
         as_of_date = datetime.now()
 
-    team_stats = defaultdict(lambda: {
-        'games': [],
-        'home_games': [],
-        'away_games': [],
-        'total_gf': 0,
-        'total_ga': 0,
-        'wins': 0,
-        'losses': 0,
-        'ties': 0
-    })
-
-    # Process all games
-    for game in games:
-        if game['date'] and game['date'] <= as_of_date:
-            team = game['team']
-            stats = team_stats[team]
-
-            stats['games'].append(game)
-            stats['total_gf'] += game['team_score']
-            stats['total_ga'] += game['opp_score']
-
-            if game['outcome'] == 'Win':
-                stats['wins'] += 1
-            elif game['outcome'] == 'Loss':
-                stats['losses'] += 1
-            else:
-                stats['ties'] += 1
+    if isinstance(games, GameLog):
+        return _game_log_team_stats(games, games.dated_through(as_of_date))
 
-            if game['home_away'] == 'Home':
-                stats['home_games'].append(game)
-            else:
-                stats['away_games'].append(game)
+    accumulator = TeamStatsAccumulator()
+    accumulator.update([g for g in games if g['date'] and g['date'] <= as_of_date])
 
-    # Calculate derived stats for each team
-    result = {}
-    for team, stats in team_stats.items():
-        num_games = len(stats['games'])
-        if num_games == 0:
-            continue
+    return accumulator.team_stats()
 
-        # Sort games by date for recent form
-        sorted_games = sorted(stats['games'], key=lambda g: g['date'], reverse=True)
-
-        # Last 5 games
-        last_5 = sorted_games[:5]
-        last_5_record = calculate_record(last_5)
-
-        # Recent form score (0-1 scale, 1 = all wins)
-        form_score = (last_5_record['wins'] + 0.5 * last_5_record['ties']) / len(last_5) if last_5 else 0.5
-
-        # Current streak
-        streak = calculate_streak(sorted_games)
-
-        # Home/Away records
-        home_record = calculate_record(stats['home_games'])
-        away_record = calculate_record(stats['away_games'])
-
-        result[team] = {
-            'games_played': num_games,
-            'wins': stats['wins'],
-            'losses': stats['losses'],
-            'ties': stats['ties'],
-            'win_pct': (stats['wins'] + 0.5 * stats['ties']) / num_games,
-            'goals_per_game': stats['total_gf'] / num_games,
-            'goals_against_per_game': stats['total_ga'] / num_games,
-            'goal_diff_per_game': (stats['total_gf'] - stats['total_ga']) / num_games,
-            'last_5_record': f"{last_5_record['wins']}-{last_5_record['losses']}-{last_5_record['ties']}",
-            'form_score': form_score,
-            'streak': streak,
-            'home_record': f"{home_record['wins']}-{home_record['losses']}-{home_record['ties']}",
-            'away_record': f"{away_record['wins']}-{away_record['losses']}-{away_record['ties']}",
-            'home_win_pct': home_record['wins'] / len(stats['home_games']) if stats['home_games'] else 0.5,
-            'away_win_pct': away_record['wins'] / len(stats['away_games']) if stats['away_games'] else 0.5
-        }
+
+def _game_log_team_stats(log, rows):
+    """
+    calculate_team_stats over the given GameLog rows, vectorized per column
+
+    Rows are put in TeamStatsAccumulator order (date, same-day games
+    last-listed first) and grouped by team; totals are bincounts, and the
+    recent form and streak come from the tail of each team's group.
+    """
+    if len(rows) == 0:
+        return {}
+
+    rows = rows[np.lexsort((-rows, log.day[rows]))]
+    team = log.team[rows]
+    outcome = log.outcome[rows]
+    home = log.home_away[rows] == VENUE_HOME
+    win = outcome == OUTCOME_WIN
+    loss = outcome == OUTCOME_LOSS
+
+    num_teams = len(log.teams)
+
+    def count(weights=None):
+        return np.bincount(team, weights=weights, minlength=num_teams).astype(np.int64).tolist()
+
+    totals = {
+        'games_played': count(),
+        'wins': count(win),
+        'losses': count(loss),
+        'ties': count(~win & ~loss),
+        'total_gf': count(log.team_score[rows]),
+        'total_ga': count(log.opp_score[rows]),
+        'home_games': count(home),
+        'home_wins': count(home & win),
+        'home_losses': count(home & loss),
+        'away_games': count(~home),
+        'away_wins': count(~home & win),
+        'away_losses': count(~home & loss),
+    }
+
+    # Group each team's games together, keeping the accumulator order inside a group
+    by_team = np.argsort(team, kind='stable')
+    team, outcome = team[by_team], outcome[by_team]
+    ends = np.flatnonzero(np.append(team[1:] != team[:-1], True))
+    starts = np.append(0, ends[:-1] + 1)
+
+    # Start of the outcome run each game belongs to (runs break at team boundaries too)
+    run_break = np.ones(len(team), dtype=bool)
+    run_break[1:] = (team[1:] != team[:-1]) | (outcome[1:] != outcome[:-1])
+    run_start = np.maximum.accumulate(np.where(run_break, np.arange(len(team)), 0))
+
+    # Teams in order of their first applied game, like the accumulator's dict
+    first_seen = {}
+    for team_id in log.team[rows].tolist():
+        first_seen.setdefault(team_id, None)
+
+    group = dict(zip(team[ends].tolist(), zip(starts.tolist(), ends.tolist())))
+    outcome_list = outcome.tolist()
+    labels = log.outcome_labels
+
+    result = {}
+    for team_id in first_seen:
+        start, end = group[team_id]
+        state = {column: values[team_id] for column, values in totals.items()}
+        state['recent'] = [labels[o] for o in outcome_list[max(start, end + 1 - RECENT_FORM_GAMES):end + 1]]
+        state['streak_outcome'] = labels[outcome_list[end]]
+        state['streak_count'] = end - int(run_start[end]) + 1
+        result[log.teams[team_id]] = _derive_team_stats(state)
 
     return result
 
 
+# Number of games in the recent form window
+RECENT_FORM_GAMES = 5
+
+# Checkpoint file for TeamStatsAccumulator (inside the run's state directory)
+TEAM_STATS_STATE_FILE = 'nepsac_team_stats_state.json'
+
+
+class TeamStatsAccumulator:
+    """
+    Running team stats that are updated one game at a time
+
+    add_result() is O(1) per game: season totals, home/away splits, a
+    fixed-size ring buffer of recent outcomes and the current streak.
+    The state can be saved to and loaded from a JSON file, so a daily run
+    only has to apply games newer than the last ones it has seen.
+
+    Games must be applied in date order. update() takes care of that and of
+    skipping games that were already applied.
+    """
+
+    def __init__(self):
+        self.teams = {}
+        self.last_date = None       # Date of the most recent applied game
+        self.last_date_keys = set()  # Games already applied on last_date
+
+    def __len__(self):
+        return len(self.teams)
+
+    @staticmethod
+    def _game_key(game):
+        return (game['team'], game['opponent'], game['home_away'], game['team_score'], game['opp_score'])
+
+    def _team(self, team):
+        state = self.teams.get(team)
+        if state is None:
+            state = self.teams[team] = {
+                'games_played': 0,
+                'wins': 0,
+                'losses': 0,
+                'ties': 0,
+                'total_gf': 0,
+                'total_ga': 0,
+                'home_games': 0,
+                'home_wins': 0,
+                'home_losses': 0,
+                'away_games': 0,
+                'away_wins': 0,
+                'away_losses': 0,
+                'recent': deque(maxlen=RECENT_FORM_GAMES),  # Oldest first
+                'streak_outcome': None,
+                'streak_count': 0,
+            }
+        return state
+
+    def add_result(self, game):
+        """Apply one game result row (team's perspective)"""
+        if not game['date']:
+            return
+
+        state = self._team(game['team'])
+        outcome = game['outcome']
+
+        state['games_played'] += 1
+        state['total_gf'] += game['team_score']
+        state['total_ga'] += game['opp_score']
+
+        if outcome == 'Win':
+            state['wins'] += 1
+        elif outcome == 'Loss':
+            state['losses'] += 1
+        else:
+            state['ties'] += 1
+
+        split = 'home' if game['home_away'] == 'Home' else 'away'
+        state[f'{split}_games'] += 1
+        if outcome == 'Win':
+            state[f'{split}_wins'] += 1
+        elif outcome == 'Loss':
+            state[f'{split}_losses'] += 1
+
+        state['recent'].append(outcome)
+
+        if outcome == state['streak_outcome']:
+            state['streak_count'] += 1
+        else:
+            state['streak_outcome'] = outcome
+            state['streak_count'] = 1
+
+        if self.last_date is None or game['date'] > self.last_date:
+            self.last_date = game['date']
+            self.last_date_keys = set()
+        self.last_date_keys.add(self._game_key(game))
+
+    def update(self, games):
+        """
+        Apply every game not yet seen, in date order
+
+        Games dated before the last applied date are assumed to be applied
+        already (rebuild from scratch to pick up corrections to old results).
+        Same-day games are applied last-listed first, so the first listed
+        counts as the most recent, matching calculate_team_stats.
+        Returns the number of games applied.
+        """
+        new_games = []
+        for i, game in enumerate(games):
+            if not game['date']:
+                continue
+            if self.last_date is not None:
+                if game['date'] < self.last_date:
+                    continue
+                if game['date'] == self.last_date and self._game_key(game) in self.last_date_keys:
+                    continue
+            new_games.append((game['date'], -i, game))
+
+        new_games.sort(key=lambda x: (x[0], x[1]))
+        for _, _, game in new_games:
+            self.add_result(game)
+
+        return len(new_games)
+
+    def team_stats(self):
+        """Derived stats for each team, in the same shape as calculate_team_stats"""
+        result = {}
+        for team, state in self.teams.items():
+            if state['games_played'] > 0:
+                result[team] = _derive_team_stats(state)
+
+        return result
+
+    def save(self, filepath):
+        """Save accumulator state to a JSON file"""
+        teams = {}
+        for team, state in self.teams.items():
+            teams[team] = {**state, 'recent': list(state['recent'])}
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date else None,
+                'last_date_keys': sorted(list(key) for key in self.last_date_keys),
+                'teams': teams
+            }, f)
+
+    @classmethod
+    def load(cls, filepath):
+        """Load accumulator state from a JSON file (empty state if it doesn't exist)"""
+        accumulator = cls()
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return accumulator
+
+        accumulator.last_date = parse_date(data['last_date'])
+        accumulator.last_date_keys = {tuple(key) for key in data['last_date_keys']}
+        for team, state in data['teams'].items():
+            accumulator.teams[team] = {
+                **state,
+                'recent': deque(state['recent'], maxlen=RECENT_FORM_GAMES)
+            }
+
+        return accumulator
+
+
+def _derive_team_stats(state):
+    """Turn one team's running totals (TeamStatsAccumulator state) into its stats dict"""
+    num_games = state['games_played']
+
+    # Last 5 games
+    recent = state['recent']
+    last_5_wins = sum(1 for o in recent if o == 'Win')
+    last_5_losses = sum(1 for o in recent if o == 'Loss')
+    last_5_ties = len(recent) - last_5_wins - last_5_losses
+
+    # Recent form score (0-1 scale, 1 = all wins)
+    form_score = (last_5_wins + 0.5 * last_5_ties) / len(recent) if recent else 0.5
+
+    home_ties = state['home_games'] - state['home_wins'] - state['home_losses']
+    away_ties = state['away_games'] - state['away_wins'] - state['away_losses']
+
+    return {
+        'games_played': num_games,
+        'wins': state['wins'],
+        'losses': state['losses'],
+        'ties': state['ties'],
+        'win_pct': (state['wins'] + 0.5 * state['ties']) / num_games,
+        'goals_per_game': state['total_gf'] / num_games,
+        'goals_against_per_game': state['total_ga'] / num_games,
+        'goal_diff_per_game': (state['total_gf'] - state['total_ga']) / num_games,
+        'last_5_record': f"{last_5_wins}-{last_5_losses}-{last_5_ties}",
+        'form_score': form_score,
+        'streak': f"{state['streak_outcome'][0]}{state['streak_count']}",
+        'home_record': f"{state['home_wins']}-{state['home_losses']}-{home_ties}",
+        'away_record': f"{state['away_wins']}-{state['away_losses']}-{away_ties}",
+        'home_win_pct': state['home_wins'] / state['home_games'] if state['home_games'] else 0.5,
+        'away_win_pct': state['away_wins'] / state['away_games'] if state['away_games'] else 0.5
+    }
+
+
 def calculate_record(games):
     """Calculate W-L-T record from list of games"""
     wins = sum(1 for g in games if g['outcome'] == 'Win')
@@ -563,7 +964,25 @@ def calculate_head_to_head(games, team1, team2):
     """
     Calculate head-to-head record between two teams
     Returns record from team1's perspective
+
+    `games` may be a HeadToHeadIndex, in which case this is a single lookup
+    instead of a scan over every result.
     """
+    if isinstance(games, HeadToHeadIndex):
+        return games.get(team1, team2)
+
+    if isinstance(games, GameLog):
+        if team1 not in games.team_ids or team2 not in games.team_ids:
+            return None
+        mask = (games.team == games.team_ids[team1]) & (games.opponent == games.team_ids[team2])
+        num_games = int(mask.sum())
+        if not num_games:
+            return None
+        outcomes = games.outcome[mask]
+        wins = int((outcomes == OUTCOME_WIN).sum())
+        losses = int((outcomes == OUTCOME_LOSS).sum())
+        return {'wins': wins, 'losses': losses, 'ties': num_games - wins - losses, 'games': num_games}
+
     h2h_games = [g for g in games
                  if (g['team'] == team1 and g['opponent'] == team2)]
 
@@ -579,6 +998,49 @@ def calculate_head_to_head(games, team1, team2):
     }
 
 
+class HeadToHeadIndex:
+    """
+    Head-to-head records for every (team, opponent) pair
+
+    Built in one pass over load_game_results() output and updated with
+    add_result() as new results come in, so each lookup is O(1). Records are
+    from the first team's perspective and also carry goal totals.
+    """
+
+    def __init__(self, games=None):
+        self.records = {}
+        for game in games or []:
+            self.add_result(game)
+
+    def __len__(self):
+        return len(self.records)
+
+    def add_result(self, game):
+        """Add one game result row (team's perspective) to the index"""
+        key = (game['team'], game['opponent'])
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = {
+                'wins': 0, 'losses': 0, 'ties': 0, 'games': 0,
+                'goals_for': 0, 'goals_against': 0
+            }
+
+        if game['outcome'] == 'Win':
+            record['wins'] += 1
+        elif game['outcome'] == 'Loss':
+            record['losses'] += 1
+        else:
+            record['ties'] += 1
+        record['games'] += 1
+        record['goals_for'] += game['team_score']
+        record['goals_against'] += game['opp_score']
+
+    def get(self, team, opponent):
+        """Record for team vs opponent, or None if they haven't played"""
+        record = self.records.get((team, opponent))
+        return dict(record) if record else None
+
+
 # =============================================================================
 # PREDICTION MODEL
 # =============================================================================
@@ -609,6 +1071,7 @@ PREDICTION_WEIGHTS = {
 HOME_ADVANTAGE = 0.55
 
 
+@cached_loader
 def load_expert_rankings(filepath='nepsac_expert_rankings_jan21.csv'):
     """
     Load expert power rankings with GPG/GAA data
@@ -640,6 +1103,7 @@ def load_expert_rankings(filepath='nepsac_expert_rankings_jan21.csv'):
     return expert
 
 
+@cached_loader
 def load_mhr_rankings(filepath='nepsac_mhr_rankings_jan21.csv'):
     """
     Load MyHockeyRankings power rankings
@@ -673,6 +1137,7 @@ def load_mhr_rankings(filepath='nepsac_mhr_rankings_jan21.csv'):
     return mhr
 
 
+@cached_loader
 def load_jspr_rankings(filepath='nepsac_jspr_rankings.csv'):
     """
     Load NEPSIHA JSPR (Jeff Seaver Power Rankings)
@@ -707,6 +1172,7 @@ def load_jspr_rankings(filepath='nepsac_jspr_rankings.csv'):
     return jspr
 
 
+@cached_loader
 def load_nehj_expert_rankings(filepath='nepsac_nehj_expert_rankings.csv'):
     """
     Load NEHJ (New England Hockey Journal) expert rankings by Evan Marinofsky.
@@ -748,7 +1214,7 @@ def load_nehj_expert_rankings(filepath='nepsac_nehj_expert_rankings.csv'):
     return nehj
 
 
-def calculate_performance_rankings(games, as_of_date=None):
+def calculate_performance_rankings(games, as_of_date=None, checkpoint_path=None, rebuild=False):
     """
     Calculate our own ELO-style performance rankings from game results.
 
@@ -758,77 +1224,376 @@ def calculate_performance_rankings(games, as_of_date=None):
     - Accounts for margin of victory (capped)
     - Uses recent games more heavily
 
+    If checkpoint_path is given, ratings are resumed from that checkpoint and
+    only games newer than it are replayed; the checkpoint is then updated.
+    rebuild=True ignores the checkpoint and replays the full history (use it
+    after corrections to past results, or for an as_of_date earlier than the
+    checkpoint, which raises ValueError because its ratings already include
+    later games).
+
     Returns dict with rank and rating for each team.
     """
-    from collections import defaultdict
-
     if as_of_date is None:
         as_of_date = datetime.now()
 
+    if checkpoint_path and not rebuild:
+        elo = EloRatings.load(checkpoint_path)
+        if elo.last_date and as_of_date < elo.last_date:
+            raise ValueError(f"ELO checkpoint {checkpoint_path} already includes games through "
+                             f"{elo.last_date:%Y-%m-%d}, after as_of_date {as_of_date:%Y-%m-%d} "
+                             f"(pass rebuild=True or use AsOfStatsIndex)")
+    else:
+        elo = EloRatings()
+
+    if isinstance(games, GameLog):
+        elo.update_from_log(games, games.dated_through(as_of_date))
+    else:
+        elo.update([g for g in games if g['date'] and g['date'] <= as_of_date])
+
+    if checkpoint_path:
+        elo.save(checkpoint_path)
+
+    return elo.rankings()
+
+
+# Checkpoint file for EloRatings (inside the run's state directory)
+ELO_STATE_FILE = 'nepsac_elo_state.json'
+
+
+class EloRatings:
+    """
+    Resumable ELO state behind calculate_performance_rankings
+
+    Holds each team's rating, games played and the last processed game date,
+    and can be checkpointed to a JSON file so later runs only apply newer
+    games. Games must be applied in date order; update() handles ordering
+    and skips games already applied.
+    """
+
     # Initialize ratings (start at 1500 like chess ELO)
     BASE_RATING = 1500
     K_FACTOR = 32  # How much ratings change per game
 
-    ratings = defaultdict(lambda: BASE_RATING)
-    games_played = defaultdict(int)
+    def __init__(self):
+        self.ratings = {}
+        self.games_played = {}
+        self.last_date = None       # Date of the most recent applied game
+        self.last_date_keys = set()  # Games already applied on last_date
 
-    # Sort games by date
-    sorted_games = sorted([g for g in games if g['date'] and g['date'] <= as_of_date],
-                          key=lambda g: g['date'])
+    @staticmethod
+    def _game_key(game):
+        return (game['team'], game['opponent'], game['home_away'], game['team_score'], game['opp_score'])
 
-    # Process each game and update ratings
-    for game in sorted_games:
+    def add_result(self, game):
+        """Apply one game result row (team's perspective) and update the team's rating"""
         team = game['team']
         opponent = game['opponent']
 
         if not opponent:
-            continue
+            return
 
-        team_rating = ratings[team]
-        opp_rating = ratings[opponent]
+        self._rate(team, opponent, game['outcome'] == 'Win', game['outcome'] == 'Loss',
+                   game['team_score'] - game['opp_score'])
+
+        if self.last_date is None or game['date'] > self.last_date:
+            self.last_date = game['date']
+            self.last_date_keys = set()
+        self.last_date_keys.add(self._game_key(game))
+
+    def _rate(self, team, opponent, won, lost, goal_diff):
+        team_rating = self.ratings.setdefault(team, self.BASE_RATING)
+        opp_rating = self.ratings.setdefault(opponent, self.BASE_RATING)
 
         # Expected score (ELO formula)
         expected = 1 / (1 + 10 ** ((opp_rating - team_rating) / 400))
 
         # Actual score (1 for win, 0.5 for tie, 0 for loss)
-        if game['outcome'] == 'Win':
+        if won:
             actual = 1.0
             # Bonus for margin of victory (capped at 3 goals)
-            margin = min(3, game['team_score'] - game['opp_score'])
+            margin = min(3, goal_diff)
             actual += margin * 0.05
-        elif game['outcome'] == 'Loss':
+        elif lost:
             actual = 0.0
         else:
             actual = 0.5
 
         # Update rating
-        ratings[team] += K_FACTOR * (actual - expected)
-        games_played[team] += 1
-
-    # Convert to rankings
-    sorted_teams = sorted(ratings.items(), key=lambda x: x[1], reverse=True)
-
-    performance_rankings = {}
-    for i, (team, rating) in enumerate(sorted_teams, 1):
-        if games_played[team] >= 3:  # Minimum 3 games to be ranked
-            performance_rankings[team] = {
-                'rank': i,
-                'rating': round(rating, 1),
-                'games_played': games_played[team]
-            }
+        self.ratings[team] += self.K_FACTOR * (actual - expected)
+        self.games_played[team] = self.games_played.get(team, 0) + 1
+
+    def update_from_log(self, log, rows=None):
+        """
+        update() for GameLog rows (default: all), without building per-game dicts
+
+        Ratings are inherently sequential, so the replay is still one game at a
+        time, but filtering, ordering and the applied-game check use the columns.
+        """
+        if rows is None:
+            rows = np.arange(len(log))
+        rows = rows[log.day[rows] > 0]
+
+        if self.last_date is not None:
+            last_day = self.last_date.toordinal()
+            rows = rows[log.day[rows] >= last_day]
+            on_last_day = log.day[rows] == last_day
+            if on_last_day.any():
+                seen = np.array([self._game_key(log.game(i)) in self.last_date_keys
+                                 for i in rows[on_last_day].tolist()], dtype=bool)
+                keep = np.ones(len(rows), dtype=bool)
+                keep[np.flatnonzero(on_last_day)[seen]] = False
+                rows = rows[keep]
+
+        if len(rows) == 0:
+            return 0
+
+        rows = rows[np.lexsort((rows, log.day[rows]))]
+        teams = log.teams
+        outcome = log.outcome[rows]
+        goal_diff = log.team_score[rows].astype(np.int32) - log.opp_score[rows]
+        for team_id, opp_id, won, lost, diff in zip(
+                log.team[rows].tolist(), log.opponent[rows].tolist(),
+                (outcome == OUTCOME_WIN).tolist(), (outcome == OUTCOME_LOSS).tolist(),
+                goal_diff.tolist()):
+            if teams[opp_id]:
+                self._rate(teams[team_id], teams[opp_id], won, lost, diff)
+
+        # Games without an opponent are skipped entirely, as in add_result()
+        rated = rows[np.array([bool(teams[o]) for o in log.opponent[rows].tolist()], dtype=bool)]
+        if len(rated):
+            last_day = int(log.day[rated[-1]])
+            if self.last_date is None or last_day > self.last_date.toordinal():
+                self.last_date = datetime.fromordinal(last_day)
+                self.last_date_keys = set()
+            for i in rated[log.day[rated] == last_day].tolist():
+                self.last_date_keys.add(self._game_key(log.game(i)))
+
+        return len(rows)
+
+    def update(self, games):
+        """
+        Apply every game not yet seen, in date order
+
+        Games dated before the last processed date are assumed to be applied
+        already. Returns the number of games applied.
+        """
+        new_games = []
+        for i, game in enumerate(games):
+            if not game['date']:
+                continue
+            if self.last_date is not None:
+                if game['date'] < self.last_date:
+                    continue
+                if game['date'] == self.last_date and self._game_key(game) in self.last_date_keys:
+                    continue
+            new_games.append((game['date'], i, game))
+
+        new_games.sort(key=lambda x: (x[0], x[1]))
+        for _, _, game in new_games:
+            self.add_result(game)
+
+        return len(new_games)
+
+    def rankings(self):
+        """Rank, rating and games played for each team with at least 3 games"""
+        # Convert to rankings
+        sorted_teams = sorted(self.ratings.items(), key=lambda x: x[1], reverse=True)
+
+        performance_rankings = {}
+        for i, (team, rating) in enumerate(sorted_teams, 1):
+            games_played = self.games_played.get(team, 0)
+            if games_played >= 3:  # Minimum 3 games to be ranked
+                performance_rankings[team] = {
+                    'rank': i,
+                    'rating': round(rating, 1),
+                    'games_played': games_played
+                }
+
+        return performance_rankings
+
+    def save(self, filepath):
+        """Save ELO state to a JSON checkpoint"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date else None,
+                'last_date_keys': sorted(list(key) for key in self.last_date_keys),
+                'ratings': self.ratings,
+                'games_played': self.games_played
+            }, f)
+
+    @classmethod
+    def load(cls, filepath):
+        """Load ELO state from a JSON checkpoint (fresh ratings if it doesn't exist)"""
+        elo = cls()
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return elo
+
+        elo.last_date = parse_date(data['last_date'])
+        elo.last_date_keys = {tuple(key) for key in data['last_date_keys']}
+        elo.ratings = data['ratings']
+        elo.games_played = data['games_played']
+
+        return elo
+
 
-    return performance_rankings
+# Column layout of AsOfStatsIndex's cumulative per-team counts
+AS_OF_COUNT_COLUMNS = [
+    'games_played', 'wins', 'losses', 'ties', 'total_gf', 'total_ga',
+    'home_games', 'home_wins', 'home_losses', 'away_games', 'away_wins', 'away_losses',
+]
 
 
-def predict_game(away_team, home_team, rankings, team_stats, games, expert_rankings=None, mhr_rankings=None, jspr_rankings=None, performance_rankings=None, nehj_rankings=None):
+class AsOfStatsIndex:
+    """
+    Date-indexed snapshots for "as of date X" team stats and ELO rankings
+
+    Built once from the full game history. Each team gets cumulative count
+    arrays ordered by game date (plus its outcome sequence and running streak
+    lengths), and ELO ratings / games played are checkpointed after every
+    game date. An as-of query is then a binary search per team plus O(teams)
+    work instead of a full recomputation, so walk-forward backtests don't
+    cost O(days x games).
+
+    team_stats(d) matches calculate_team_stats(games, d) and
+    performance_rankings(d) matches calculate_performance_rankings(games, d).
+    """
+
+    def __init__(self, games):
+        dated = [(game['date'], i, game) for i, game in enumerate(games) if game['date']]
+
+        # Team stats: per-team sequences in TeamStatsAccumulator order
+        # (date order, same-day games last-listed first)
+        team_games = defaultdict(list)
+        for _, _, game in sorted(dated, key=lambda x: (x[0], -x[1])):
+            team_games[game['team']].append(game)
+
+        self.team_days = {}
+        self.team_counts = {}
+        self.team_outcomes = {}
+        self.team_streaks = {}
+        for team, tgames in team_games.items():
+            rows = np.zeros((len(tgames) + 1, len(AS_OF_COUNT_COLUMNS)), dtype=np.int64)
+            streaks = np.zeros(len(tgames), dtype=np.int32)
+            outcomes = []
+            for n, game in enumerate(tgames):
+                outcome = game['outcome']
+                is_home = game['home_away'] == 'Home'
+                rows[n + 1] = (
+                    1,
+                    outcome == 'Win',
+                    outcome == 'Loss',
+                    outcome not in ('Win', 'Loss'),
+                    game['team_score'],
+                    game['opp_score'],
+                    is_home,
+                    is_home and outcome == 'Win',
+                    is_home and outcome == 'Loss',
+                    not is_home,
+                    not is_home and outcome == 'Win',
+                    not is_home and outcome == 'Loss',
+                )
+                streaks[n] = streaks[n - 1] + 1 if n and outcomes[-1] == outcome else 1
+                outcomes.append(outcome)
+
+            self.team_days[team] = np.array([g['date'].toordinal() for g in tgames], dtype=np.int32)
+            self.team_counts[team] = np.cumsum(rows, axis=0)
+            self.team_outcomes[team] = outcomes
+            self.team_streaks[team] = streaks
+
+        # ELO: replay once and checkpoint ratings after every game date.
+        # Team ids follow first appearance, which is also the rating dict's
+        # insertion order at any point of the replay (used for tie-breaks).
+        elo = EloRatings()
+        replay = sorted(dated, key=lambda x: (x[0], x[1]))
+        self.elo_days = []
+        rating_rows = []
+        played_rows = []
+        for n, (date, _, game) in enumerate(replay):
+            elo.add_result(game)
+            if n + 1 == len(replay) or replay[n + 1][0] != date:
+                self.elo_days.append(date.toordinal())
+                rating_rows.append(list(elo.ratings.values()))
+                played_rows.append([elo.games_played.get(team, 0) for team in elo.ratings])
+
+        self.elo_teams = list(elo.ratings)
+        self.elo_days = np.array(self.elo_days, dtype=np.int32)
+        self.elo_ratings = np.full((len(rating_rows), len(self.elo_teams)), float(EloRatings.BASE_RATING))
+        self.elo_games_played = np.zeros((len(played_rows), len(self.elo_teams)), dtype=np.int32)
+        self.elo_team_counts = np.zeros(len(rating_rows), dtype=np.int32)
+        for d, (ratings, played) in enumerate(zip(rating_rows, played_rows)):
+            self.elo_ratings[d, :len(ratings)] = ratings
+            self.elo_games_played[d, :len(played)] = played
+            self.elo_team_counts[d] = len(ratings)
+
+    def team_stats(self, as_of_date=None):
+        """Team stats using only games on or before as_of_date (default: now)"""
+        if as_of_date is None:
+            as_of_date = datetime.now()
+        day = as_of_date.toordinal()
+
+        result = {}
+        for team, days in self.team_days.items():
+            n = int(np.searchsorted(days, day, side='right'))
+            if n == 0:
+                continue
+
+            state = dict(zip(AS_OF_COUNT_COLUMNS, self.team_counts[team][n].tolist()))
+            state['recent'] = self.team_outcomes[team][max(0, n - RECENT_FORM_GAMES):n]
+            state['streak_outcome'] = self.team_outcomes[team][n - 1]
+            state['streak_count'] = int(self.team_streaks[team][n - 1])
+            result[team] = _derive_team_stats(state)
+
+        return result
+
+    def performance_rankings(self, as_of_date=None):
+        """ELO performance rankings using only games on or before as_of_date (default: now)"""
+        if as_of_date is None:
+            as_of_date = datetime.now()
+
+        d = int(np.searchsorted(self.elo_days, as_of_date.toordinal(), side='right')) - 1
+        if d < 0:
+            return {}
+
+        num_teams = int(self.elo_team_counts[d])
+        ratings = self.elo_ratings[d, :num_teams]
+        games_played = self.elo_games_played[d, :num_teams].tolist()
+
+        # Stable sort keeps insertion order for equal ratings, like sorted(reverse=True)
+        order = np.argsort(-ratings, kind='stable').tolist()
+        ratings = ratings.tolist()
+
+        performance_rankings = {}
+        for i, team_id in enumerate(order, 1):
+            if games_played[team_id] >= 3:  # Minimum 3 games to be ranked
+                performance_rankings[self.elo_teams[team_id]] = {
+                    'rank': i,
+                    'rating': round(ratings[team_id], 1),
+                    'games_played': games_played[team_id]
+                }
+
+        return performance_rankings
+
+
+def predict_game(away_team, home_team, rankings, team_stats, games, expert_rankings=None, mhr_rankings=None, jspr_rankings=None, performance_rankings=None, nehj_rankings=None, feature_store=None):
     """
     Predict game outcome using multi-factor model
 
+    If a TeamFeatureStore built from the same sources is passed, factors are
+    read from its arrays instead of the string-keyed dicts.
+
     Returns:
     - predicted_winner: Team name
     - confidence: 50-99%
     - factors: Dict with each factor's contribution
     """
+    if feature_store is not None:
+        return predict_games([(away_team, home_team)], feature_store.sources,
+                             include_factors=True, feature_store=feature_store)[0]
+
     if expert_rankings is None:
         expert_rankings = {}
     if mhr_rankings is None:
@@ -844,12 +1609,66 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
     away_team = normalize_team_name(away_team)
     home_team = normalize_team_name(home_team)
 
-    # Initialize scores
+    # Raw factor values (with their defaults), scaled to 0-1 by FACTOR_BOUNDS
+    sources = {
+        'roster_rankings': rankings,
+        'team_stats': team_stats,
+        'mhr_rankings': mhr_rankings,
+        'jspr_rankings': jspr_rankings,
+        'performance_rankings': performance_rankings,
+        'nehj_rankings': nehj_rankings,
+    }
+    normalized = normalize_team_factors(np.array([team_factor_values(away_team, sources),
+                                                  team_factor_values(home_team, sources)]))
+    away_factors, home_factors = normalized.tolist()
+
+    # 1-8. Team factors (JSPR RPI, performance ELO, MHR, NEHJ rank, form, goal
+    # differential, win %, top player), with home advantage before win %
     away_score = 0
     home_score = 0
-    factors = {}
+    for column, factor in enumerate(TEAM_FACTOR_COLUMNS):
+        if factor == 'win_pct':
+            # Away team gets (1 - HOME_ADVANTAGE), home gets HOME_ADVANTAGE
+            away_score += PREDICTION_WEIGHTS['home_advantage'] * (1 - HOME_ADVANTAGE)
+            home_score += PREDICTION_WEIGHTS['home_advantage'] * HOME_ADVANTAGE
+        away_score += PREDICTION_WEIGHTS[factor] * away_factors[column]
+        home_score += PREDICTION_WEIGHTS[factor] * home_factors[column]
+
+    # 9. Head-to-Head (5%)
+    h2h = calculate_head_to_head(games, away_team, home_team)
+    if h2h and h2h['games'] > 0:
+        # Away team's perspective
+        h2h_score = (h2h['wins'] + 0.5 * h2h['ties']) / h2h['games']
+        away_score += PREDICTION_WEIGHTS['head_to_head'] * h2h_score
+        home_score += PREDICTION_WEIGHTS['head_to_head'] * (1 - h2h_score)
+    else:
+        # No head-to-head, split evenly
+        away_score += PREDICTION_WEIGHTS['head_to_head'] * 0.5
+        home_score += PREDICTION_WEIGHTS['head_to_head'] * 0.5
+
+    factors = explain_matchup(away_team, home_team, rankings, team_stats, h2h,
+                              mhr_rankings, jspr_rankings, performance_rankings, nehj_rankings)
+
+    return _build_prediction(away_team, home_team, away_score, home_score, factors)
+
+
+def explain_matchup(away_team, home_team, rankings, team_stats, h2h, mhr_rankings=None,
+                    jspr_rankings=None, performance_rankings=None, nehj_rankings=None):
+    """
+    Build the per-factor breakdown shown alongside a prediction
+
+    Team names must already be normalized. `h2h` is the away team's
+    head-to-head record (or None) as returned by calculate_head_to_head.
+    """
+    if mhr_rankings is None:
+        mhr_rankings = {}
+    if jspr_rankings is None:
+        jspr_rankings = {}
+    if performance_rankings is None:
+        performance_rankings = {}
+    if nehj_rankings is None:
+        nehj_rankings = {}
 
-    # Get data for each team
     away_ranking = rankings.get(away_team, {})
     home_ranking = rankings.get(home_team, {})
     away_stats = team_stats.get(away_team, {})
@@ -863,23 +1682,12 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
     away_nehj = nehj_rankings.get(away_team, {})
     home_nehj = nehj_rankings.get(home_team, {})
 
-    # ==========================================================================
-    # 1. JSPR Rankings (25%) - OFFICIAL NEPSIHA power rankings
-    # This is the most important factor - official league rankings with RPI
-    # ==========================================================================
+    factors = {}
+
     away_jspr_rank = away_jspr.get('rank', 40)  # Default to #40 if not ranked
     home_jspr_rank = home_jspr.get('rank', 40)
     away_rpi = away_jspr.get('rpi', 0.50)
     home_rpi = home_jspr.get('rpi', 0.50)
-
-    # Normalize RPI to 0-1 scale (range: 0.50 to 0.65)
-    rpi_min, rpi_max = 0.50, 0.65
-    away_rpi_norm = (away_rpi - rpi_min) / (rpi_max - rpi_min)
-    home_rpi_norm = (home_rpi - rpi_min) / (rpi_max - rpi_min)
-
-    away_score += PREDICTION_WEIGHTS['jspr_ranking'] * max(0, min(1, away_rpi_norm))
-    home_score += PREDICTION_WEIGHTS['jspr_ranking'] * max(0, min(1, home_rpi_norm))
-
     factors['jspr_ranking'] = {
         'away': f"#{away_jspr_rank}" if away_jspr_rank <= 16 else 'NR',
         'away_rpi': round(away_rpi, 4),
@@ -888,44 +1696,18 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
         'favors': 'home' if home_rpi > away_rpi else 'away'
     }
 
-    # ==========================================================================
-    # 2. Performance Rankings (15%) - Our own ELO-style ranking from game results
-    # ==========================================================================
-    away_perf_rank = away_perf.get('rank', 50)
-    home_perf_rank = home_perf.get('rank', 50)
     away_perf_rating = away_perf.get('rating', 1500)
     home_perf_rating = home_perf.get('rating', 1500)
-
-    # Normalize rating to 0-1 scale (range: 1400 to 1650)
-    perf_min, perf_max = 1400, 1650
-    away_perf_norm = (away_perf_rating - perf_min) / (perf_max - perf_min)
-    home_perf_norm = (home_perf_rating - perf_min) / (perf_max - perf_min)
-
-    away_score += PREDICTION_WEIGHTS['performance_rank'] * max(0, min(1, away_perf_norm))
-    home_score += PREDICTION_WEIGHTS['performance_rank'] * max(0, min(1, home_perf_norm))
-
     factors['performance_rank'] = {
-        'away': f"#{away_perf_rank}",
+        'away': f"#{away_perf.get('rank', 50)}",
         'away_rating': round(away_perf_rating, 1),
-        'home': f"#{home_perf_rank}",
+        'home': f"#{home_perf.get('rank', 50)}",
         'home_rating': round(home_perf_rating, 1),
         'favors': 'home' if home_perf_rating > away_perf_rating else 'away'
     }
 
-    # ==========================================================================
-    # 3. MHR Rating (20%) - ELO-style rating adjusted for schedule strength
-    # Rating range: ~89 (bottom) to ~100 (top)
-    away_mhr_rating = away_mhr.get('rating', 94.0)  # Default to middle-tier
+    away_mhr_rating = away_mhr.get('rating', 94.0)
     home_mhr_rating = home_mhr.get('rating', 94.0)
-
-    # Normalize to 0-1 scale (89-100 range)
-    mhr_min, mhr_max = 89.0, 100.0
-    away_mhr_norm = (away_mhr_rating - mhr_min) / (mhr_max - mhr_min)
-    home_mhr_norm = (home_mhr_rating - mhr_min) / (mhr_max - mhr_min)
-
-    away_score += PREDICTION_WEIGHTS['mhr_rating'] * max(0, min(1, away_mhr_norm))
-    home_score += PREDICTION_WEIGHTS['mhr_rating'] * max(0, min(1, home_mhr_norm))
-
     factors['mhr_rating'] = {
         'away': round(away_mhr_rating, 2),
         'away_rank': away_mhr.get('rank', 'NR'),
@@ -936,22 +1718,8 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
         'favors': 'home' if home_mhr_rating > away_mhr_rating else 'away'
     }
 
-    # ==========================================================================
-    # 4. NEHJ Expert Rankings (10%) - Marinofsky's expert eye test
-    # Captures intangibles: coaching, chemistry, goaltending, momentum
-    # ==========================================================================
     away_nehj_rank = away_nehj.get('rank', 25)  # Default to #25 if not ranked
     home_nehj_rank = home_nehj.get('rank', 25)
-
-    # Convert rank to score (lower rank = higher score)
-    # Rank 1 = 1.0, Rank 14 = 0.0 (bottom of ranked teams)
-    nehj_min, nehj_max = 1, 14
-    away_nehj_norm = max(0, (nehj_max - away_nehj_rank) / (nehj_max - nehj_min))
-    home_nehj_norm = max(0, (nehj_max - home_nehj_rank) / (nehj_max - nehj_min))
-
-    away_score += PREDICTION_WEIGHTS['nehj_expert'] * away_nehj_norm
-    home_score += PREDICTION_WEIGHTS['nehj_expert'] * home_nehj_norm
-
     factors['nehj_expert'] = {
         'away': f"#{away_nehj_rank}" if away_nehj_rank <= 14 else 'NR',
         'home': f"#{home_nehj_rank}" if home_nehj_rank <= 14 else 'NR',
@@ -960,101 +1728,64 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
         'favors': 'home' if home_nehj_rank < away_nehj_rank else 'away'
     }
 
-    # ==========================================================================
-    # 5. Recent Form (12%)
-    # ==========================================================================
     away_form = away_stats.get('form_score', 0.5)
     home_form = home_stats.get('form_score', 0.5)
-
-    away_score += PREDICTION_WEIGHTS['recent_form'] * away_form
-    home_score += PREDICTION_WEIGHTS['recent_form'] * home_form
     factors['recent_form'] = {
         'away': away_stats.get('last_5_record', '-'),
         'home': home_stats.get('last_5_record', '-'),
         'favors': 'home' if home_form > away_form else 'away'
     }
 
-    # 3. Goal Differential (15%)
     away_gd = away_stats.get('goal_diff_per_game', 0)
     home_gd = home_stats.get('goal_diff_per_game', 0)
-
-    # Normalize (-3 to +3 typical range)
-    away_gd_norm = (away_gd + 3) / 6  # Maps -3 to 0, +3 to 1
-    home_gd_norm = (home_gd + 3) / 6
-
-    away_score += PREDICTION_WEIGHTS['goal_diff'] * max(0, min(1, away_gd_norm))
-    home_score += PREDICTION_WEIGHTS['goal_diff'] * max(0, min(1, home_gd_norm))
     factors['goal_diff'] = {
         'away': round(away_gd, 2),
         'home': round(home_gd, 2),
         'favors': 'home' if home_gd > away_gd else 'away'
     }
 
-    # 4. Home Advantage (10%)
-    # Away team gets (1 - HOME_ADVANTAGE), home gets HOME_ADVANTAGE
-    away_score += PREDICTION_WEIGHTS['home_advantage'] * (1 - HOME_ADVANTAGE)
-    home_score += PREDICTION_WEIGHTS['home_advantage'] * HOME_ADVANTAGE
     factors['home_advantage'] = {
         'away': 'Away',
         'home': 'Home',
         'favors': 'home'
     }
 
-    # 5. Overall Win Percentage (10%)
     away_wp = away_stats.get('win_pct', 0.5)
     home_wp = home_stats.get('win_pct', 0.5)
-
-    away_score += PREDICTION_WEIGHTS['win_pct'] * away_wp
-    home_score += PREDICTION_WEIGHTS['win_pct'] * home_wp
     factors['win_pct'] = {
         'away': f"{away_wp:.1%}",
         'home': f"{home_wp:.1%}",
         'favors': 'home' if home_wp > away_wp else 'away'
     }
 
-    # 6. Top Player with Age Adjustment (10%)
     away_max = away_ranking.get('max_points', 3000)
     home_max = home_ranking.get('max_points', 3000)
-    away_max_raw = away_ranking.get('max_points_raw', away_max)
-    home_max_raw = home_ranking.get('max_points_raw', home_max)
-
-    # Normalize (range roughly 2500-6500 for age-adjusted)
-    max_min, max_max = 2500, 6500
-    away_max_norm = (away_max - max_min) / (max_max - max_min)
-    home_max_norm = (home_max - max_min) / (max_max - max_min)
-
-    away_score += PREDICTION_WEIGHTS['top_player'] * max(0, min(1, away_max_norm))
-    home_score += PREDICTION_WEIGHTS['top_player'] * max(0, min(1, home_max_norm))
     factors['top_player'] = {
         'away': round(away_max, 0),
-        'away_raw': round(away_max_raw, 0),
+        'away_raw': round(away_ranking.get('max_points_raw', away_max), 0),
         'home': round(home_max, 0),
-        'home_raw': round(home_max_raw, 0),
+        'home_raw': round(home_ranking.get('max_points_raw', home_max), 0),
         'favors': 'home' if home_max > away_max else 'away'
     }
 
-    # 7. Head-to-Head (5%)
-    h2h = calculate_head_to_head(games, away_team, home_team)
     if h2h and h2h['games'] > 0:
-        # Away team's perspective
-        h2h_score = (h2h['wins'] + 0.5 * h2h['ties']) / h2h['games']
-        away_score += PREDICTION_WEIGHTS['head_to_head'] * h2h_score
-        home_score += PREDICTION_WEIGHTS['head_to_head'] * (1 - h2h_score)
         factors['head_to_head'] = {
             'away': f"{h2h['wins']}-{h2h['losses']}-{h2h['ties']}",
             'home': f"{h2h['losses']}-{h2h['wins']}-{h2h['ties']}",
             'favors': 'away' if h2h['wins'] > h2h['losses'] else 'home'
         }
     else:
-        # No head-to-head, split evenly
-        away_score += PREDICTION_WEIGHTS['head_to_head'] * 0.5
-        home_score += PREDICTION_WEIGHTS['head_to_head'] * 0.5
         factors['head_to_head'] = {
             'away': 'N/A',
             'home': 'N/A',
             'favors': 'neutral'
         }
 
+    return factors
+
+
+def _build_prediction(away_team, home_team, away_score, home_score, factors=None):
+    """Turn raw away/home scores into the prediction dict (winner, confidence, tier)"""
     # Calculate winner and confidence
     total_score = away_score + home_score
     if total_score == 0:
@@ -1088,7 +1819,7 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
     else:
         tier = 'Toss-up'
 
-    return {
+    prediction = {
         'predicted_winner': predicted_winner,
         'confidence': confidence,
         'tier': tier,
@@ -1096,21 +1827,722 @@ def predict_game(away_team, home_team, rankings, team_stats, games, expert_ranki
         'home_score': round(home_score, 4),
         'away_pct': round(away_pct * 100, 1),
         'home_pct': round(home_pct * 100, 1),
-        'factors': factors
     }
+    if factors is not None:
+        prediction['factors'] = factors
+
+    return prediction
+
+
+# =============================================================================
+# TEAM FEATURE STORE
+# =============================================================================
+
+# Per-team factor columns of the prediction matrix, in the order predict_game
+# accumulates them (home advantage and head-to-head are per-matchup, not per-team)
+TEAM_FACTOR_COLUMNS = [
+    'jspr_ranking',
+    'performance_rank',
+    'mhr_rating',
+    'nehj_expert',
+    'recent_form',
+    'goal_diff',
+    'win_pct',
+    'top_player',
+]
+
+# Per-team columns of the power ranking matrix, in POWER_RANKING_WEIGHTS order
+POWER_FACTOR_COLUMNS = [
+    'jspr_rpi',
+    'nehj_expert',
+    'performance_elo',
+    'mhr_rating',
+    'win_pct',
+    'recent_form',
+    'roster_avg',
+    'top_player',
+    'roster_depth',
+]
+
+# Normalization range for each bounded prediction factor (raw value at 0 and at 1;
+# NEHJ rank is reversed), read by predict_game and the feature store through
+# normalize_team_factors. recent_form and win_pct are already 0-1.
+FACTOR_BOUNDS = {
+    'jspr_ranking': (0.50, 0.65),     # RPI
+    'performance_rank': (1400, 1650),  # ELO
+    'mhr_rating': (89.0, 100.0),
+    'nehj_expert': (1, 14),            # Rank 1 -> 1.0, rank 14 -> 0.0
+    'goal_diff': (-3, 3),              # Goals per game
+    'top_player': (2500, 6500),        # Age-adjusted max points
+}
+
+# Head-to-head count columns (from the row team's perspective)
+H2H_WINS, H2H_LOSSES, H2H_TIES = 0, 1, 2
+
+# Pair key multiplier for sparse head-to-head lookups (team_id * stride + opp_id);
+# fixed so keys stay valid as new teams are interned
+H2H_KEY_STRIDE = 1 << 32
+
+
+def team_factor_values(team, sources):
+    """Raw (unnormalized) TEAM_FACTOR_COLUMNS values for one team, with predict_game's defaults"""
+    stats = sources.get('team_stats', {}).get(team, {})
+    return (
+        sources.get('jspr_rankings', {}).get(team, {}).get('rpi', 0.50),
+        sources.get('performance_rankings', {}).get(team, {}).get('rating', 1500),
+        sources.get('mhr_rankings', {}).get(team, {}).get('rating', 94.0),
+        sources.get('nehj_rankings', {}).get(team, {}).get('rank', 25),
+        stats.get('form_score', 0.5),
+        stats.get('goal_diff_per_game', 0),
+        stats.get('win_pct', 0.5),
+        sources.get('roster_rankings', {}).get(team, {}).get('max_points', 3000),
+    )
+
+
+def build_team_feature_matrix(teams, sources):
+    """
+    Build a (teams x factors) matrix of normalized, clamped factor values
+
+    Columns follow TEAM_FACTOR_COLUMNS and use the same defaults and
+    normalization ranges as predict_game (FACTOR_BOUNDS), so each row is
+    exactly what predict_game would compute for that team.
+    """
+    raw = np.empty((len(teams), len(TEAM_FACTOR_COLUMNS)))
+    for i, team in enumerate(teams):
+        raw[i] = team_factor_values(team, sources)
+
+    return normalize_team_factors(raw)
+
+
+def normalize_team_factors(raw, bounds=None):
+    """
+    Scale raw TEAM_FACTOR_COLUMNS values (last axis) to 0-1 using (low, high) bounds
+
+    bounds defaults to FACTOR_BOUNDS. NEHJ is a rank (low is best), so it
+    maps high -> 0 and low -> 1 and is only floored at 0, as in predict_game.
+    """
+    if bounds is None:
+        bounds = FACTOR_BOUNDS
+
+    matrix = np.empty_like(raw, dtype=float)
+    for col, factor in enumerate(TEAM_FACTOR_COLUMNS):
+        if factor not in bounds:
+            matrix[..., col] = raw[..., col]
+            continue
+        low, high = bounds[factor]
+        if factor == 'nehj_expert':
+            matrix[..., col] = np.maximum(0, (high - raw[..., col]) / (high - low))
+        else:
+            matrix[..., col] = np.clip((raw[..., col] - low) / (high - low), 0, 1)
+
+    return matrix
+
+
+def build_power_feature_matrix(teams, sources):
+    """
+    Build a (teams x factors) matrix of normalized power ranking factors
+
+    Columns follow POWER_FACTOR_COLUMNS with the same defaults and ranges as
+    calculate_prodigy_power_rankings.
+    """
+    rankings = sources.get('roster_rankings', {})
+    team_stats = sources.get('team_stats', {})
+    mhr_rankings = sources.get('mhr_rankings', {})
+    jspr_rankings = sources.get('jspr_rankings', {})
+    performance_rankings = sources.get('performance_rankings', {})
+    nehj_rankings = sources.get('nehj_rankings', {})
+
+    raw = np.empty((len(teams), len(POWER_FACTOR_COLUMNS)))
+    for i, team in enumerate(teams):
+        stats = team_stats.get(team, {})
+        roster = rankings.get(team, {})
+        wins = stats.get('wins', 0)
+        losses = stats.get('losses', 0)
+        ties = stats.get('ties', 0)
+        total_games = wins + losses + ties
+        raw[i] = (
+            jspr_rankings.get(team, {}).get('rpi', 0.50),
+            nehj_rankings.get(team, {}).get('rank', 25),
+            performance_rankings.get(team, {}).get('rating', 1500),
+            mhr_rankings.get(team, {}).get('rating', 94.0),
+            (wins + 0.5 * ties) / total_games if total_games > 0 else 0.5,
+            stats.get('form_score', 0.5),
+            roster.get('avg_points', 0),
+            roster.get('max_points', 0),
+            roster.get('roster_size', 0),
+        )
+
+    matrix = np.empty_like(raw)
+    matrix[:, 0] = np.clip((raw[:, 0] - 0.50) / 0.15, 0, 1)             # RPI 0.50-0.65
+    matrix[:, 1] = np.where(raw[:, 1] <= 14, np.maximum(0, (14 - raw[:, 1]) / 13), 0)
+    matrix[:, 2] = np.clip((raw[:, 2] - 1400) / 250, 0, 1)              # ELO 1400-1650
+    matrix[:, 3] = np.clip((raw[:, 3] - 89) / 11, 0, 1)                 # MHR 89-100
+    matrix[:, 4] = raw[:, 4]
+    matrix[:, 5] = raw[:, 5]
+    matrix[:, 6] = np.clip(raw[:, 6] / 5000, 0, 1)                      # Roster avg 0-5000
+    matrix[:, 7] = np.clip(raw[:, 7] / 8000, 0, 1)                      # Top player 0-8000
+    matrix[:, 8] = np.clip(raw[:, 8] / 20, 0, 1)                        # Depth 0-20
+
+    return matrix
+
+
+class TeamFeatureStore:
+    """
+    Dense integer ids and precomputed factor arrays for every team
+
+    Built once per run from the data_sources dict. Every alias (and every raw
+    name seen so far) maps to a team id, and the prediction and power ranking
+    factors are stored as NumPy arrays indexed by that id, so scoring never
+    goes back to the string-keyed source dicts. Head-to-head stays sparse:
+    only pairs that have met have a record, kept as sorted integer pair keys
+    (team_id * H2H_KEY_STRIDE + opp_id) with a (wins, losses, ties) row each,
+    so batch lookups are one np.searchsorted.
+
+    The store owns the HeadToHeadIndex behind those arrays: add_result()
+    updates both, and matchup scores and factor explanations read them live,
+    so they never disagree.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+        teams = set()
+        for key in ['jspr_rankings', 'nehj_rankings', 'performance_rankings',
+                    'mhr_rankings', 'team_stats', 'roster_rankings']:
+            teams.update(sources.get(key, {}).keys())
+        for game in sources.get('games', []):
+            teams.add(game['team'])
+            teams.add(game['opponent'])
+
+        self.teams = sorted(teams)
+        self.team_ids = {team: i for i, team in enumerate(self.teams)}
+        for alias, canonical in TEAM_ALIASES.items():
+            if canonical in self.team_ids:
+                self.team_ids[alias] = self.team_ids[canonical]
+
+        # Row capacity grows geometrically as unknown teams are interned
+        self._prediction_features = build_team_feature_matrix(self.teams, sources)
+        self._power_features = build_power_feature_matrix(self.teams, sources)
+
+        self.h2h_index = sources.get('h2h_index')
+        if self.h2h_index is None:
+            self.h2h_index = HeadToHeadIndex(sources.get('games', []))
+
+        # Sorted pair keys and their counts, from the index's string-keyed records
+        pairs = {}
+        for (team, opponent), record in self.h2h_index.records.items():
+            key = self.team_id(team) * H2H_KEY_STRIDE + self.team_id(opponent)
+            pairs[key] = (record['wins'], record['losses'], record['ties'])
+        self._h2h_keys = np.array(sorted(pairs), dtype=np.int64)
+        self._h2h_counts = np.array([pairs[key] for key in self._h2h_keys.tolist()],
+                                    dtype=np.int32).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.teams)
+
+    @property
+    def prediction_features(self):
+        return self._prediction_features[:len(self.teams)]
+
+    @property
+    def power_features(self):
+        return self._power_features[:len(self.teams)]
+
+    def team_id(self, name):
+        """Get the id for a raw or normalized team name, interning unknown teams"""
+        team_id = self.team_ids.get(name)
+        if team_id is not None:
+            return team_id
+
+        team = normalize_team_name(name)
+        team_id = self.team_ids.get(team)
+        if team_id is None:
+            team_id = self._intern(team)
+        self.team_ids[name] = team_id
+        return team_id
+
+    def find_team_id(self, name):
+        """Get the id for a raw or normalized team name, or None if the team is unknown"""
+        team_id = self.team_ids.get(name)
+        if team_id is None:
+            team_id = self.team_ids.get(normalize_team_name(name))
+        return team_id
+
+    def _intern(self, team):
+        """Add a team with no source data (all factors at their defaults)"""
+        team_id = len(self.teams)
+        if team_id == len(self._prediction_features):
+            capacity = max(2 * team_id, 8)
+            self._prediction_features = np.resize(self._prediction_features,
+                                                  (capacity, self._prediction_features.shape[1]))
+            self._power_features = np.resize(self._power_features, (capacity, self._power_features.shape[1]))
+        self._prediction_features[team_id] = build_team_feature_matrix([team], {})[0]
+        self._power_features[team_id] = build_power_feature_matrix([team], {})[0]
+
+        self.teams.append(team)
+        self.team_ids[team] = team_id
+        return team_id
+
+    def add_result(self, game):
+        """Add one game result row (team's perspective) to head-to-head"""
+        team_id, opp_id = self.team_id(game['team']), self.team_id(game['opponent'])
+        key = team_id * H2H_KEY_STRIDE + opp_id
+        # Index under the canonical names, which is what head_to_head() looks up
+        self.h2h_index.add_result(dict(game, team=self.teams[team_id], opponent=self.teams[opp_id]))
+
+        column = {'Win': H2H_WINS, 'Loss': H2H_LOSSES}.get(game['outcome'], H2H_TIES)
+        pos = int(np.searchsorted(self._h2h_keys, key))
+        if pos == len(self._h2h_keys) or self._h2h_keys[pos] != key:
+            self._h2h_keys = np.insert(self._h2h_keys, pos, key)
+            self._h2h_counts = np.insert(self._h2h_counts, pos, 0, axis=0)
+        self._h2h_counts[pos, column] += 1
+
+    def head_to_head(self, team_id, opp_id):
+        """Head-to-head record for team vs opponent, or None if they haven't played"""
+        return self.h2h_index.get(self.teams[team_id], self.teams[opp_id])
+
+    def h2h_counts(self, team_ids, opp_ids):
+        """(wins, losses, ties) per (team, opponent) id pair, zeros for pairs that haven't met"""
+        keys = np.asarray(team_ids, dtype=np.int64) * H2H_KEY_STRIDE + np.asarray(opp_ids, dtype=np.int64)
+        counts = np.zeros((len(keys), 3), dtype=np.int32)
+        if len(self._h2h_keys):
+            pos = np.minimum(np.searchsorted(self._h2h_keys, keys), len(self._h2h_keys) - 1)
+            found = self._h2h_keys[pos] == keys
+            counts[found] = self._h2h_counts[pos[found]]
+        return counts
+
+
+# =============================================================================
+# BATCH PREDICTION
+# =============================================================================
+
+def score_matchups(matchups, feature_store):
+    """
+    Raw (unrounded) away and home model scores for a batch of matchups
+
+    Returns (away_ids, home_ids, away_scores, home_scores) as NumPy arrays;
+    win probabilities are score / (away_score + home_score).
+    """
+    away_idx = np.array([feature_store.team_id(away) for away, _ in matchups], dtype=np.intp)
+    home_idx = np.array([feature_store.team_id(home) for _, home in matchups], dtype=np.intp)
+    away_scores, home_scores = score_pairs(away_idx, home_idx, feature_store)
+    return away_idx, home_idx, away_scores, home_scores
+
+
+def score_pairs(away_idx, home_idx, feature_store):
+    """Raw away and home model scores for matchups given as team id arrays"""
+    features = feature_store.prediction_features
+
+    h2h = feature_store.h2h_counts(away_idx, home_idx)
+    h2h_games = h2h.sum(axis=1)
+    h2h_score = np.full(len(away_idx), 0.5)
+    played = h2h_games > 0
+    h2h_score[played] = (h2h[played, H2H_WINS] + 0.5 * h2h[played, H2H_TIES]) / h2h_games[played]
+
+    # Accumulate in predict_game's order so scores match it exactly
+    away_scores = np.zeros(len(away_idx))
+    home_scores = np.zeros(len(away_idx))
+    for column, factor in enumerate(TEAM_FACTOR_COLUMNS):
+        if factor == 'win_pct':
+            away_scores += PREDICTION_WEIGHTS['home_advantage'] * (1 - HOME_ADVANTAGE)
+            home_scores += PREDICTION_WEIGHTS['home_advantage'] * HOME_ADVANTAGE
+        weight = PREDICTION_WEIGHTS[factor]
+        away_scores += weight * features[away_idx, column]
+        home_scores += weight * features[home_idx, column]
+    away_scores += PREDICTION_WEIGHTS['head_to_head'] * h2h_score
+    home_scores += PREDICTION_WEIGHTS['head_to_head'] * (1 - h2h_score)
+
+    return away_scores, home_scores
+
+
+def predict_games(matchups, sources, include_factors=False, feature_store=None):
+    """
+    Predict a batch of games in one pass
+
+    `matchups` is a list of (away_team, home_team) pairs and `sources` is the
+    data_sources dict built by generate_all_predictions ('h2h_index' or
+    'games' supplies head-to-head). Team features come from a TeamFeatureStore
+    (built from `sources` unless one is passed in) and every matchup is scored
+    with array operations; the result for each game is identical to
+    predict_game. Factor breakdowns are only built when include_factors is True.
+    """
+    if feature_store is None:
+        feature_store = TeamFeatureStore(sources)
+
+    away_idx, home_idx, away_scores, home_scores = score_matchups(matchups, feature_store)
+
+    predictions = []
+    for away_id, home_id, away_score, home_score in zip(
+            away_idx.tolist(), home_idx.tolist(), away_scores.tolist(), home_scores.tolist()):
+        away_team = feature_store.teams[away_id]
+        home_team = feature_store.teams[home_id]
+        factors = None
+        if include_factors:
+            factors = explain_matchup(
+                away_team, home_team,
+                sources.get('roster_rankings', {}),
+                sources.get('team_stats', {}),
+                feature_store.head_to_head(away_id, home_id),
+                sources.get('mhr_rankings', {}),
+                sources.get('jspr_rankings', {}),
+                sources.get('performance_rankings', {}),
+                sources.get('nehj_rankings', {}),
+            )
+        predictions.append(_build_prediction(away_team, home_team, away_score, home_score, factors))
+
+    return predictions
+
+
+# Per-game factor columns of PredictionFactorCache, in PREDICTION_WEIGHTS terms.
+# 'home_advantage' is a venue indicator (1 for both sides); its weight becomes
+# weight * (1 - HOME_ADVANTAGE) for the away side and weight * HOME_ADVANTAGE
+# for the home side.
+PREDICTION_FACTOR_COLUMNS = TEAM_FACTOR_COLUMNS + ['home_advantage', 'head_to_head']
+
+
+class PredictionFactorCache:
+    """
+    Per-game normalized factor vectors for fast re-weighting
+
+    Built once from a batch of matchups. Re-scoring under different
+    PREDICTION_WEIGHTS or HOME_ADVANTAGE is then a matrix-vector product
+    (or matrix-matrix for a sweep of weight sets) with no lookups, stats or
+    ELO work. Scores equal score_matchups' up to float summation order at
+    the time the cache is built; rebuild it after new results. Can be saved
+    to / loaded from an .npz file to reuse across sessions.
+    """
+
+    def __init__(self, away_teams, home_teams, away_factors, home_factors):
+        self.away_teams = list(away_teams)
+        self.home_teams = list(home_teams)
+        self.away_factors = away_factors
+        self.home_factors = home_factors
+
+    def __len__(self):
+        return len(self.away_teams)
+
+    @classmethod
+    def from_matchups(cls, matchups, feature_store):
+        """Cache factor vectors for (away_team, home_team) pairs"""
+        away_idx = np.array([feature_store.team_id(away) for away, _ in matchups], dtype=np.intp)
+        home_idx = np.array([feature_store.team_id(home) for _, home in matchups], dtype=np.intp)
+        features = feature_store.prediction_features
+
+        h2h = feature_store.h2h_counts(away_idx, home_idx)
+        h2h_games = h2h.sum(axis=1)
+        h2h_score = np.full(len(matchups), 0.5)
+        played = h2h_games > 0
+        h2h_score[played] = (h2h[played, H2H_WINS] + 0.5 * h2h[played, H2H_TIES]) / h2h_games[played]
+
+        venue = np.ones((len(matchups), 1))
+        away_factors = np.hstack([features[away_idx], venue, h2h_score[:, None]])
+        home_factors = np.hstack([features[home_idx], venue, 1 - h2h_score[:, None]])
+
+        return cls([feature_store.teams[i] for i in away_idx.tolist()],
+                   [feature_store.teams[i] for i in home_idx.tolist()],
+                   away_factors, home_factors)
+
+    @staticmethod
+    def weight_vectors(weights=None, home_advantage=None):
+        """
+        Away and home weight arrays for one weight set or a sweep
+
+        weights is a dict of PREDICTION_WEIGHTS overrides or a list of them
+        (missing keys keep their current values); home_advantage is a number
+        or a list of the same length. Returns (factors,) or (factors x sets)
+        arrays for the away and home side.
+        """
+        weight_sets = weights if isinstance(weights, (list, tuple)) else [weights]
+        if home_advantage is None:
+            home_advantage = HOME_ADVANTAGE
+        advantages = np.broadcast_to(np.asarray(home_advantage, dtype=float), (len(weight_sets),))
+
+        away = np.empty((len(PREDICTION_FACTOR_COLUMNS), len(weight_sets)))
+        for k, overrides in enumerate(weight_sets):
+            merged = {**PREDICTION_WEIGHTS, **(overrides or {})}
+            away[:, k] = [merged[factor] for factor in PREDICTION_FACTOR_COLUMNS]
+        home = away.copy()
+
+        venue = PREDICTION_FACTOR_COLUMNS.index('home_advantage')
+        away[venue] *= 1 - advantages
+        home[venue] *= advantages
+
+        if not isinstance(weights, (list, tuple)):
+            return away[:, 0], home[:, 0]
+        return away, home
+
+    def scores(self, weights=None, home_advantage=None):
+        """Away and home scores; (games,) arrays, or (games x sets) for a sweep"""
+        away_weights, home_weights = self.weight_vectors(weights, home_advantage)
+        return self.away_factors @ away_weights, self.home_factors @ home_weights
+
+    def outcomes(self, weights=None, home_advantage=None):
+        """
+        Vectorized winner and confidence for every game
+
+        Returns (home_wins, confidence) arrays with the same rules as
+        _build_prediction: ties go to the home team and confidence is the
+        truncated win probability clamped to 50-99.
+        """
+        away_scores, home_scores = self.scores(weights, home_advantage)
+        total = away_scores + home_scores
+        total = np.where(total == 0, 1, total)
+        away_pct = away_scores / total
+        home_pct = home_scores / total
+
+        home_wins = home_pct >= away_pct
+        win_probability = np.where(home_wins, home_pct, away_pct)
+        confidence = np.floor(np.clip(win_probability * 100, 50, 99)).astype(int)
+
+        return home_wins, confidence
+
+    def predictions(self, weights=None, home_advantage=None):
+        """Prediction dicts (as predict_games, without factors) under one weight set"""
+        away_scores, home_scores = self.scores(weights, home_advantage)
+        return [_build_prediction(away, home, away_score, home_score)
+                for away, home, away_score, home_score in zip(
+                    self.away_teams, self.home_teams, away_scores.tolist(), home_scores.tolist())]
+
+    def save(self, filepath):
+        """Save the cached factor vectors to an .npz file"""
+        np.savez_compressed(filepath,
+                            away_teams=np.array(self.away_teams), home_teams=np.array(self.home_teams),
+                            away_factors=self.away_factors, home_factors=self.home_factors,
+                            columns=np.array(PREDICTION_FACTOR_COLUMNS))
+
+    @classmethod
+    def load(cls, filepath):
+        """Load factor vectors saved with save()"""
+        with np.load(filepath) as data:
+            if data['columns'].tolist() != PREDICTION_FACTOR_COLUMNS:
+                raise ValueError(f"{filepath} was saved with different factor columns")
+            return cls(data['away_teams'].tolist(), data['home_teams'].tolist(),
+                       data['away_factors'], data['home_factors'])
+
+
+# =============================================================================
+# RUN INSTRUMENTATION
+# =============================================================================
+
+# Run report / history written next to the predictions file
+RUN_REPORT_FILE = 'nepsac_run_report.json'
+RUN_HISTORY_FILE = 'nepsac_run_history.ndjson'
+
+
+class RunReport:
+    """
+    Stage timings and counters for one prediction run
+
+    Wrap each stage in `with report.span('stage'):` and bump counters with
+    report.count(). save() writes the report as JSON and appends a one-line
+    summary to a history file, so stage regressions show up run over run.
+    """
+
+    def __init__(self):
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self.profile_path = None
+        with _LOADER_CACHE_LOCK:
+            self._cache_stats = dict(LOADER_CACHE_STATS)
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the enclosed block as one stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start, start)
+
+    def add_span(self, name, seconds, start=None):
+        """Record a stage timed elsewhere (e.g. SourceLoader timings)"""
+        self.spans.append({
+            'name': name,
+            'seconds': round(seconds, 6),
+            'offset': round((start if start is not None else time.perf_counter() - seconds) - self._start, 6),
+        })
+
+    def count(self, name, n=1):
+        """Add n to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        counters = dict(self.counters)
+        with _LOADER_CACHE_LOCK:
+            cache_stats = dict(LOADER_CACHE_STATS)
+        counters['loader_cache_hits'] = cache_stats['hits'] - self._cache_stats['hits']
+        counters['loader_cache_misses'] = cache_stats['misses'] - self._cache_stats['misses']
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'total_seconds': round(time.perf_counter() - self._start, 6),
+            'spans': self.spans,
+            'counters': counters,
+            'profile': self.profile_path,
+        }
+
+    def save(self, filepath=RUN_REPORT_FILE, history_path=RUN_HISTORY_FILE):
+        """Write the report JSON and append a compact line to the run history"""
+        report = self.to_dict()
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        if history_path:
+            stage_seconds = defaultdict(float)
+            for span in report['spans']:
+                stage_seconds[span['name']] += span['seconds']
+            with open(history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'started': report['started'],
+                    'total_seconds': report['total_seconds'],
+                    'stages': {name: round(secs, 6) for name, secs in stage_seconds.items()},
+                    'counters': report['counters'],
+                }, separators=(',', ':')))
+                f.write('\n')
+
+        print(f"  Saved run report to {filepath}")
+        return report
+
+    def print_summary(self):
+        report = self.to_dict()
+        print(f"\nRun time: {report['total_seconds']:.3f}s")
+        for span in report['spans']:
+            print(f"  {span['name']:<28}{span['seconds'] * 1000:>10.1f}ms")
+        for name, value in report['counters'].items():
+            print(f"  {name:<28}{value:>10}")
+
+
+class RunProfiler:
+    """
+    Optional whole-run profiler: 'cprofile' (stdlib) or 'pyinstrument'
+
+    start() / stop(path) bracket the run; stop writes .prof stats for
+    cProfile or an HTML report for pyinstrument.
+    """
+
+    KINDS = ['cprofile', 'pyinstrument']
+
+    def __init__(self, kind):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown profiler: {kind}")
+        self.kind = kind
+        self._profiler = None
+
+    def start(self):
+        if self.kind == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            try:
+                from pyinstrument import Profiler
+            except ImportError as e:
+                raise ImportError("--profile pyinstrument requires pyinstrument (pip install pyinstrument)") from e
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    def stop(self, base_path):
+        """Stop profiling and write the output next to base_path; returns its path"""
+        if self.kind == 'cprofile':
+            self._profiler.disable()
+            path = base_path + '.prof'
+            self._profiler.dump_stats(path)
+        else:
+            self._profiler.stop()
+            path = base_path + '.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        return path
 
 
 # =============================================================================
 # MAIN EXECUTION
 # =============================================================================
 
-def generate_all_predictions():
-    """Generate predictions for all scheduled games"""
+# Independent input sources for a prediction run, loaded concurrently.
+# Any zero-argument callable works here, so a BigQuery or HTTP fetch can
+# replace a local CSV loader without changing generate_all_predictions.
+DATA_SOURCE_LOADERS = {
+    'games': load_game_results,
+    'team_rankings': load_team_rankings,
+    'schedule': load_schedule,
+    'roster': load_player_roster,
+    'mhr_rankings': load_mhr_rankings,
+    'expert_rankings': load_expert_rankings,
+    'jspr_rankings': load_jspr_rankings,
+    'nehj_rankings': load_nehj_expert_rankings,
+}
+
+
+class SourceLoader:
+    """
+    Run data source loaders concurrently on a thread pool
+
+    All loaders start as soon as the loader is entered; get(name) blocks only
+    until that one source is ready, so downstream steps start as soon as their
+    own inputs arrive. Per-source wall time is recorded in timings.
+    """
+
+    def __init__(self, loaders=None, max_workers=None):
+        self.loaders = dict(DATA_SOURCE_LOADERS if loaders is None else loaders)
+        self.max_workers = max_workers or len(self.loaders) or 1
+        self.timings = {}
+        self._executor = None
+        self._futures = {}
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='nepsac-load')
+        for name, loader in self.loaders.items():
+            self._futures[name] = self._executor.submit(self._timed, name, loader)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        return False
+
+    def _timed(self, name, loader):
+        start = time.perf_counter()
+        try:
+            return loader()
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def get(self, name):
+        """Wait for and return one source (re-raises the loader's exception)"""
+        return self._futures[name].result()
+
+
+def generate_all_predictions(state_dir=None, rebuild=False, loaders=None, report=None):
+    """
+    Generate predictions for all scheduled games
+
+    If state_dir is given, running state (team stats, ELO) is checkpointed there
+    and each run only applies results newer than the checkpoint. Pass
+    rebuild=True to recompute from the full history after corrections.
+    Parsed inputs are also cached there for the duration of the call (see
+    loader_cache); the process-wide setting is restored afterwards.
+
+    loaders overrides entries of DATA_SOURCE_LOADERS (e.g. remote fetchers).
+    Stage timings and counters go to report (a RunReport, created if not
+    given) and it is returned as data_sources['run_report'].
+    """
+    if report is None:
+        report = RunReport()
+    cache = loader_cache(os.path.join(state_dir, 'loader_cache')) if state_dir else contextlib.nullcontext()
 
+    with cache, SourceLoader(dict(DATA_SOURCE_LOADERS, **(loaders or {}))) as sources:
+        return _generate_predictions(sources, state_dir, rebuild, report)
+
+
+def _generate_predictions(sources, state_dir, rebuild, report):
+    """Body of generate_all_predictions, consuming sources as they finish loading"""
     print("Loading data...")
-    games = load_game_results()
-    original_rankings = load_team_rankings()
-    schedule = load_schedule()
+    with report.span('wait_core_sources'):
+        games = sources.get('games')
+        original_rankings = sources.get('team_rankings')
+        schedule = sources.get('schedule')
+    report.count('games_loaded', len(games))
 
     print(f"  Loaded {len(games)} game results")
     print(f"  Loaded {len(original_rankings)} team rankings (raw)")
@@ -1118,10 +2550,11 @@ def generate_all_predictions():
 
     # Load player roster and calculate age-adjusted rankings
     print("\nApplying age normalization...")
-    roster = load_player_roster()
+    roster = sources.get('roster')
     print(f"  Loaded rosters for {len(roster)} teams")
 
-    rankings = calculate_age_adjusted_rankings(roster, original_rankings)
+    with report.span('age_normalization'):
+        rankings = calculate_age_adjusted_rankings(roster, original_rankings)
     print(f"  Calculated age-adjusted rankings for {len(rankings)} teams")
 
     # Show some examples of age adjustment impact
@@ -1131,12 +2564,24 @@ def generate_all_predictions():
         print(f"  Youngest rosters (biggest boost): {', '.join([t for t,_ in young_teams[:3]])}")
 
     print("\nCalculating team stats...")
-    team_stats = calculate_team_stats(games)
+    with report.span('team_stats'):
+        if state_dir:
+            stats_path = os.path.join(state_dir, TEAM_STATS_STATE_FILE)
+            accumulator = TeamStatsAccumulator() if rebuild else TeamStatsAccumulator.load(stats_path)
+            now = datetime.now()
+            applied = accumulator.update([g for g in games if g['date'] and g['date'] <= now])
+            accumulator.save(stats_path)
+            team_stats = accumulator.team_stats()
+            print(f"  Applied {applied} new game results to {stats_path}")
+            report.count('games_applied', applied)
+        else:
+            team_stats = calculate_team_stats(games)
+    report.count('teams_with_stats', len(team_stats))
     print(f"  Calculated stats for {len(team_stats)} teams")
 
     # Load MHR rankings (mathematical ELO ratings for all 60 teams)
     print("\nLoading MyHockeyRankings...")
-    mhr_rankings = load_mhr_rankings()
+    mhr_rankings = sources.get('mhr_rankings')
     if mhr_rankings:
         print(f"  Loaded MHR rankings for {len(mhr_rankings)} teams")
         top_mhr = sorted(mhr_rankings.items(), key=lambda x: x[1]['rank'])[:5]
@@ -1146,7 +2591,7 @@ def generate_all_predictions():
 
     # Load USHR expert rankings (captures intangibles: coaching, goaltending, chemistry)
     print("\nLoading USHR expert rankings...")
-    expert_rankings = load_expert_rankings()
+    expert_rankings = sources.get('expert_rankings')
     if expert_rankings:
         print(f"  Loaded USHR expert rankings for {len(expert_rankings)} teams")
         top_expert = sorted(expert_rankings.items(), key=lambda x: x[1]['rank'])[:5]
@@ -1156,7 +2601,7 @@ def generate_all_predictions():
 
     # Load JSPR rankings (official NEPSIHA power rankings - highest weight)
     print("\nLoading JSPR rankings...")
-    jspr_rankings = load_jspr_rankings()
+    jspr_rankings = sources.get('jspr_rankings')
     if jspr_rankings:
         print(f"  Loaded JSPR rankings for {len(jspr_rankings)} teams")
         top_jspr = sorted(jspr_rankings.items(), key=lambda x: x[1]['rank'])[:5]
@@ -1166,7 +2611,10 @@ def generate_all_predictions():
 
     # Calculate performance rankings from game results (our own ELO-style ranking)
     print("\nCalculating performance rankings...")
-    performance_rankings = calculate_performance_rankings(games)
+    elo_path = os.path.join(state_dir, ELO_STATE_FILE) if state_dir else None
+    with report.span('performance_elo'):
+        performance_rankings = calculate_performance_rankings(games, checkpoint_path=elo_path, rebuild=rebuild)
+    report.count('teams_elo_ranked', len(performance_rankings))
     if performance_rankings:
         print(f"  Calculated performance rankings for {len(performance_rankings)} teams")
         top_perf = sorted(performance_rankings.items(), key=lambda x: x[1]['rank'])[:5]
@@ -1176,7 +2624,7 @@ def generate_all_predictions():
 
     # Load NEHJ expert rankings (Evan Marinofsky's eye test)
     print("\nLoading NEHJ expert rankings...")
-    nehj_rankings = load_nehj_expert_rankings()
+    nehj_rankings = sources.get('nehj_rankings')
     if nehj_rankings:
         print(f"  Loaded NEHJ expert rankings for {len(nehj_rankings)} teams")
         top_nehj = sorted(nehj_rankings.items(), key=lambda x: x[1]['rank'])[:5]
@@ -1184,31 +2632,12 @@ def generate_all_predictions():
     else:
         print("  No NEHJ expert rankings available")
 
-    print("\nGenerating predictions...")
-    predictions = {}
-
-    for date, date_games in schedule['dates'].items():
-        predictions[date] = []
-
-        for game in date_games:
-            away_team = game['awayTeam']
-            home_team = game['homeTeam']
-
-            prediction = predict_game(away_team, home_team, rankings, team_stats, games, expert_rankings, mhr_rankings, jspr_rankings, performance_rankings, nehj_rankings)
-
-            predictions[date].append({
-                'gameId': game['gameId'],
-                'away': away_team,
-                'home': home_team,
-                'time': game['time'],
-                'venue': game.get('location', ''),
-                'prediction': prediction
-            })
+    load_times = ', '.join(f"{name} {sources.timings[name] * 1000:.0f}ms" for name in sources.loaders)
+    print(f"\n  Source load times: {load_times}")
+    for name in sources.loaders:
+        report.add_span(f'load.{name}', sources.timings[name])
 
-    total_games = sum(len(g) for g in predictions.values())
-    print(f"  Generated {total_games} predictions")
-
-    # Return predictions and all loaded data sources (for power rankings)
+    # All loaded data sources (used for batch predictions and power rankings)
     data_sources = {
         'jspr_rankings': jspr_rankings,
         'nehj_rankings': nehj_rankings,
@@ -1216,16 +2645,188 @@ def generate_all_predictions():
         'mhr_rankings': mhr_rankings,
         'team_stats': team_stats,
         'roster_rankings': rankings,  # Age-adjusted roster rankings
+        'games': games,
+        'load_timings': {name: sources.timings[name] for name in sources.loaders},
+        'run_report': report,
     }
 
+    # Intern team names and precompute factor arrays once for the whole run
+    with report.span('feature_store'):
+        data_sources['h2h_index'] = HeadToHeadIndex(games)
+        feature_store = TeamFeatureStore(data_sources)
+        data_sources['feature_store'] = feature_store
+    report.count('teams_in_store', len(feature_store))
+
+    print("\nGenerating predictions...")
+    with report.span('predictions'):
+        scheduled = [(date, game) for date, date_games in schedule['dates'].items() for game in date_games]
+        matchups = [(game['awayTeam'], game['homeTeam']) for _, game in scheduled]
+        batch = predict_games(matchups, data_sources, include_factors=True, feature_store=feature_store)
+
+    with report.span('prediction_factor_cache'):
+        data_sources['prediction_factors'] = PredictionFactorCache.from_matchups(matchups, feature_store)
+
+    predictions = {date: [] for date in schedule['dates']}
+    for (date, game), prediction in zip(scheduled, batch):
+        predictions[date].append({
+            'gameId': game['gameId'],
+            'away': game['awayTeam'],
+            'home': game['homeTeam'],
+            'time': game['time'],
+            'venue': game.get('location', ''),
+            'prediction': prediction
+        })
+
+    total_games = sum(len(g) for g in predictions.values())
+    report.count('predictions', total_games)
+    print(f"  Generated {total_games} predictions")
+
     return predictions, data_sources
 
 
-def save_predictions(predictions, filepath='nepsac_predictions.json'):
-    """Save predictions to JSON file"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(predictions, f, indent=2)
+# Output formats for save_predictions / save_power_rankings:
+#   json     - indented JSON (default, what the front-end reads today)
+#   ndjson   - one game / team per line, streamed
+#   json.gz  - minified JSON with gzip, streamed, same shape as json
+#   parquet  - one row per game / team, nested factors flattened into scalar
+#              columns with one type each (requires pyarrow)
+OUTPUT_FORMATS = ['json', 'ndjson', 'json.gz', 'parquet']
+
+OUTPUT_EXTENSIONS = {
+    'json': '.json',
+    'ndjson': '.ndjson',
+    'json.gz': '.json.gz',
+    'parquet': '.parquet',
+}
+
+
+def output_path(filepath, output_format):
+    """Swap a .json path's extension for the given output format"""
+    base = filepath[:-len('.json')] if filepath.endswith('.json') else filepath
+    return base + OUTPUT_EXTENSIONS[output_format]
+
+
+def _open_output(filepath):
+    """Open a text output file, gzip-compressed if the path ends in .gz"""
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, 'wt', encoding='utf-8')
+    return open(filepath, 'w', encoding='utf-8')
+
+
+def write_ndjson(rows, filepath):
+    """Stream rows (dicts) to an NDJSON file one line at a time; returns the row count"""
+    count = 0
+    with _open_output(filepath) as f:
+        for row in rows:
+            f.write(json.dumps(row, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+# Strings the sources use in place of a missing number ('NR' = unranked, '-' = no data)
+MISSING_VALUE_MARKERS = ('NR', '-', '')
+
+
+def flatten_row(row, prefix=''):
+    """Nested dicts as scalar columns: {'a': {'b': 1}} -> {'a_b': 1}"""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten_row(value, f"{prefix}{key}_"))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _parquet_column(values):
+    """
+    (pyarrow type, values) for one column
+
+    Numeric columns stay numeric with MISSING_VALUE_MARKERS as nulls (a rank
+    column holding 4 and 'NR' becomes a nullable int64); any other mix of
+    types is stored as strings.
+    """
+    import pyarrow as pa
+
+    def is_number(v):
+        return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+    present = [v for v in values if v is not None and not (isinstance(v, str) and v in MISSING_VALUE_MARKERS)]
+    if present and all(is_number(v) for v in present):
+        dtype = pa.int64() if all(isinstance(v, int) for v in present) else pa.float64()
+        return dtype, [v if is_number(v) else None for v in values]
+    if present and all(isinstance(v, bool) for v in present):
+        return pa.bool_(), [v if isinstance(v, bool) else None for v in values]
+    return pa.string(), [None if v is None else str(v) for v in values]
+
+
+def write_parquet(rows, filepath):
+    """Write rows (dicts, nested dicts flattened) to a Parquet file; returns the row count"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+    rows = [flatten_row(row) for row in rows]
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    arrays = []
+    for name in names:
+        dtype, values = _parquet_column([row.get(name) for row in rows])
+        arrays.append(pa.array(values, type=dtype))
+
+    table = pa.table(arrays, names=names)
+    pq.write_table(table, filepath, compression='zstd')
+    return table.num_rows
+
+
+def iter_prediction_rows(predictions):
+    """Yield one row per predicted game (the game dict, prediction still nested, plus its date)"""
+    for date, games in predictions.items():
+        for game in games:
+            yield {'date': date, **game}
+
+
+def _write_compact_predictions(predictions, filepath):
+    """Stream the nested predictions dict as minified (optionally gzipped) JSON, one game at a time"""
+    separators = (',', ':')
+    with _open_output(filepath) as f:
+        f.write('{')
+        for d, (date, games) in enumerate(predictions.items()):
+            if d:
+                f.write(',')
+            f.write(json.dumps(date) + ':[')
+            for g, game in enumerate(games):
+                if g:
+                    f.write(',')
+                f.write(json.dumps(game, separators=separators))
+            f.write(']')
+        f.write('}')
+
+
+def save_predictions(predictions, filepath='nepsac_predictions.json', output_format='json'):
+    """
+    Save predictions to JSON file
+
+    output_format is one of OUTPUT_FORMATS; non-default formats replace the
+    .json extension (see output_path) and, except for parquet, are written one
+    game at a time instead of serializing the whole dict at once.
+    """
+    filepath = output_path(filepath, output_format)
+    if output_format == 'json':
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(predictions, f, indent=2)
+    elif output_format == 'ndjson':
+        write_ndjson(iter_prediction_rows(predictions), filepath)
+    elif output_format == 'json.gz':
+        _write_compact_predictions(predictions, filepath)
+    elif output_format == 'parquet':
+        write_parquet(iter_prediction_rows(predictions), filepath)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
     print(f"\nSaved predictions to {filepath}")
+    return filepath
 
 
 def print_sample_predictions(predictions, num_samples=10):
@@ -1291,54 +2892,62 @@ POWER_RANKING_WEIGHTS = {
 
 
 def calculate_prodigy_power_rankings(jspr_rankings, nehj_rankings, performance_rankings,
-                                      mhr_rankings, team_stats, roster_rankings):
+                                      mhr_rankings, team_stats, roster_rankings, feature_store=None):
     """
     Calculate Prodigy Power Rankings for all NEPSAC teams.
 
     Combines performance-based factors (70%) with roster strength (30%).
+    Scores are computed from the TeamFeatureStore power factor arrays; pass
+    the run's store to reuse it, otherwise one is built from these sources.
     Returns dict with ranking, score, and component breakdowns.
     """
+    sources = {
+        'jspr_rankings': jspr_rankings,
+        'nehj_rankings': nehj_rankings,
+        'performance_rankings': performance_rankings,
+        'mhr_rankings': mhr_rankings,
+        'team_stats': team_stats,
+        'roster_rankings': roster_rankings,
+    }
+    if feature_store is None:
+        feature_store = TeamFeatureStore(sources)
+
     # Collect all teams from all sources
     all_teams = set()
-    for source in [jspr_rankings, nehj_rankings, performance_rankings,
-                   mhr_rankings, team_stats, roster_rankings]:
+    for source in sources.values():
         all_teams.update(source.keys())
+    all_teams = list(all_teams)
+
+    scores = power_ranking_scores(feature_store, all_teams)
 
-    team_scores = {}
+    # Rank by rounded score; the stable sort keeps all_teams order for ties
+    # like sorted(..., reverse=True) did
+    rounded = [round(score, 4) for score in scores.tolist()]
+    order = np.argsort(-np.array(rounded), kind='stable').tolist()
 
-    for team in all_teams:
-        score = 0
+    power_rankings = {}
+
+    for rank, i in enumerate(order, 1):
+        team = all_teams[i]
         components = {}
 
         # 1. JSPR RPI (20%) - normalize 0.50-0.65 to 0-1
         jspr = jspr_rankings.get(team, {})
-        rpi = jspr.get('rpi', 0.50)
-        rpi_norm = max(0, min(1, (rpi - 0.50) / 0.15))
-        score += POWER_RANKING_WEIGHTS['jspr_rpi'] * rpi_norm
-        components['jspr_rpi'] = round(rpi, 4)
+        components['jspr_rpi'] = round(jspr.get('rpi', 0.50), 4)
         components['jspr_rank'] = jspr.get('rank', 'NR')
 
         # 2. NEHJ Expert (15%) - normalize rank 1-14 to 1-0
-        nehj = nehj_rankings.get(team, {})
-        nehj_rank = nehj.get('rank', 25)
-        nehj_norm = max(0, (14 - nehj_rank) / 13) if nehj_rank <= 14 else 0
-        score += POWER_RANKING_WEIGHTS['nehj_expert'] * nehj_norm
+        nehj_rank = nehj_rankings.get(team, {}).get('rank', 25)
         components['nehj_rank'] = nehj_rank if nehj_rank <= 14 else 'NR'
 
         # 3. Performance ELO (15%) - normalize 1400-1650 to 0-1
         perf = performance_rankings.get(team, {})
-        perf_rating = perf.get('rating', 1500)
-        perf_norm = max(0, min(1, (perf_rating - 1400) / 250))
-        score += POWER_RANKING_WEIGHTS['performance_elo'] * perf_norm
-        components['perf_elo'] = round(perf_rating, 1)
+        components['perf_elo'] = round(perf.get('rating', 1500), 1)
         components['perf_rank'] = perf.get('rank', 'NR')
 
         # 4. MHR Rating (10%) - normalize 89-100 to 0-1
         mhr = mhr_rankings.get(team, {})
-        mhr_rating = mhr.get('rating', 94.0)
-        mhr_norm = max(0, min(1, (mhr_rating - 89) / 11))
-        score += POWER_RANKING_WEIGHTS['mhr_rating'] * mhr_norm
-        components['mhr_rating'] = round(mhr_rating, 2)
+        components['mhr_rating'] = round(mhr.get('rating', 94.0), 2)
         components['mhr_rank'] = mhr.get('rank', 'NR')
 
         # 5. Win Percentage (5%)
@@ -1348,66 +2957,180 @@ def calculate_prodigy_power_rankings(jspr_rankings, nehj_rankings, performance_r
         ties = stats.get('ties', 0)
         total_games = wins + losses + ties
         win_pct = (wins + 0.5 * ties) / total_games if total_games > 0 else 0.5
-        score += POWER_RANKING_WEIGHTS['win_pct'] * win_pct
         components['record'] = f"{wins}-{losses}-{ties}" if total_games > 0 else '-'
         components['win_pct'] = round(win_pct * 100, 1)
 
         # 6. Recent Form (5%)
-        form_score = stats.get('form_score', 0.5)
-        score += POWER_RANKING_WEIGHTS['recent_form'] * form_score
         components['recent_form'] = stats.get('last_5_record', '-')
 
         # 7. Roster Average (15%) - normalize 0-5000 to 0-1
         roster = roster_rankings.get(team, {})
-        avg_points = roster.get('avg_points', 0)
-        avg_norm = max(0, min(1, avg_points / 5000))
-        score += POWER_RANKING_WEIGHTS['roster_avg'] * avg_norm
-        components['roster_avg'] = round(avg_points, 1)
+        components['roster_avg'] = round(roster.get('avg_points', 0), 1)
 
         # 8. Top Player (10%) - normalize 0-8000 to 0-1
-        max_points = roster.get('max_points', 0)
-        max_norm = max(0, min(1, max_points / 8000))
-        score += POWER_RANKING_WEIGHTS['top_player'] * max_norm
-        components['top_player'] = round(max_points, 1)
+        components['top_player'] = round(roster.get('max_points', 0), 1)
 
         # 9. Roster Depth (5%) - normalize 0-20 ranked players to 0-1
-        roster_size = roster.get('roster_size', 0)
-        depth_norm = max(0, min(1, roster_size / 20))
-        score += POWER_RANKING_WEIGHTS['roster_depth'] * depth_norm
-        components['roster_depth'] = roster_size
-
-        team_scores[team] = {
-            'score': round(score, 4),
-            'components': components
-        }
+        components['roster_depth'] = roster.get('roster_size', 0)
 
-    # Sort by score descending and assign ranks
-    sorted_teams = sorted(team_scores.items(), key=lambda x: x[1]['score'], reverse=True)
-
-    power_rankings = {}
-    for rank, (team, data) in enumerate(sorted_teams, 1):
         power_rankings[team] = {
             'rank': rank,
-            'score': data['score'],
-            **data['components']
+            'score': rounded[i],
+            **components
         }
 
     return power_rankings
 
 
+def power_ranking_scores(feature_store, teams, weights=None):
+    """
+    Power ranking scores for teams from the store's power factor matrix
+
+    weights is a (factors,) or (factors x sets) array in POWER_FACTOR_COLUMNS
+    order (default POWER_RANKING_WEIGHTS). The default is accumulated factor by
+    factor so it matches the original per-team sum exactly; explicit weights
+    use a single matrix product.
+    """
+    ids = np.array([feature_store.team_id(team) for team in teams], dtype=np.intp)
+    features = feature_store.power_features[ids]
+    if weights is not None:
+        return features @ weights
+
+    scores = np.zeros(len(teams))
+    for column, factor in enumerate(POWER_FACTOR_COLUMNS):
+        scores += POWER_RANKING_WEIGHTS[factor] * features[:, column]
+    return scores
+
+
+# Default sweep size and chunking for power_ranking_sensitivity
+SENSITIVITY_SAMPLES = 5000
+SENSITIVITY_CHUNK_SIZE = 1000
+
+
+def _sensitivity_chunk(job):
+    """Rank histogram (teams x ranks) for one chunk of perturbed weight vectors"""
+    features, base_weights, num_samples, perturbation, seed = job
+    rng = np.random.default_rng(seed)
+
+    # Scale each weight by U(1 - p, 1 + p) and renormalize to the base total
+    weights = base_weights[:, None] * rng.uniform(1 - perturbation, 1 + perturbation,
+                                                  (len(base_weights), num_samples))
+    weights *= base_weights.sum() / weights.sum(axis=0)
+
+    scores = features @ weights
+    order = np.argsort(-scores, axis=0, kind='stable')
+    num_teams = len(features)
+    flat = order * num_teams + np.arange(num_teams)[:, None]
+    return np.bincount(flat.ravel(), minlength=num_teams * num_teams).reshape(num_teams, num_teams)
+
+
+def power_ranking_sensitivity(power_rankings, feature_store, num_samples=SENSITIVITY_SAMPLES,
+                              perturbation=0.25, interval=0.90, workers=None, seed=None,
+                              chunk_size=SENSITIVITY_CHUNK_SIZE):
+    """
+    Rank stability of the power rankings under perturbed POWER_RANKING_WEIGHTS
+
+    Each sample scales every weight by a uniform factor in
+    [1 - perturbation, 1 + perturbation] and renormalizes, then re-ranks all
+    teams with one batched matrix product. Chunks of samples run on a process
+    pool (workers=1 runs in-process); each chunk gets its own seed, so results
+    don't depend on the worker count.
+
+    Returns {team: {'rank', 'median_rank', 'rank_low', 'rank_high', 'best_rank',
+    'worst_rank', 'rank_held_pct'}} where rank_low-rank_high is the central
+    `interval` of the sampled ranks.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    teams = list(power_rankings)
+    ids = np.array([feature_store.team_id(team) for team in teams], dtype=np.intp)
+    features = feature_store.power_features[ids]
+    base_weights = np.array([POWER_RANKING_WEIGHTS[factor] for factor in POWER_FACTOR_COLUMNS])
+
+    chunk_sizes = [chunk_size] * (num_samples // chunk_size)
+    if num_samples % chunk_size:
+        chunk_sizes.append(num_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    jobs = [(features, base_weights, n, perturbation, s) for n, s in zip(chunk_sizes, seeds)]
+
+    if workers == 1 or len(jobs) == 1:
+        histograms = [_sensitivity_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            histograms = list(pool.map(_sensitivity_chunk, jobs))
+    rank_counts = sum(histograms)
+
+    # Percentile ranks from each team's cumulative rank histogram
+    cumulative = np.cumsum(rank_counts, axis=1)
+    tail = (1 - interval) / 2
+
+    def rank_at(fraction):
+        return (np.argmax(cumulative >= fraction * num_samples, axis=1) + 1).tolist()
+
+    low, median, high = rank_at(tail), rank_at(0.5), rank_at(1 - tail)
+    seen = rank_counts > 0
+    best = (np.argmax(seen, axis=1) + 1).tolist()
+    worst = (seen.shape[1] - np.argmax(seen[:, ::-1], axis=1)).tolist()
+
+    sensitivity = {}
+    for i, team in enumerate(teams):
+        rank = power_rankings[team]['rank']
+        sensitivity[team] = {
+            'rank': rank,
+            'median_rank': median[i],
+            'rank_low': low[i],
+            'rank_high': high[i],
+            'best_rank': best[i],
+            'worst_rank': worst[i],
+            'rank_held_pct': round(float(rank_counts[i, rank - 1]) / num_samples * 100, 1),
+        }
+
+    return sensitivity
+
+
+def print_rank_sensitivity(sensitivity, top_n=20):
+    """Print rank stability intervals for the top N teams"""
+    print(f"\n{'Rank':<6}{'Team':<28}{'Median':>8}{'Interval':>12}{'Range':>10}{'Held':>8}")
+    print("-" * 72)
+    for team, data in sorted(sensitivity.items(), key=lambda x: x[1]['rank'])[:top_n]:
+        interval = f"{data['rank_low']}-{data['rank_high']}"
+        spread = f"{data['best_rank']}-{data['worst_rank']}"
+        print(f"{data['rank']:<6}{team.title():<28}{data['median_rank']:>8}{interval:>12}"
+              f"{spread:>10}{data['rank_held_pct']:>7.1f}%")
+
+
 def save_power_rankings(power_rankings, csv_path='nepsac_power_rankings.csv',
-                        json_path='nepsac_power_rankings.json', top_n=20):
-    """Save Prodigy Power Rankings to CSV and JSON files."""
+                        json_path='nepsac_power_rankings.json', top_n=20, output_format='json'):
+    """
+    Save Prodigy Power Rankings to CSV and JSON files.
+
+    output_format (one of OUTPUT_FORMATS) applies to the full rankings file;
+    ndjson and parquet write one row per team with its name in 'team'.
+    """
 
     # Sort by rank
     sorted_rankings = sorted(power_rankings.items(), key=lambda x: x[1]['rank'])
-
-    # Save full JSON
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'updated': datetime.now().strftime('%Y-%m-%d'),
-            'rankings': {team: data for team, data in sorted_rankings}
-        }, f, indent=2)
+    updated = datetime.now().strftime('%Y-%m-%d')
+
+    # Save full rankings
+    json_path = output_path(json_path, output_format)
+    if output_format in ('json', 'json.gz'):
+        indent = 2 if output_format == 'json' else None
+        separators = None if indent else (',', ':')
+        with _open_output(json_path) as f:
+            json.dump({
+                'updated': updated,
+                'rankings': {team: data for team, data in sorted_rankings}
+            }, f, indent=indent, separators=separators)
+    elif output_format in ('ndjson', 'parquet'):
+        rows = ({'team': team, 'updated': updated, **data} for team, data in sorted_rankings)
+        if output_format == 'ndjson':
+            write_ndjson(rows, json_path)
+        else:
+            write_parquet(rows, json_path)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
     print(f"  Saved full rankings to {json_path}")
 
     # Save top N to CSV for frontend
@@ -1462,11 +3185,33 @@ def print_power_rankings(power_rankings, top_n=20):
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='NEPSAC Prediction Engine')
+    parser.add_argument('--state-dir', help='Directory for incremental state checkpoints')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore checkpoints and recompute from full history')
+    parser.add_argument('--sensitivity', type=int, default=0, metavar='N',
+                        help='Report power ranking stability under N perturbed weight sets')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --sensitivity')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='json',
+                        help='Format for the predictions and full power rankings files')
+    parser.add_argument('--profile', choices=RunProfiler.KINDS,
+                        help='Profile the whole run and save the output next to the run report')
+    args = parser.parse_args()
+
+    report = RunReport()
+    profiler = RunProfiler(args.profile) if args.profile else None
+    if profiler:
+        profiler.start()
+
     # Generate predictions and get data sources
-    predictions, data_sources = generate_all_predictions()
+    predictions, data_sources = generate_all_predictions(state_dir=args.state_dir, rebuild=args.rebuild,
+                                                         report=report)
 
     # Save predictions to file
-    save_predictions(predictions)
+    with report.span('save_predictions'):
+        predictions_path = save_predictions(predictions, output_format=args.output_format)
+    report_dir = os.path.dirname(predictions_path)
 
     # Print sample predictions
     print_sample_predictions(predictions, num_samples=10)
@@ -1476,19 +3221,31 @@ if __name__ == '__main__':
     print("GENERATING PRODIGY POWER RANKINGS")
     print("=" * 80)
 
-    power_rankings = calculate_prodigy_power_rankings(
-        jspr_rankings=data_sources['jspr_rankings'],
-        nehj_rankings=data_sources['nehj_rankings'],
-        performance_rankings=data_sources['performance_rankings'],
-        mhr_rankings=data_sources['mhr_rankings'],
-        team_stats=data_sources['team_stats'],
-        roster_rankings=data_sources['roster_rankings']
-    )
+    with report.span('power_rankings'):
+        power_rankings = calculate_prodigy_power_rankings(
+            jspr_rankings=data_sources['jspr_rankings'],
+            nehj_rankings=data_sources['nehj_rankings'],
+            performance_rankings=data_sources['performance_rankings'],
+            mhr_rankings=data_sources['mhr_rankings'],
+            team_stats=data_sources['team_stats'],
+            roster_rankings=data_sources['roster_rankings'],
+            feature_store=data_sources['feature_store']
+        )
+    report.count('teams_ranked', len(power_rankings))
 
     # Save and print power rankings
-    save_power_rankings(power_rankings, top_n=20)
+    with report.span('save_power_rankings'):
+        save_power_rankings(power_rankings, top_n=20, output_format=args.output_format)
     print_power_rankings(power_rankings, top_n=20)
 
+    if args.sensitivity:
+        print(f"\nWeight sensitivity ({args.sensitivity} perturbed weight sets)...")
+        with report.span('power_ranking_sensitivity'):
+            sensitivity = power_ranking_sensitivity(power_rankings, data_sources['feature_store'],
+                                                    num_samples=args.sensitivity, workers=args.workers)
+        report.count('sensitivity_samples', args.sensitivity)
+        print_rank_sensitivity(sensitivity, top_n=20)
+
     # Summary stats
     print("\n" + "=" * 70)
     print("PREDICTION SUMMARY")
@@ -1506,3 +3263,10 @@ if __name__ == '__main__':
         count = tier_counts.get(tier, 0)
         pct = count / len(all_preds) * 100 if all_preds else 0
         print(f"  {tier}: {count} ({pct:.1f}%)")
+
+    # Run report (stage timings, counters) next to the predictions file
+    if profiler:
+        report.profile_path = profiler.stop(os.path.join(report_dir, 'nepsac_run_profile'))
+        print(f"\nSaved profile to {report.profile_path}")
+    report.print_summary()
+    report.save(os.path.join(report_dir, RUN_REPORT_FILE), os.path.join(report_dir, RUN_HISTORY_FILE))
@@ -0,0 +1,370 @@
+"""
+NEPSAC Prediction Service
+Resident local server for live predictions and power rankings
+
+Keeps every loaded source, the running team stats and ELO state and the
+TeamFeatureStore in memory, so a matchup prediction is a feature store
+lookup (well under a millisecond) instead of a full engine run.
+
+Input files are polled for changes (mtime and size). Only the sources that
+changed are reloaded, along with what depends on them:
+
+- results      -> team stats / ELO (new games applied incrementally), head-to-head
+- roster / team rankings -> age-adjusted roster rankings
+- any change   -> feature store and power rankings
+
+The new state is built off to the side and swapped in, so requests never see
+a half-reloaded model. Sources that don't live in a local file (BigQuery,
+HTTP) can be refreshed with POST /reload?source=name.
+
+Endpoints (JSON):
+  GET  /predict?away=Avon&home=Salisbury[&factors=1]   (404 for an unknown team)
+  GET  /predictions?date=2026-02-07
+  GET  /power-rankings[?top=20]
+  GET  /health
+  POST /reload[?source=games][&rebuild=1]
+
+Usage:
+  python nepsac_prediction_service.py                     # http://127.0.0.1:8765
+  python nepsac_prediction_service.py --port 9000 --data-dir /srv/nepsac
+  python nepsac_prediction_service.py --socket /tmp/nepsac.sock
+"""
+
+import argparse
+import copy
+import json
+import os
+import socketserver
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from nepsac_prediction_engine import (
+    DATA_SOURCE_LOADERS,
+    EloRatings,
+    HeadToHeadIndex,
+    TeamFeatureStore,
+    TeamStatsAccumulator,
+    calculate_age_adjusted_rankings,
+    calculate_prodigy_power_rankings,
+    predict_games,
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+POLL_INTERVAL = 2.0
+
+# Input file for each DATA_SOURCE_LOADERS entry (relative to --data-dir)
+SOURCE_FILES = {
+    'games': 'nz_boys_prep_results_only.csv',
+    'team_rankings': 'nepsac_team_rankings_full.csv',
+    'schedule': 'nepsac_full_schedule.json',
+    'roster': 'neutralzone_prep_boys_hockey_data_clean.csv',
+    'mhr_rankings': 'nepsac_mhr_rankings_jan21.csv',
+    'expert_rankings': 'nepsac_expert_rankings_jan21.csv',
+    'jspr_rankings': 'nepsac_jspr_rankings.csv',
+    'nehj_rankings': 'nepsac_nehj_expert_rankings.csv',
+}
+
+
+def _file_version(filepath):
+    """(mtime_ns, size) of a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class PredictionService:
+    """
+    In-memory model state with change-driven partial reloads
+
+    state is an immutable snapshot dict (data_sources, schedule, feature
+    store, power rankings) that is replaced wholesale on reload; readers just
+    take the current reference.
+    """
+
+    def __init__(self, data_dir='.', poll_interval=POLL_INTERVAL):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self.raw = {}
+        self.versions = {}
+        self.team_stats = TeamStatsAccumulator()
+        self.elo = EloRatings()
+        self.state = None
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.reload(list(DATA_SOURCE_LOADERS))
+
+    def _path(self, name):
+        return os.path.join(self.data_dir, SOURCE_FILES[name])
+
+    def changed_sources(self):
+        """Sources whose input file changed since it was last loaded"""
+        return [name for name in DATA_SOURCE_LOADERS
+                if _file_version(self._path(name)) != self.versions.get(name)]
+
+    def reload(self, names=None, rebuild=False):
+        """
+        Reload the given sources (default: the ones that changed) and swap in new state
+
+        rebuild=True replays team stats and ELO from the full history instead
+        of applying only new results. Returns the names that were reloaded.
+        """
+        with self._reload_lock:
+            names = self.changed_sources() if names is None else list(names)
+            if not names and not rebuild:
+                return []
+
+            start = time.perf_counter()
+            # Everything is built in locals and committed together at the end,
+            # so a loader or build failure leaves the previous state intact
+            versions = dict(self.versions)
+            raw = dict(self.raw)
+            for name in names:
+                versions[name] = _file_version(self._path(name))
+                raw[name] = DATA_SOURCE_LOADERS[name](self._path(name))
+
+            previous = self.state['sources'] if self.state else {}
+            sources = dict(previous)
+            team_stats, elo = self.team_stats, self.elo
+            now = datetime.now()
+
+            if 'games' in names or rebuild or not previous:
+                games = raw['games']
+                played = [g for g in games if g['date'] and g['date'] <= now]
+                if rebuild:
+                    team_stats, elo = TeamStatsAccumulator(), EloRatings()
+                else:
+                    team_stats, elo = copy.deepcopy(team_stats), copy.deepcopy(elo)
+                team_stats.update(played)
+                elo.update(played)
+                sources['games'] = games
+                sources['team_stats'] = team_stats.team_stats()
+                sources['performance_rankings'] = elo.rankings()
+                sources['h2h_index'] = HeadToHeadIndex(games)
+
+            if 'roster' in names or 'team_rankings' in names or not previous:
+                sources['roster_rankings'] = calculate_age_adjusted_rankings(
+                    raw['roster'], raw['team_rankings'])
+
+            for name in ['mhr_rankings', 'jspr_rankings', 'nehj_rankings']:
+                sources[name] = raw[name]
+
+            feature_store = TeamFeatureStore(sources)
+            power_rankings = calculate_prodigy_power_rankings(
+                sources['jspr_rankings'], sources['nehj_rankings'], sources['performance_rankings'],
+                sources['mhr_rankings'], sources['team_stats'], sources['roster_rankings'],
+                feature_store=feature_store)
+            ranked = sorted(power_rankings.items(), key=lambda x: x[1]['rank'])
+
+            state = {
+                'sources': sources,
+                'schedule': raw['schedule'],
+                'feature_store': feature_store,
+                'store_lock': threading.Lock(),  # scheduled games may intern unknown names
+                'power_rankings': [{'team': team, **data} for team, data in ranked],
+                'loaded_at': now.isoformat(timespec='seconds'),
+                'reload_seconds': round(time.perf_counter() - start, 4),
+            }
+            self.versions, self.raw = versions, raw
+            self.team_stats, self.elo = team_stats, elo
+            self.state = state
+            self.reloads += 1
+            return names
+
+    def predict(self, away_team, home_team, include_factors=False):
+        """
+        Prediction dict for one matchup from the current state
+
+        Names are resolved without interning, so client input can't grow the
+        feature store; raises KeyError for a team the store doesn't know.
+        """
+        state = self.state
+        feature_store = state['feature_store']
+        matchup = []
+        for name in (away_team, home_team):
+            team_id = feature_store.find_team_id(name)
+            if team_id is None:
+                raise KeyError(name)
+            matchup.append(feature_store.teams[team_id])
+        with state['store_lock']:
+            return predict_games([tuple(matchup)], state['sources'],
+                                 include_factors=include_factors,
+                                 feature_store=state['feature_store'])[0]
+
+    def scheduled_predictions(self, date):
+        """Predictions for every scheduled game on date (YYYY-MM-DD)"""
+        state = self.state
+        games = state['schedule']['dates'].get(date, [])
+        with state['store_lock']:
+            batch = predict_games([(g['awayTeam'], g['homeTeam']) for g in games], state['sources'],
+                                  feature_store=state['feature_store'])
+        return [{
+            'gameId': game['gameId'],
+            'away': game['awayTeam'],
+            'home': game['homeTeam'],
+            'time': game['time'],
+            'venue': game.get('location', ''),
+            'prediction': prediction
+        } for game, prediction in zip(games, batch)]
+
+    def power_rankings(self, top_n=None):
+        """Current power rankings, best first"""
+        rankings = self.state['power_rankings']
+        return rankings[:top_n] if top_n else rankings
+
+    def health(self):
+        state = self.state
+        return {
+            'loaded_at': state['loaded_at'],
+            'reload_seconds': state['reload_seconds'],
+            'reloads': self.reloads,
+            'teams': len(state['feature_store']),
+            'games': len(state['sources']['games']),
+            'sources': {name: self.versions.get(name) is not None for name in DATA_SOURCE_LOADERS},
+        }
+
+    def watch(self):
+        """Poll input files and reload changed sources until stop() is called"""
+        while not self._stop.wait(self.poll_interval):
+            try:
+                reloaded = self.reload()
+            except Exception as e:  # Keep serving the last good state
+                print(f"  Reload failed: {e}")
+                continue
+            if reloaded:
+                print(f"  Reloaded {', '.join(reloaded)} in {self.state['reload_seconds']}s")
+
+    def start_watcher(self):
+        thread = threading.Thread(target=self.watch, name='nepsac-watch', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over a PredictionService (set as the server's .service)"""
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        try:
+            self._get()
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def do_POST(self):
+        try:
+            self._post()
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def _get(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+
+        if url.path == '/predict':
+            if not params.get('away') or not params.get('home'):
+                return self._send(400, {'error': 'away and home are required'})
+            include_factors = params.get('factors') in ('1', 'true')
+            try:
+                prediction = service.predict(params['away'], params['home'], include_factors)
+            except KeyError as e:
+                return self._send(404, {'error': f'unknown team {e.args[0]}'})
+            return self._send(200, prediction)
+
+        if url.path == '/predictions':
+            if not params.get('date'):
+                return self._send(400, {'error': 'date is required'})
+            return self._send(200, {'date': params['date'], 'games': service.scheduled_predictions(params['date'])})
+
+        if url.path == '/power-rankings':
+            top_n = int(params['top']) if params.get('top', '').isdigit() else None
+            return self._send(200, {'rankings': service.power_rankings(top_n)})
+
+        if url.path == '/health':
+            return self._send(200, service.health())
+
+        self._send(404, {'error': f'unknown endpoint {url.path}'})
+
+    def _post(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path != '/reload':
+            return self._send(404, {'error': f'unknown endpoint {url.path}'})
+
+        source = params.get('source')
+        if source and source not in DATA_SOURCE_LOADERS:
+            return self._send(400, {'error': f'unknown source {source}'})
+        reloaded = self.server.service.reload([source] if source else None,
+                                              rebuild=params.get('rebuild') in ('1', 'true'))
+        self._send(200, {'reloaded': reloaded, **self.server.service.health()})
+
+
+class UnixPredictionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, verbose=False):
+    """HTTP server over TCP, or over a Unix socket if socket_path is given"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixPredictionServer(socket_path, PredictionRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), PredictionRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC Prediction Service')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port')
+    parser.add_argument('--socket', help='Serve on this Unix socket instead of TCP')
+    parser.add_argument('--data-dir', default='.', help='Directory holding the input files')
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL, help='Seconds between file change checks')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    print("Loading data...")
+    service = PredictionService(args.data_dir, poll_interval=args.poll)
+    health = service.health()
+    print(f"  Loaded {health['games']} game results, {health['teams']} teams "
+          f"in {health['reload_seconds']}s")
+
+    service.start_watcher()
+    server = make_server(service, args.host, args.port, args.socket, args.verbose)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"\nServing predictions on {where} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
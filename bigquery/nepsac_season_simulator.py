@@ -0,0 +1,404 @@
+"""
+NEPSAC Season Simulator
+Monte Carlo playoff and championship odds built on the prediction engine
+
+Plays out the rest of the schedule many times using the engine's win
+probabilities, then seeds an Elite 8 bracket from each simulated final
+standings table.
+
+- Every remaining game is drawn at once per chunk of simulations (NumPy
+  random sampling, no per-game Python calls)
+- Optionally updates performance ELO inside each simulation, so a team that
+  gets hot late in a simulated season is favored in its later games
+- Chunks are spread across a process pool
+
+Outputs per-team finishing-position distributions, Elite 8 bid and
+championship odds, and the simulation throughput.
+
+Simplifications: games are win/loss only (the engine does not predict ties),
+final standings are ordered by win percentage with random tie-breaks, and the
+Elite 8 bracket is 1v8/2v7/3v6/4v5 with the higher seed at home.
+
+Usage:
+  python nepsac_season_simulator.py                       # 100k simulations
+  python nepsac_season_simulator.py --sims 500000 --workers 8
+  python nepsac_season_simulator.py --update-elo --as-of 2026-02-01
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from nepsac_prediction_engine import (
+    AsOfStatsIndex,
+    EloRatings,
+    HeadToHeadIndex,
+    PREDICTION_WEIGHTS,
+    TEAM_FACTOR_COLUMNS,
+    TeamFeatureStore,
+    generate_all_predictions,
+    load_schedule,
+    normalize_team_name,
+    score_matchups,
+    score_pairs,
+)
+
+DEFAULT_SIMULATIONS = 100_000
+CHUNK_SIZE = 10_000
+ELITE_8_SIZE = 8
+
+# Elite 8 quarterfinal pairings by seed index (0 = 1st seed)
+ELITE_8_QUARTERFINALS = [(0, 7), (3, 4), (1, 6), (2, 5)]
+
+PERF_COLUMN = TEAM_FACTOR_COLUMNS.index('performance_rank')
+
+
+# =============================================================================
+# SIMULATION INPUTS
+# =============================================================================
+
+def remaining_games(schedule, results, as_of_date=None):
+    """
+    Scheduled games with no result as of as_of_date (default: now), in date order
+
+    A game counts as played when either team has a result on its date in
+    results (load_game_results rows) on or before as_of_date, so today's
+    unplayed games are still simulated and games played after as_of_date are
+    simulated again rather than counted.
+    """
+    if as_of_date is None:
+        as_of_date = datetime.now()
+    played = {(game['date'].strftime('%Y-%m-%d'), game['team'])
+              for game in results if game['date'] and game['date'] <= as_of_date}
+
+    games = []
+    for date in sorted(schedule['dates']):
+        for game in schedule['dates'][date]:
+            if ((date, normalize_team_name(game['awayTeam'])) not in played
+                    and (date, normalize_team_name(game['homeTeam'])) not in played):
+                games.append((game['awayTeam'], game['homeTeam']))
+    return games
+
+
+def as_of_sources(data_sources, as_of_date):
+    """
+    data_sources with results-based inputs rebuilt from games on or before as_of_date
+
+    Team stats (the simulation's starting records), performance ELO and
+    head-to-head are replayed to the cutoff; ranking files are used as loaded.
+    """
+    played = [game for game in data_sources['games'] if game['date'] and game['date'] <= as_of_date]
+    index = AsOfStatsIndex(played)
+    sources = dict(data_sources,
+                   games=played,
+                   team_stats=index.team_stats(as_of_date),
+                   performance_rankings=index.performance_rankings(as_of_date),
+                   h2h_index=HeadToHeadIndex(played))
+    sources['feature_store'] = TeamFeatureStore(sources)
+    return sources
+
+
+def build_simulation_inputs(data_sources, matchups):
+    """
+    Collect everything a simulation worker needs as plain arrays
+
+    Team ids follow the run's TeamFeatureStore. Home win probabilities come
+    straight from the engine's model scores; for in-simulation ELO updates the
+    performance factor is kept separate so it can be re-scored per simulation.
+    """
+    feature_store = data_sources.get('feature_store')
+    if feature_store is None:
+        feature_store = TeamFeatureStore(data_sources)
+    team_stats = data_sources['team_stats']
+    performance_rankings = data_sources['performance_rankings']
+
+    # Teams in the standings: anyone with a result or a remaining game
+    for team in team_stats:
+        feature_store.team_id(team)
+    away_ids, home_ids, away_scores, home_scores = score_matchups(matchups, feature_store)
+    num_teams = len(feature_store)
+    teams = list(feature_store.teams)
+
+    in_standings = np.zeros(num_teams, dtype=bool)
+    in_standings[[feature_store.team_id(team) for team in team_stats]] = True
+    in_standings[away_ids] = True
+    in_standings[home_ids] = True
+
+    wins = np.zeros(num_teams)
+    losses = np.zeros(num_teams)
+    ties = np.zeros(num_teams)
+    ratings = np.full(num_teams, float(EloRatings.BASE_RATING))
+    for i, team in enumerate(teams):
+        stats = team_stats.get(team, {})
+        wins[i] = stats.get('wins', 0)
+        losses[i] = stats.get('losses', 0)
+        ties[i] = stats.get('ties', 0)
+        ratings[i] = performance_rankings.get(team, {}).get('rating', EloRatings.BASE_RATING)
+
+    # Pairwise home win probability for playoff games between standings teams
+    # (row = home, column = away, both in standings order); only they can be seeded
+    standings_ids = np.flatnonzero(in_standings)
+    standings_pos = np.full(num_teams, -1, dtype=np.intp)
+    standings_pos[standings_ids] = np.arange(len(standings_ids))
+    pair_home, pair_away = (ids.ravel() for ids in np.meshgrid(standings_ids, standings_ids, indexing='ij'))
+    pair_away_scores, pair_home_scores = score_pairs(pair_away, pair_home, feature_store)
+    playoff_home_prob = (pair_home_scores / (pair_away_scores + pair_home_scores)).reshape(
+        len(standings_ids), len(standings_ids))
+
+    # Scores without the performance factor, for re-scoring with simulated ELO
+    perf_weight = PREDICTION_WEIGHTS['performance_rank']
+    perf_norm = feature_store.prediction_features[:, PERF_COLUMN]
+
+    return {
+        'teams': teams,
+        'in_standings': in_standings,
+        'wins': wins,
+        'losses': losses,
+        'ties': ties,
+        'away_ids': away_ids,
+        'home_ids': home_ids,
+        'home_prob': home_scores / (away_scores + home_scores),
+        'away_base': away_scores - perf_weight * perf_norm[away_ids],
+        'home_base': home_scores - perf_weight * perf_norm[home_ids],
+        'ratings': ratings,
+        'standings_pos': standings_pos,
+        'playoff_home_prob': playoff_home_prob,
+    }
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+def _simulate_regular_season(inputs, num_sims, rng, update_elo):
+    """Draw every remaining game for num_sims seasons; returns (num_sims x teams) wins"""
+    away_ids = inputs['away_ids']
+    home_ids = inputs['home_ids']
+    num_teams = len(inputs['teams'])
+    num_games = len(away_ids)
+
+    wins = np.tile(inputs['wins'], (num_sims, 1))
+    if num_games == 0:
+        return wins
+
+    if not update_elo:
+        home_won = rng.random((num_sims, num_games)) < inputs['home_prob']
+        # Game -> team incidence matrices turn per-game outcomes into win totals
+        home_incidence = np.zeros((num_games, num_teams))
+        away_incidence = np.zeros((num_games, num_teams))
+        home_incidence[np.arange(num_games), home_ids] = 1
+        away_incidence[np.arange(num_games), away_ids] = 1
+        wins += home_won @ home_incidence + (~home_won) @ away_incidence
+        return wins
+
+    # ELO mode: games are played in order, re-scoring each one with the
+    # simulation's current ratings (same normalization as the engine)
+    perf_weight = PREDICTION_WEIGHTS['performance_rank']
+    ratings = np.tile(inputs['ratings'], (num_sims, 1))
+    draws = rng.random((num_sims, num_games))
+    for g in range(num_games):
+        away, home = away_ids[g], home_ids[g]
+        away_rating = ratings[:, away]
+        home_rating = ratings[:, home]
+
+        away_score = inputs['away_base'][g] + perf_weight * np.clip((away_rating - 1400) / 250, 0, 1)
+        home_score = inputs['home_base'][g] + perf_weight * np.clip((home_rating - 1400) / 250, 0, 1)
+        home_won = draws[:, g] < home_score / (away_score + home_score)
+
+        wins[:, home] += home_won
+        wins[:, away] += ~home_won
+
+        expected_home = 1 / (1 + 10 ** ((away_rating - home_rating) / 400))
+        delta = EloRatings.K_FACTOR * (home_won - expected_home)
+        ratings[:, home] += delta
+        ratings[:, away] -= delta
+
+    return wins
+
+
+def _simulate_elite_8(seeds, playoff_home_prob, standings_pos, rng):
+    """
+    Play the Elite 8 bracket for every simulation; seeds is (num_sims x 8) team ids
+
+    playoff_home_prob is indexed by standings position (standings_pos maps team id to it).
+    """
+    num_sims = seeds.shape[0]
+    sims = np.arange(num_sims)
+
+    # Each round: the better (lower) seed hosts
+    bracket = np.stack([seeds[:, a] for pair in ELITE_8_QUARTERFINALS for a in pair], axis=1)
+    seed_numbers = np.tile(np.array([s for pair in ELITE_8_QUARTERFINALS for s in pair]), (num_sims, 1))
+
+    while bracket.shape[1] > 1:
+        first, second = bracket[:, 0::2], bracket[:, 1::2]
+        first_seed, second_seed = seed_numbers[:, 0::2], seed_numbers[:, 1::2]
+        first_home = first_seed < second_seed
+
+        home = np.where(first_home, first, second)
+        away = np.where(first_home, second, first)
+        home_won = rng.random(home.shape) < playoff_home_prob[standings_pos[home], standings_pos[away]]
+
+        first_won = home_won == first_home
+        bracket = np.where(first_won, first, second)
+        seed_numbers = np.where(first_won, first_seed, second_seed)
+
+    return bracket[sims, 0]
+
+
+def simulate_chunk(inputs, num_sims, seed, update_elo=False):
+    """
+    Simulate num_sims seasons plus Elite 8 brackets
+
+    Returns per-team finishing-position counts, Elite 8 bid and championship
+    counts and summed final wins for this chunk.
+    """
+    rng = np.random.default_rng(seed)
+    num_teams = len(inputs['teams'])
+    standings_ids = np.flatnonzero(inputs['in_standings'])
+
+    wins = _simulate_regular_season(inputs, num_sims, rng, update_elo)
+    games_played = (inputs['wins'] + inputs['losses'] + inputs['ties']
+                    + np.bincount(inputs['home_ids'], minlength=num_teams)
+                    + np.bincount(inputs['away_ids'], minlength=num_teams))
+    win_pct = np.divide(wins + 0.5 * inputs['ties'], games_played,
+                        out=np.zeros_like(wins), where=games_played > 0)
+
+    # Final standings: win percentage with a random tie-break
+    standing_pct = win_pct[:, standings_ids] + rng.random((num_sims, len(standings_ids))) * 1e-9
+    order = standings_ids[np.argsort(-standing_pct, axis=1, kind='stable')]
+
+    # Count (team, finishing position) pairs in one bincount
+    num_positions = len(standings_ids)
+    flat = order * num_positions + np.arange(num_positions)
+    position_counts = np.bincount(flat.ravel(), minlength=num_teams * num_positions)
+    position_counts = position_counts.reshape(num_teams, num_positions)
+
+    elite_8 = order[:, :ELITE_8_SIZE]
+    elite_8_counts = np.bincount(elite_8.ravel(), minlength=num_teams)
+    champions = _simulate_elite_8(elite_8, inputs['playoff_home_prob'], inputs['standings_pos'], rng) if elite_8.shape[1] == ELITE_8_SIZE else np.array([], dtype=np.intp)
+    champion_counts = np.bincount(champions, minlength=num_teams)
+
+    return {
+        'position_counts': position_counts,
+        'elite_8_counts': elite_8_counts,
+        'champion_counts': champion_counts,
+        'wins_sum': wins.sum(axis=0),
+    }
+
+
+def _simulate_chunk_job(job):
+    """Process pool entry point"""
+    inputs, num_sims, seed, update_elo = job
+    return simulate_chunk(inputs, num_sims, seed, update_elo)
+
+
+def run_simulations(inputs, num_sims=DEFAULT_SIMULATIONS, update_elo=False, workers=None,
+                    seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Run num_sims season simulations in chunks across a process pool
+
+    Returns per-team results plus throughput stats. workers=1 runs in-process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunk_sizes = [chunk_size] * (num_sims // chunk_size)
+    if num_sims % chunk_size:
+        chunk_sizes.append(num_sims % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    jobs = [(inputs, n, s, update_elo) for n, s in zip(chunk_sizes, seeds)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        chunks = [_simulate_chunk_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk_job, jobs))
+    elapsed = time.perf_counter() - start
+
+    position_counts = sum(c['position_counts'] for c in chunks)
+    elite_8_counts = sum(c['elite_8_counts'] for c in chunks)
+    champion_counts = sum(c['champion_counts'] for c in chunks)
+    wins_sum = sum(c['wins_sum'] for c in chunks)
+
+    teams = {}
+    for team_id in np.flatnonzero(inputs['in_standings']).tolist():
+        distribution = position_counts[team_id] / num_sims
+        teams[inputs['teams'][team_id]] = {
+            'expected_wins': round(float(wins_sum[team_id] / num_sims), 2),
+            'expected_position': round(float(np.dot(distribution, np.arange(1, len(distribution) + 1))), 2),
+            'elite8_bid': round(float(elite_8_counts[team_id] / num_sims * 100), 2),
+            'elite8_champ': round(float(champion_counts[team_id] / num_sims * 100), 2),
+            'position_distribution': [round(p, 5) for p in distribution.tolist()],
+        }
+
+    return {
+        'simulations': num_sims,
+        'remaining_games': len(inputs['away_ids']),
+        'update_elo': update_elo,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'simulations_per_second': round(num_sims / elapsed, 1) if elapsed > 0 else None,
+        'teams': teams,
+    }
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def save_simulation(results, filepath='nepsac_season_simulation.json'):
+    """Save simulation results to JSON"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'updated': datetime.now().strftime('%Y-%m-%d'), **results}, f, indent=2)
+    print(f"\nSaved simulation results to {filepath}")
+
+
+def print_simulation(results, top_n=20):
+    """Print top N teams by Elite 8 bid odds"""
+    print("\n" + "=" * 80)
+    print(f"SEASON SIMULATION - {results['simulations']:,} simulations, "
+          f"{results['remaining_games']} remaining games")
+    print("=" * 80)
+    print(f"{'Team':<25} {'Exp W':>7} {'Exp Pos':>8} {'Elite 8':>9} {'Champ':>8}")
+    print("-" * 80)
+
+    ranked = sorted(results['teams'].items(), key=lambda x: x[1]['elite8_bid'], reverse=True)
+    for team, data in ranked[:top_n]:
+        print(f"{team.title():<25} {data['expected_wins']:>7.1f} {data['expected_position']:>8.1f} "
+              f"{data['elite8_bid']:>8.1f}% {data['elite8_champ']:>7.1f}%")
+
+    print(f"\nThroughput: {results['simulations_per_second']:,} simulations/sec "
+          f"({results['elapsed_seconds']}s on {results['workers']} workers)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC Monte Carlo Season Simulator')
+    parser.add_argument('--sims', type=int, default=DEFAULT_SIMULATIONS, help='Number of simulated seasons')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--update-elo', action='store_true', help='Update performance ELO inside each simulation')
+    parser.add_argument('--as-of', help='Start from standings on this date and simulate every game '
+                                        'not played by then (YYYY-MM-DD, default: now)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+    parser.add_argument('--output', default='nepsac_season_simulation.json', help='Output JSON path')
+    args = parser.parse_args()
+
+    as_of_date = datetime.strptime(args.as_of, '%Y-%m-%d') if args.as_of else None
+
+    _, data_sources = generate_all_predictions()
+    if as_of_date is not None:
+        data_sources = as_of_sources(data_sources, as_of_date)
+    matchups = remaining_games(load_schedule(), data_sources['games'], as_of_date)
+
+    print("\nSimulating season...")
+    inputs = build_simulation_inputs(data_sources, matchups)
+    results = run_simulations(inputs, num_sims=args.sims, update_elo=args.update_elo,
+                              workers=args.workers, seed=args.seed)
+
+    print_simulation(results)
+    save_simulation(results, args.output)
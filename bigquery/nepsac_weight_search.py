@@ -0,0 +1,471 @@
+"""
+NEPSAC Weight Search
+Parallel hyper-parameter search over the engine's prediction weights,
+normalization bounds and home advantage
+
+Completed games are replayed once (see nepsac_backtester) to record the raw
+factor values each team had going into every game. Candidate parameter sets
+are then scored against that training set in bulk:
+
+- each chunk of candidates is normalized and scored at once (candidates x
+  games scores from one batched matmul, no per-game Python)
+- chunks are spread across a process pool
+- a leaderboard keeps the best candidates by log loss (or Brier / accuracy)
+
+Candidates come from a Latin hypercube (or plain random) sample of the
+search space, followed by refinement rounds that resample around the current
+leaders with a shrinking spread.
+
+The latest HOLDOUT_FRACTION of scored games (split on a date boundary) is
+kept out of the search; the leaders and the current parameters are then
+scored on those held-out games, so the leaderboard is not judged only on the
+games it was tuned to.
+
+Search space: the ten PREDICTION_WEIGHTS (normalized to sum to 1),
+HOME_ADVANTAGE and the low/high normalization bound of each factor in
+FACTOR_BOUNDS. --fixed-bounds keeps the engine's bounds and searches weights
+and home advantage only.
+
+Usage:
+  python nepsac_weight_search.py                          # 20k candidates, 3 rounds
+  python nepsac_weight_search.py --samples 100000 --workers 8
+  python nepsac_weight_search.py --fixed-bounds --metric accuracy --top 10
+  python nepsac_weight_search.py --holdout 0.3             # hold out the latest 30%
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from nepsac_backtester import (
+    MIN_HISTORY,
+    PROB_EPSILON,
+    EngineModel,
+    games_from_results,
+    load_engine_sources,
+)
+from nepsac_prediction_engine import (
+    FACTOR_BOUNDS,
+    HOME_ADVANTAGE,
+    PREDICTION_FACTOR_COLUMNS,
+    PREDICTION_WEIGHTS,
+    TEAM_FACTOR_COLUMNS,
+    normalize_team_factors,
+    normalize_team_name,
+    team_factor_values,
+)
+
+DEFAULT_SAMPLES = 20_000
+DEFAULT_ROUNDS = 3
+CHUNK_SIZE = 500
+LEADERBOARD_SIZE = 50
+
+# Share of scored games (the latest dates) held out of the search
+HOLDOUT_FRACTION = 0.2
+
+METRICS = ['log_loss', 'brier', 'accuracy']
+
+# Weight of each PREDICTION_FACTOR_COLUMNS entry before normalizing to sum 1
+WEIGHT_RANGE = (0.0, 0.35)
+HOME_ADVANTAGE_RANGE = (0.50, 0.65)
+
+# (low range, high range) searched for each FACTOR_BOUNDS entry
+BOUND_RANGES = {
+    'jspr_ranking': ((0.40, 0.55), (0.60, 0.75)),
+    'performance_rank': ((1300, 1475), (1550, 1750)),
+    'mhr_rating': ((85.0, 92.0), (97.0, 103.0)),
+    'nehj_expert': ((1, 1), (10, 25)),
+    'goal_diff': ((-5.0, -1.5), (1.5, 5.0)),
+    'top_player': ((1500, 3000), (5000, 8000)),
+}
+
+# Refinement: share of the leaderboard resampled around, and the first round's spread
+# (in unit-cube coordinates, halved every round)
+REFINE_LEADERS = 0.05
+REFINE_SPREAD = 0.15
+
+OUTPUT_FILE = 'nepsac_weight_search.json'
+
+
+# =============================================================================
+# TRAINING SET
+# =============================================================================
+
+def build_training_set(games, sources, min_history=MIN_HISTORY):
+    """
+    Raw factor values for both teams going into every scored game
+
+    Walks the games forward with the engine's replayed state, so each row only
+    reflects earlier results. Ties and the first min_history games are
+    applied but not included, as in walk_forward().
+    """
+    model = EngineModel(sources)
+    state = model.state_sources
+
+    away_raw, home_raw, h2h, home_won, dates = [], [], [], [], []
+    for i, game in enumerate(games):
+        if game['away_score'] != game['home_score'] and i >= min_history:
+            away = normalize_team_name(game['away_team'])
+            home = normalize_team_name(game['home_team'])
+            record = model.h2h.get(away, home)
+
+            away_raw.append(team_factor_values(away, state))
+            home_raw.append(team_factor_values(home, state))
+            h2h.append((record['wins'] + 0.5 * record['ties']) / record['games'] if record else 0.5)
+            home_won.append(game['home_score'] > game['away_score'])
+            dates.append(game['date'])
+        model.apply(game)
+
+    return {
+        'away_raw': np.array(away_raw, dtype=float).reshape(-1, len(TEAM_FACTOR_COLUMNS)),
+        'home_raw': np.array(home_raw, dtype=float).reshape(-1, len(TEAM_FACTOR_COLUMNS)),
+        'h2h': np.array(h2h, dtype=float),
+        'home_won': np.array(home_won, dtype=bool),
+        'dates': dates,
+    }
+
+
+def split_training_set(training, holdout_fraction=HOLDOUT_FRACTION):
+    """
+    (search, holdout) training sets, holding out the latest holdout_fraction of games
+
+    The split is pulled back to the first game on its date, so games on the
+    same date are never on both sides. holdout is None when nothing is held out.
+    """
+    dates = np.asarray(training['dates'])
+    num_games = len(dates)
+    split = int(num_games * (1 - holdout_fraction))
+    if holdout_fraction <= 0 or split >= num_games:
+        return training, None
+    split = int(np.searchsorted(dates, dates[split], side='left'))
+    if split == 0:
+        return training, None
+
+    search = {key: value[:split] for key, value in training.items()}
+    holdout = {key: value[split:] for key, value in training.items()}
+    return search, holdout
+
+
+# =============================================================================
+# CANDIDATES
+# =============================================================================
+
+def search_dimensions(fixed_bounds=False):
+    """(name, low, high) for every searched parameter, in unit-cube column order"""
+    dims = [(f'weight.{factor}', *WEIGHT_RANGE) for factor in PREDICTION_FACTOR_COLUMNS]
+    dims.append(('home_advantage', *HOME_ADVANTAGE_RANGE))
+    if not fixed_bounds:
+        for factor, (low_range, high_range) in BOUND_RANGES.items():
+            dims.append((f'bounds.{factor}.low', *low_range))
+            dims.append((f'bounds.{factor}.high', *high_range))
+    return dims
+
+
+def sample_candidates(num, num_dims, rng, method='lhs'):
+    """num points in the unit cube: Latin hypercube ('lhs') or uniform ('random')"""
+    if method == 'random':
+        return rng.random((num, num_dims))
+    # One point per stratum in every dimension, strata shuffled independently
+    strata = np.argsort(rng.random((num, num_dims)), axis=0)
+    return (strata + rng.random((num, num_dims))) / num
+
+
+def refine_candidates(leaders, num, spread, rng):
+    """num points scattered around randomly chosen leaders (unit cube)"""
+    centers = leaders[rng.integers(len(leaders), size=num)]
+    return np.clip(centers + rng.normal(0, spread, centers.shape), 0, 1)
+
+
+def decode_candidates(units, dims):
+    """Unit-cube candidates -> parameter arrays (weights, home_advantage, bounds)"""
+    lows = np.array([d[1] for d in dims])
+    highs = np.array([d[2] for d in dims])
+    values = lows + units * (highs - lows)
+
+    num_weights = len(PREDICTION_FACTOR_COLUMNS)
+    weights = values[:, :num_weights]
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.full_like(weights, 1 / num_weights), where=totals > 0)
+
+    names = [d[0] for d in dims]
+    bounds = None
+    if len(dims) > num_weights + 1:
+        bounds = {factor: (values[:, names.index(f'bounds.{factor}.low')],
+                           values[:, names.index(f'bounds.{factor}.high')])
+                  for factor in BOUND_RANGES}
+
+    return {
+        'weights': weights,
+        'home_advantage': values[:, num_weights],
+        'bounds': bounds,
+    }
+
+
+def current_parameters():
+    """The engine's current weights, bounds and home advantage as a one-candidate batch"""
+    return {
+        'weights': np.array([[PREDICTION_WEIGHTS[factor] for factor in PREDICTION_FACTOR_COLUMNS]]),
+        'home_advantage': np.array([HOME_ADVANTAGE]),
+        'bounds': {factor: (np.array([low]), np.array([high])) for factor, (low, high) in FACTOR_BOUNDS.items()},
+    }
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def score_candidates(training, params):
+    """
+    Log loss, Brier score and accuracy of every candidate on the training set
+
+    Scores follow predict_game: weighted 0-1 factors per side plus the home
+    advantage and head-to-head splits; the home win probability is the home
+    share of the two scores. Returns arrays with one value per candidate.
+    """
+    weights = params['weights']
+    home_advantage = params['home_advantage']
+    num_candidates = len(weights)
+    num_team = len(TEAM_FACTOR_COLUMNS)
+
+    if params['bounds'] is None:
+        # Same normalization for every candidate: a plain (candidates x factors) @ (factors x games)
+        away = weights[:, :num_team] @ normalize_team_factors(training['away_raw']).T
+        home = weights[:, :num_team] @ normalize_team_factors(training['home_raw']).T
+    else:
+        shape = (num_candidates,) + training['away_raw'].shape
+        bounds = {factor: (low[:, None], high[:, None]) for factor, (low, high) in params['bounds'].items()}
+        away_x = normalize_team_factors(np.broadcast_to(training['away_raw'], shape), bounds)
+        home_x = normalize_team_factors(np.broadcast_to(training['home_raw'], shape), bounds)
+        # Batched (games x factors) @ (factors x 1) per candidate
+        away = np.matmul(away_x, weights[:, :num_team, None])[..., 0]
+        home = np.matmul(home_x, weights[:, :num_team, None])[..., 0]
+
+    home_weight = weights[:, num_team, None]
+    h2h_weight = weights[:, num_team + 1, None]
+    away = away + home_weight * (1 - home_advantage)[:, None] + h2h_weight * training['h2h']
+    home = home + home_weight * home_advantage[:, None] + h2h_weight * (1 - training['h2h'])
+
+    total = away + home
+    home_prob = np.divide(home, total, out=np.full_like(total, 0.5), where=total > 0)
+    home_won = training['home_won']
+
+    p = np.clip(home_prob, PROB_EPSILON, 1 - PROB_EPSILON)
+    return {
+        'log_loss': -np.where(home_won, np.log(p), np.log(1 - p)).mean(axis=1),
+        'brier': ((home_prob - home_won) ** 2).mean(axis=1),
+        'accuracy': ((home_prob >= 0.5) == home_won).mean(axis=1) * 100,
+    }
+
+
+_TRAINING = None
+
+
+def _init_worker(training):
+    """Process pool initializer: keep the training set in the worker"""
+    global _TRAINING
+    _TRAINING = training
+
+
+def _score_chunk(job):
+    """Process pool entry point"""
+    units, dims = job
+    return score_candidates(_TRAINING, decode_candidates(units, dims))
+
+
+def evaluate_candidates(training, units, dims, workers=None, chunk_size=CHUNK_SIZE):
+    """Score unit-cube candidates in chunks across a process pool (workers=1 runs in-process)"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    jobs = [(units[i:i + chunk_size], dims) for i in range(0, len(units), chunk_size)]
+    if workers == 1:
+        _init_worker(training)
+        chunks = [_score_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(training,)) as pool:
+            chunks = list(pool.map(_score_chunk, jobs))
+
+    return {metric: np.concatenate([c[metric] for c in chunks]) for metric in METRICS}
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+class Leaderboard:
+    """Best candidates seen so far (unit-cube points plus their metrics)"""
+
+    def __init__(self, metric='log_loss', size=LEADERBOARD_SIZE):
+        self.metric = metric
+        self.size = size
+        self.units = None
+        self.metrics = None
+
+    def __len__(self):
+        return 0 if self.units is None else len(self.units)
+
+    def add(self, units, metrics):
+        if self.units is not None:
+            units = np.concatenate([self.units, units])
+            metrics = {m: np.concatenate([self.metrics[m], metrics[m]]) for m in METRICS}
+
+        key = -metrics[self.metric] if self.metric == 'accuracy' else metrics[self.metric]
+        keep = np.argsort(key, kind='stable')[:self.size]
+        self.units = units[keep]
+        self.metrics = {m: metrics[m][keep] for m in METRICS}
+
+    def entries(self, dims, top_n=None):
+        """Leaderboard rows with the decoded parameters, best first"""
+        count = len(self) if top_n is None else min(top_n, len(self))
+        params = decode_candidates(self.units[:count], dims)
+
+        rows = []
+        for i in range(count):
+            row = {
+                'rank': i + 1,
+                **_rounded_metrics(self.metrics, i),
+                'weights': {factor: round(w, 4) for factor, w in
+                            zip(PREDICTION_FACTOR_COLUMNS, params['weights'][i].tolist())},
+                'home_advantage': round(float(params['home_advantage'][i]), 4),
+            }
+            if params['bounds'] is not None:
+                row['bounds'] = {factor: [round(float(low[i]), 4), round(float(high[i]), 4)]
+                                 for factor, (low, high) in params['bounds'].items()}
+            rows.append(row)
+        return rows
+
+
+def _rounded_metrics(metrics, i=0):
+    return {m: round(float(metrics[m][i]), 5) for m in METRICS}
+
+
+def run_search(training, samples=DEFAULT_SAMPLES, rounds=DEFAULT_ROUNDS, method='lhs',
+               fixed_bounds=False, metric='log_loss', workers=None, seed=None,
+               chunk_size=CHUNK_SIZE, leaderboard_size=LEADERBOARD_SIZE,
+               holdout_fraction=HOLDOUT_FRACTION):
+    """
+    Sample, score and refine candidates; returns the leaderboard and throughput
+
+    Round 1 samples the whole search space; each later round resamples around
+    the top REFINE_LEADERS of the leaderboard with half the previous spread.
+    Candidates are searched on all but the latest holdout_fraction of games;
+    every leaderboard row and the current parameters also get a 'holdout'
+    entry with their metrics on the held-out games.
+    """
+    full = training
+    training, holdout = split_training_set(full, holdout_fraction)
+    rng = np.random.default_rng(seed)
+    dims = search_dimensions(fixed_bounds)
+    leaderboard = Leaderboard(metric, leaderboard_size)
+
+    start = time.perf_counter()
+    spread = REFINE_SPREAD
+    for round_num in range(rounds):
+        if round_num == 0:
+            units = sample_candidates(samples, len(dims), rng, method)
+        else:
+            num_leaders = max(1, int(len(leaderboard) * REFINE_LEADERS))
+            units = refine_candidates(leaderboard.units[:num_leaders], samples, spread, rng)
+            spread /= 2
+        leaderboard.add(units, evaluate_candidates(training, units, dims, workers, chunk_size))
+        best = leaderboard.metrics[metric][0]
+        print(f"  Round {round_num + 1}/{rounds}: best {metric} {best:.4f}")
+    elapsed = time.perf_counter() - start
+
+    evaluated = samples * rounds
+    current = _rounded_metrics(score_candidates(training, current_parameters()))
+    entries = leaderboard.entries(dims)
+    if holdout is not None:
+        current['holdout'] = _rounded_metrics(score_candidates(holdout, current_parameters()))
+        held_out = score_candidates(holdout, decode_candidates(leaderboard.units, dims))
+        for i, row in enumerate(entries):
+            row['holdout'] = _rounded_metrics(held_out, i)
+
+    return {
+        'games': len(training['home_won']),
+        'holdout_games': len(full['home_won']) - len(training['home_won']),
+        'holdout_start': holdout['dates'][0].strftime('%Y-%m-%d') if holdout is not None else None,
+        'candidates': evaluated,
+        'rounds': rounds,
+        'method': method,
+        'fixed_bounds': fixed_bounds,
+        'metric': metric,
+        'elapsed_seconds': round(elapsed, 3),
+        'candidates_per_second': round(evaluated / elapsed, 1) if elapsed > 0 else None,
+        'current': current,
+        'leaderboard': entries,
+    }
+
+
+def print_search(results, top_n=10):
+    """Print the current model's metrics and the top of the leaderboard (searched and held-out games)"""
+    print("\n" + "=" * 96)
+    print(f"WEIGHT SEARCH - {results['candidates']:,} candidates on {results['games']} games")
+    if results['holdout_games']:
+        print(f"Held out: {results['holdout_games']} games from {results['holdout_start']}")
+    print("=" * 96)
+
+    def held_out(row):
+        h = row.get('holdout')
+        return (f"{h['log_loss']:>9.4f} {h['brier']:>8.4f} {h['accuracy']:>6.1f}%" if h
+                else f"{'-':>9} {'-':>8} {'-':>7}")
+
+    print(f"{'':>7} {'Search':^26} {'Held out':^26}")
+    print(f"{'#':>7} {'Log loss':>9} {'Brier':>8} {'Acc':>7} {'Log loss':>9} {'Brier':>8} {'Acc':>7} "
+          f"{'Home adv':>9}  Top weights")
+    print("-" * 96)
+    current = results['current']
+    print(f"{'current':>7} {current['log_loss']:>9.4f} {current['brier']:>8.4f} {current['accuracy']:>6.1f}% "
+          f"{held_out(current)}")
+    for row in results['leaderboard'][:top_n]:
+        top = sorted(row['weights'].items(), key=lambda x: x[1], reverse=True)[:3]
+        top_str = ', '.join(f"{factor} {w:.2f}" for factor, w in top)
+        print(f"{row['rank']:>7} {row['log_loss']:>9.4f} {row['brier']:>8.4f} {row['accuracy']:>6.1f}% "
+              f"{held_out(row)} {row['home_advantage']:>9.3f}  {top_str}")
+
+    print(f"\nThroughput: {results['candidates_per_second']:,} candidates/sec "
+          f"({results['elapsed_seconds']}s)")
+
+
+def save_search(results, filepath=OUTPUT_FILE):
+    """Save search results to JSON"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'updated': datetime.now().strftime('%Y-%m-%d'), **results}, f, indent=2)
+    print(f"\nSaved weight search to {filepath}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NEPSAC prediction weight search')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='Candidates per round')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help='Sampling + refinement rounds')
+    parser.add_argument('--method', choices=['lhs', 'random'], default='lhs', help='First-round sampling')
+    parser.add_argument('--fixed-bounds', action='store_true', help="Keep the engine's normalization bounds")
+    parser.add_argument('--metric', choices=METRICS, default='log_loss', help='Leaderboard ordering')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Candidates scored per batch')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+    parser.add_argument('--min-history', type=int, default=MIN_HISTORY, help='Warm-up games before scoring')
+    parser.add_argument('--holdout', type=float, default=HOLDOUT_FRACTION,
+                        help='Share of games (latest) held out of the search (0 disables)')
+    parser.add_argument('--top', type=int, default=10, help='Leaderboard rows to print')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Output JSON path')
+    args = parser.parse_args()
+
+    print("Building training set...")
+    sources = load_engine_sources()
+    training = build_training_set(games_from_results(sources['games']), sources, args.min_history)
+    print(f"  {len(training['home_won'])} scored games")
+
+    print("\nSearching...")
+    results = run_search(training, samples=args.samples, rounds=args.rounds, method=args.method,
+                         fixed_bounds=args.fixed_bounds, metric=args.metric, workers=args.workers,
+                         seed=args.seed, chunk_size=args.chunk_size, holdout_fraction=args.holdout)
+
+    print_search(results, args.top)
+    save_search(results, args.output)
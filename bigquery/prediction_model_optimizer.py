@@ -1,16 +1,25 @@
 """
 NEPSAC Prediction Model Optimizer
 Uses historical game results to optimize prediction weights via gradient descent.
+
+--fit newton uses closed-form gradients and Hessians of the L2-regularized
+log loss (trust-region Newton) from several starting points, optionally in
+parallel worker processes, and reports wall time and iterations per fit.
 """
 
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient, column_arrays, snapshot_query
 from scipy.optimize import minimize
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 import json
 
-client = bigquery.Client(project='prodigy-ranking')
+client = BigQueryClient(project='prodigy-ranking')
 
 # Current static weights (for comparison)
 CURRENT_WEIGHTS = {
@@ -25,7 +34,7 @@ CURRENT_WEIGHTS = {
 }
 
 def fetch_training_data():
-    """Fetch all completed games with predictions and team stats."""
+    """Fetch all completed games with predictions and team stats (local snapshot when current)."""
     query = '''
     SELECT
         s.game_id,
@@ -68,7 +77,7 @@ def fetch_training_data():
         AND s.predicted_winner_id IS NOT NULL
     ORDER BY s.game_date
     '''
-    return list(client.query(query).result())
+    return snapshot_query(client, query)
 
 def extract_features(row):
     """Extract feature differences between home and away teams.
@@ -111,6 +120,42 @@ def extract_features(row):
         win_pct_diff,
     ])
 
+# Per-team query columns behind the features (away_<col> and home_<col>)
+TEAM_COLUMNS = ['avg_points', 'max_points', 'total_points', 'ovr', 'wins', 'losses', 'gf', 'ga']
+
+def extract_feature_matrix(data):
+    """Vectorized extract_features for a whole result set.
+    Returns the same (games x 8) matrix as stacking extract_features(row)
+    per row. data can be rows, a pandas DataFrame or an Arrow table.
+    """
+    c = column_arrays(data, [f'{side}_{col}' for side in ('away', 'home') for col in TEAM_COLUMNS])
+
+    avg_points_diff = (c['home_avg_points'] - c['away_avg_points']) / 1000
+    max_points_diff = (c['home_max_points'] - c['away_max_points']) / 1000
+    total_points_diff = (c['home_total_points'] - c['away_total_points']) / 10000
+    ovr_diff = (c['home_ovr'] - c['away_ovr']) / 10
+
+    away_games = c['away_wins'] + c['away_losses']
+    home_games = c['home_wins'] + c['home_losses']
+    away_win_pct = np.divide(c['away_wins'], away_games, out=np.full_like(away_games, 0.5), where=away_games > 0)
+    home_win_pct = np.divide(c['home_wins'], home_games, out=np.full_like(home_games, 0.5), where=home_games > 0)
+    win_pct_diff = home_win_pct - away_win_pct
+
+    goal_diff_diff = ((c['home_gf'] - c['home_ga']) - (c['away_gf'] - c['away_ga'])) / 10
+    form_diff = ((c['home_wins'] - c['home_losses']) - (c['away_wins'] - c['away_losses'])) / 5
+    home_advantage = np.ones_like(avg_points_diff)
+
+    return np.column_stack([
+        avg_points_diff,
+        max_points_diff,
+        form_diff,
+        home_advantage,
+        total_points_diff,
+        ovr_diff,
+        goal_diff_diff,
+        win_pct_diff,
+    ])
+
 def get_outcome(row):
     """Returns 1 if home team won, 0 if away team won, None if tie."""
     if row.home_score > row.away_score:
@@ -140,8 +185,101 @@ def accuracy(weights, X, y):
     predictions = sigmoid(np.dot(X, weights)) > 0.5
     return np.mean(predictions == y)
 
-def analyze_current_model():
-    """Analyze current model performance and optimize weights."""
+# =============================================================================
+# EXACT-GRADIENT FITTING
+# =============================================================================
+
+# L2 penalty on the weights (the constant home advantage column is not penalized)
+L2_PENALTY = 0.01
+HOME_ADVANTAGE_COLUMN = 3
+
+FIT_STARTS = 8
+START_SPREAD = 0.5  # Std dev of the random perturbations around the first start
+
+def _penalty_mask(num_features):
+    mask = np.ones(num_features)
+    mask[HOME_ADVANTAGE_COLUMN] = 0.0
+    return mask
+
+def regularized_log_loss(weights, X, y, l2=L2_PENALTY):
+    """Mean log loss plus 0.5 * l2 * ||m * w||^2 (m masks out home advantage), computed stably from the logits."""
+    z = X @ weights
+    penalty = 0.5 * l2 * np.sum(_penalty_mask(len(weights)) * weights ** 2)
+    return np.mean(np.logaddexp(0, z) - y * z) + penalty
+
+def log_loss_gradient(weights, X, y, l2=L2_PENALTY):
+    """Closed-form gradient of regularized_log_loss: X^T (p - y) / n + l2 * m * w.
+    m is 1 for every weight except the unpenalized home advantage column (0).
+    """
+    p = sigmoid(X @ weights)
+    return X.T @ (p - y) / len(y) + l2 * _penalty_mask(len(weights)) * weights
+
+def log_loss_hessian(weights, X, y, l2=L2_PENALTY):
+    """Closed-form Hessian of regularized_log_loss: X^T diag(p(1-p)) X / n + l2 * diag(m).
+    m is the penalty mask, so the home advantage diagonal entry gets no l2 term.
+    """
+    p = sigmoid(X @ weights)
+    return (X.T * (p * (1 - p))) @ X / len(y) + np.diag(l2 * _penalty_mask(len(weights)))
+
+def _fit_from_start(job):
+    """One trust-region Newton fit (process pool entry point)."""
+    start_weights, X, y, l2 = job
+    start = time.perf_counter()
+    result = minimize(
+        regularized_log_loss,
+        start_weights,
+        args=(X, y, l2),
+        jac=log_loss_gradient,
+        hess=log_loss_hessian,
+        method='trust-exact',
+        options={'gtol': 1e-8},
+    )
+    return {
+        'weights': result.x,
+        'loss': float(result.fun),
+        'iterations': int(result.nit),
+        'converged': bool(result.success),
+        'seconds': time.perf_counter() - start,
+    }
+
+def fit_logistic(X, y, initial_weights=None, l2=L2_PENALTY, starts=FIT_STARTS, workers=1, seed=0):
+    """
+    Fit weights from several starting points; returns the best fit plus every fit's stats.
+
+    The first start is initial_weights (default zeros), the rest are random
+    perturbations of it. workers > 1 runs the starts in parallel processes
+    (worth it for large training sets; small refits take milliseconds in-process).
+    """
+    rng = np.random.default_rng(seed)
+    if initial_weights is None:
+        initial_weights = np.zeros(X.shape[1])
+    start_points = [np.asarray(initial_weights, dtype=float)]
+    start_points += [start_points[0] + rng.normal(0, START_SPREAD, X.shape[1]) for _ in range(starts - 1)]
+    jobs = [(w, X, y, l2) for w in start_points]
+
+    start = time.perf_counter()
+    if workers == 1:
+        fits = [_fit_from_start(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            fits = list(pool.map(_fit_from_start, jobs))
+    elapsed = time.perf_counter() - start
+
+    best = min(fits, key=lambda f: f['loss'])
+    return {
+        'weights': best['weights'],
+        'loss': best['loss'],
+        'l2': l2,
+        'seconds': elapsed,
+        'fits': fits,
+    }
+
+def analyze_current_model(fit='lbfgs', starts=FIT_STARTS, l2=L2_PENALTY, workers=1):
+    """Analyze current model performance and optimize weights.
+
+    fit='lbfgs' is the original numeric-gradient L-BFGS-B fit; fit='newton'
+    uses fit_logistic (exact gradients/Hessians, L2, multi-start).
+    """
     print("=" * 60)
     print("NEPSAC PREDICTION MODEL OPTIMIZER")
     print("=" * 60)
@@ -151,31 +289,20 @@ def analyze_current_model():
     rows = fetch_training_data()
     print(f"Total games with predictions: {len(rows)}")
 
-    # Extract features and outcomes
-    X = []
-    y = []
-    games_info = []
-
-    for row in rows:
-        outcome = get_outcome(row)
-        if outcome is None:  # Skip ties
-            continue
-
-        features = extract_features(row)
-        X.append(features)
-        y.append(outcome)
-        games_info.append({
-            'game_id': row.game_id,
-            'date': str(row.game_date),
-            'away': row.away_team_id,
-            'home': row.home_team_id,
-            'score': f"{row.away_score}-{row.home_score}",
-            'predicted': row.predicted_winner_id,
-            'confidence': row.prediction_confidence,
-        })
-
-    X = np.array(X)
-    y = np.array(y)
+    # Extract features and outcomes (ties skipped)
+    scores = column_arrays(rows, ['home_score', 'away_score'])
+    decided = scores['home_score'] != scores['away_score']
+    X = extract_feature_matrix(rows)[decided]
+    y = (scores['home_score'] > scores['away_score'])[decided].astype(int)
+    games_info = [{
+        'game_id': row.game_id,
+        'date': str(row.game_date),
+        'away': row.away_team_id,
+        'home': row.home_team_id,
+        'score': f"{row.away_score}-{row.home_score}",
+        'predicted': row.predicted_winner_id,
+        'confidence': row.prediction_confidence,
+    } for row, keep in zip(rows, decided.tolist()) if keep]
 
     print(f"Games for training (excluding ties): {len(y)}")
     print(f"Home wins: {sum(y)}, Away wins: {len(y) - sum(y)}")
@@ -201,20 +328,33 @@ def analyze_current_model():
     print(f"Accuracy: {current_acc * 100:.1f}%")
     print(f"Log Loss: {current_loss:.4f}")
 
-    # Optimize with scipy
-    print("\n" + "-" * 40)
-    print("OPTIMIZING WEIGHTS (Gradient Descent)")
-    print("-" * 40)
+    if fit == 'newton':
+        print("\n" + "-" * 40)
+        print(f"OPTIMIZING WEIGHTS (Newton, exact gradients, {starts} starts, L2={l2})")
+        print("-" * 40)
 
-    result = minimize(
-        log_loss,
-        current_weights,
-        args=(X, y),
-        method='L-BFGS-B',
-        options={'maxiter': 1000}
-    )
+        fitted = fit_logistic(X, y, current_weights, l2=l2, starts=starts, workers=workers)
+        optimized_weights = fitted['weights']
+
+        for i, f in enumerate(fitted['fits']):
+            print(f"  Start {i + 1}: loss {f['loss']:.6f}, {f['iterations']} iterations, "
+                  f"{f['seconds'] * 1000:.1f} ms{'' if f['converged'] else ' (not converged)'}")
+        print(f"Total fit time: {fitted['seconds'] * 1000:.1f} ms")
+    else:
+        # Optimize with scipy
+        print("\n" + "-" * 40)
+        print("OPTIMIZING WEIGHTS (Gradient Descent)")
+        print("-" * 40)
+
+        result = minimize(
+            log_loss,
+            current_weights,
+            args=(X, y),
+            method='L-BFGS-B',
+            options={'maxiter': 1000}
+        )
 
-    optimized_weights = result.x
+        optimized_weights = result.x
 
     # Normalize weights to sum to ~1 (for interpretability)
     optimized_weights_normalized = optimized_weights / np.sum(np.abs(optimized_weights))
@@ -311,7 +451,17 @@ def analyze_current_model():
         'current_weights': {name: round(current_weights[i] * 100, 1) for i, name in enumerate(feature_names)},
         'optimized_weights': {name: round(optimized_weights_normalized[i] * 100, 1) for i, name in enumerate(feature_names)},
         'recommended_weights': weight_dict,
+        'fit_method': fit,
     }
+    if fit == 'newton':
+        results['fit'] = {
+            'l2': l2,
+            'starts': starts,
+            'seconds': round(fitted['seconds'], 4),
+            'per_start': [{'loss': round(f['loss'], 6), 'iterations': f['iterations'],
+                           'seconds': round(f['seconds'], 4), 'converged': f['converged']}
+                          for f in fitted['fits']],
+        }
 
     with open('prediction_model_analysis.json', 'w') as f:
         json.dump(results, f, indent=2)
@@ -321,4 +471,12 @@ def analyze_current_model():
     return results
 
 if __name__ == '__main__':
-    analyze_current_model()
+    parser = argparse.ArgumentParser(description='NEPSAC Prediction Model Optimizer')
+    parser.add_argument('--fit', choices=['lbfgs', 'newton'], default='lbfgs',
+                        help='lbfgs: numeric gradients (original); newton: exact gradients, L2, multi-start')
+    parser.add_argument('--starts', type=int, default=FIT_STARTS, help='Starting points for --fit newton')
+    parser.add_argument('--l2', type=float, default=L2_PENALTY, help='L2 penalty for --fit newton')
+    parser.add_argument('--workers', type=int, default=1, help='Parallel fit processes (0 = all cores)')
+    args = parser.parse_args()
+
+    analyze_current_model(fit=args.fit, starts=args.starts, l2=args.l2, workers=args.workers)
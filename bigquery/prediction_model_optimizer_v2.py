@@ -4,7 +4,7 @@ More robust analysis with cross-validation and regularization.
 """
 
 import numpy as np
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient, column_arrays, snapshot_query
 from sklearn.linear_model import LogisticRegressionCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import cross_val_score, LeaveOneOut
@@ -12,10 +12,10 @@ import json
 import warnings
 warnings.filterwarnings('ignore')
 
-client = bigquery.Client(project='prodigy-ranking')
+client = BigQueryClient(project='prodigy-ranking')
 
 def fetch_training_data():
-    """Fetch all completed games with predictions and team stats."""
+    """Fetch all completed games with predictions and team stats (local snapshot when current)."""
     query = '''
     SELECT
         s.game_id,
@@ -56,7 +56,7 @@ def fetch_training_data():
         AND s.predicted_winner_id IS NOT NULL
     ORDER BY s.game_date
     '''
-    return list(client.query(query).result())
+    return snapshot_query(client, query)
 
 def extract_features(row):
     """Extract normalized feature differences (home - away)."""
@@ -94,6 +94,44 @@ def extract_features(row):
         1.0,                  # Home advantage (constant)
     ])
 
+# Per-team query columns behind the features (away_<col> and home_<col>)
+TEAM_COLUMNS = ['avg_points', 'max_points', 'total_points', 'ovr', 'wins', 'losses', 'gf', 'ga']
+
+def extract_feature_matrix(data):
+    """Vectorized extract_features: same (games x 8) matrix, built column-wise.
+    data can be rows, a pandas DataFrame or an Arrow table.
+    """
+    c = column_arrays(data, [f'{side}_{col}' for side in ('away', 'home') for col in TEAM_COLUMNS])
+
+    avg_points_diff = (c['home_avg_points'] - c['away_avg_points']) / 1000
+    max_points_diff = (c['home_max_points'] - c['away_max_points']) / 1000
+    total_points_diff = (c['home_total_points'] - c['away_total_points']) / 10000
+    ovr_diff = (c['home_ovr'] - c['away_ovr']) / 10
+
+    # Win percentage
+    away_games = c['away_wins'] + c['away_losses']
+    home_games = c['home_wins'] + c['home_losses']
+    away_win_pct = np.divide(c['away_wins'], away_games, out=np.full_like(away_games, 0.5), where=away_games > 0)
+    home_win_pct = np.divide(c['home_wins'], home_games, out=np.full_like(home_games, 0.5), where=home_games > 0)
+    win_pct_diff = home_win_pct - away_win_pct
+
+    # Goal differential and form per game
+    away_divisor = np.maximum(away_games, 1)
+    home_divisor = np.maximum(home_games, 1)
+    goal_diff_diff = (c['home_gf'] - c['home_ga']) / home_divisor - (c['away_gf'] - c['away_ga']) / away_divisor
+    form_diff = (c['home_wins'] - c['home_losses']) / home_divisor - (c['away_wins'] - c['away_losses']) / away_divisor
+
+    return np.column_stack([
+        avg_points_diff,
+        max_points_diff,
+        total_points_diff,
+        ovr_diff,
+        win_pct_diff,
+        goal_diff_diff,
+        form_diff,
+        np.ones_like(avg_points_diff),
+    ])
+
 FEATURE_NAMES = [
     'Avg Points',
     'Top Player',
@@ -115,25 +153,19 @@ def analyze():
     rows = fetch_training_data()
     print(f"\nTotal completed games: {len(rows)}")
 
-    # Build feature matrix
-    X, y, game_info = [], [], []
-    for row in rows:
-        if row.home_score == row.away_score:  # Skip ties
-            continue
-        outcome = 1 if row.home_score > row.away_score else 0
-        X.append(extract_features(row))
-        y.append(outcome)
-        game_info.append({
-            'game_id': row.game_id,
-            'date': str(row.game_date),
-            'matchup': f"{row.away_team_id} @ {row.home_team_id}",
-            'score': f"{row.away_score}-{row.home_score}",
-            'original_prediction': row.predicted_winner_id,
-            'original_confidence': row.prediction_confidence,
-        })
-
-    X = np.array(X)
-    y = np.array(y)
+    # Build feature matrix (ties skipped)
+    scores = column_arrays(rows, ['home_score', 'away_score'])
+    decided = scores['home_score'] != scores['away_score']
+    X = extract_feature_matrix(rows)[decided]
+    y = (scores['home_score'] > scores['away_score'])[decided].astype(int)
+    game_info = [{
+        'game_id': row.game_id,
+        'date': str(row.game_date),
+        'matchup': f"{row.away_team_id} @ {row.home_team_id}",
+        'score': f"{row.away_score}-{row.home_score}",
+        'original_prediction': row.predicted_winner_id,
+        'original_confidence': row.prediction_confidence,
+    } for row, keep in zip(rows, decided.tolist()) if keep]
 
     print(f"Training samples (excl ties): {len(y)}")
     print(f"Home wins: {sum(y)} ({sum(y)/len(y)*100:.1f}%)")
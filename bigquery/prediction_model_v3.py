@@ -15,11 +15,11 @@ Strategy:
 4. Include momentum for hot/cold streaks
 """
 
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient, snapshot_query
 from datetime import datetime
 from collections import defaultdict
 
-client = bigquery.Client(project='prodigy-ranking')
+client = BigQueryClient(project='prodigy-ranking')
 
 def load_team_rankings():
     """Load current team rankings."""
@@ -29,7 +29,7 @@ def load_team_rankings():
     WHERE season = '2025-26'
     '''
     rankings = {}
-    for row in client.query(query).result():
+    for row in snapshot_query(client, query):
         rankings[row.team_id] = {
             'rank': row.rank or 50,
             'points': row.avg_prodigy_points or 1500,
@@ -49,7 +49,7 @@ def load_completed_games():
     WHERE season = '2025-26' AND status = 'final' AND away_score IS NOT NULL
     ORDER BY game_date ASC
     '''
-    return [dict(row) for row in client.query(query).result()]
+    return [dict(row) for row in snapshot_query(client, query)]
 
 def load_scheduled_games(start_date, end_date):
     """Load scheduled games for prediction."""
@@ -75,11 +75,22 @@ class TeamHistory:
         self.home_games = 0
         self.away_wins = 0
         self.away_games = 0
+        self.goal_diff_total = 0
+        self.current_streak = 0
 
     def add_game(self, goals_for, goals_against, is_home):
         result = 'W' if goals_for > goals_against else ('L' if goals_for < goals_against else 'T')
         self.games.append({'gf': goals_for, 'ga': goals_against, 'result': result, 'home': is_home})
 
+        # Running totals so goal_diff_per_game() and streak() are O(1)
+        self.goal_diff_total += goals_for - goals_against
+        if result == 'W':
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+        elif result == 'L':
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+        else:
+            self.current_streak = 0
+
         if is_home:
             self.home_games += 1
             if result == 'W':
@@ -102,27 +113,11 @@ class TeamHistory:
         """Average goal differential."""
         if not self.games:
             return 0
-        return sum(g['gf'] - g['ga'] for g in self.games) / len(self.games)
+        return self.goal_diff_total / len(self.games)
 
     def streak(self):
         """Current win/loss streak (positive = wins, negative = losses)."""
-        if not self.games:
-            return 0
-        streak = 0
-        for g in reversed(self.games):
-            if g['result'] == 'W':
-                if streak >= 0:
-                    streak += 1
-                else:
-                    break
-            elif g['result'] == 'L':
-                if streak <= 0:
-                    streak -= 1
-                else:
-                    break
-            else:
-                break
-        return streak
+        return self.current_streak
 
     def home_win_rate(self):
         if self.home_games == 0:
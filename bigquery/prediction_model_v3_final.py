@@ -14,10 +14,11 @@ Factors:
 4. Recent Form (last 5 games if available)
 """
 
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient, snapshot_query
+from nepsac_bootstrap import format_interval, paired_bootstrap
 from collections import defaultdict
 
-client = bigquery.Client(project='prodigy-ranking')
+client = BigQueryClient(project='prodigy-ranking')
 
 def load_team_data():
     """Load team rankings and standings."""
@@ -28,7 +29,7 @@ def load_team_data():
     WHERE season = '2025-26'
     '''
     rankings = {}
-    for row in client.query(rankings_query).result():
+    for row in snapshot_query(client, rankings_query):
         rankings[row.team_id] = {
             'rank': row.rank or 50,
             'points': row.avg_prodigy_points or 1500
@@ -41,7 +42,7 @@ def load_team_data():
     WHERE season = '2025-26'
     '''
     standings = {}
-    for row in client.query(standings_query).result():
+    for row in snapshot_query(client, standings_query):
         standings[row.team_id] = {
             'wins': row.wins or 0,
             'losses': row.losses or 0,
@@ -63,7 +64,7 @@ def load_completed_games():
     WHERE season = '2025-26' AND status = 'final' AND away_score IS NOT NULL
     ORDER BY game_date ASC
     '''
-    return [dict(row) for row in client.query(query).result()]
+    return [dict(row) for row in snapshot_query(client, query)]
 
 def load_scheduled_games(start_date, end_date):
     """Load scheduled games."""
@@ -249,6 +250,8 @@ def backtest():
     print("=" * 70)
 
     wrong = []
+    # Per scored game, for the bootstrap intervals
+    home_won, old_hits, new_hits, old_probs, new_probs = [], [], [], [], []
 
     for g in games:
         if g['away_score'] == g['home_score']:
@@ -262,6 +265,13 @@ def backtest():
 
         # New prediction
         pred = predict_game(g['away_team_id'], g['home_team_id'], rankings, standings, history)
+        home_won.append(actual == g['home_team_id'])
+        old_hits.append(g['predicted_winner_id'] == actual)
+        new_hits.append(pred['winner'] == actual)
+        # Stored predictions only keep the winner's confidence
+        old_conf = (g['prediction_confidence'] or 50) / 100
+        old_probs.append(old_conf if g['predicted_winner_id'] == g['home_team_id'] else 1 - old_conf)
+        new_probs.append(pred['home_prob'] / 100)
         if pred['winner'] == actual:
             new_correct += 1
         else:
@@ -282,6 +292,16 @@ def backtest():
     print(f"New Model: {new_correct}/{total} ({new_acc:.1f}%)")
     print(f"Improvement: {new_acc - old_acc:+.1f}%")
 
+    diff = paired_bootstrap(home_won, {'correct': old_hits, 'home_prob': old_probs},
+                            {'correct': new_hits, 'home_prob': new_probs})
+    print("\nPaired bootstrap (new - old, 95% CI, 10,000 resamples):")
+    print(f"  Accuracy:    {format_interval(diff['accuracy'], '%', signed=True)}, "
+          f"new better in {diff['accuracy']['prob_better']:.0%}")
+    print(f"  Log loss:    {format_interval(diff['log_loss'], digits=4, signed=True)}, "
+          f"new better in {diff['log_loss']['prob_better']:.0%}")
+    print(f"  Calibration: {format_interval(diff['calibration'], digits=4, signed=True)}, "
+          f"new better in {diff['calibration']['prob_better']:.0%}")
+
     print(f"\n--- Wrong Predictions ({len(wrong)}) ---")
     for w in wrong:
         print(f"  {w['matchup']} ({w['score']}): Predicted {w['predicted']} ({w['confidence']}%), Actual: {w['actual']}")
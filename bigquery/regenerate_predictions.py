@@ -15,7 +15,7 @@ Usage:
 
 import json
 from datetime import datetime
-from google.cloud import bigquery
+from bq_snapshot import BigQueryClient
 
 PROJECT_ID = 'prodigy-ranking'
 DATASET_ID = 'algorithm_core'
@@ -37,7 +37,7 @@ PREDICTION_WEIGHTS = {
 # Home advantage factor (reduced from 0.58 to 0.55)
 HOME_ADVANTAGE = 0.55
 
-client = bigquery.Client(project=PROJECT_ID)
+client = BigQueryClient(project=PROJECT_ID)
 
 
 def fetch_upcoming_games():